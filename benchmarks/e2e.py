@@ -0,0 +1,183 @@
+"""
+Сквозной замер клиента на локальном сервере `fake_server.py`.
+
+Для каждого сочетания числа точек и размера сетки (N x N узлов) отдельно
+замеряются этапы: разбор файла точек, отправка точек (`save_points`),
+создание процесса, задержка обнаружения завершения опросом, загрузка
+и разбор результата (npy и GeoJSON), сборка сетки и рисование.
+Каждое сочетание выводится строкой json, `--output` дописывает их в файл.
+
+Запуск: python benchmarks/e2e.py --points 1000 100000 --grids 100 1000 --latency 0.01 --duration 0.5
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import CancelledError
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fake_server import FakeServerConfig, start_server  # noqa: E402
+
+from config import settings  # noqa: E402
+from entity.kriging import GeoGrid, GeoGridValues  # noqa: E402
+from entity.states import KrigingModel, ProcessStatus, Variogram  # noqa: E402
+from service.kriging import KrigingService  # noqa: E402
+from service.loader import PointsFileLoader  # noqa: E402
+from service.polling import PollingScheduler  # noqa: E402
+
+GRID_STEP = 0.01
+
+
+class Timer:
+    """
+    Замер этапов: время и пиковая память python
+    """
+
+    def __init__(self, trace_memory: bool) -> None:
+        self.trace_memory = trace_memory
+        self.stages: dict[str, dict] = {}
+
+    def __call__(self, stage: str, fn: object, *args: object, **kwargs: object) -> object:
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        record = {"seconds": round(time.perf_counter() - start, 5)}
+        if self.trace_memory:
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.stages[stage] = record
+        return result
+
+
+def make_points_file(directory: Path, count: int) -> Path:
+    path = directory / f"points_{count}.csv"
+    if not path.exists():
+        rng = np.random.default_rng(count)
+        columns = np.column_stack([rng.uniform(40, 60, count), rng.uniform(0, 40, count), rng.normal(size=count)])
+        np.savetxt(path, columns, delimiter=",", fmt="%.6f")
+    return path
+
+
+def make_grid(size: int) -> GeoGrid:
+    stop = (size - 0.5) * GRID_STEP
+    return GeoGrid(lat=[10, 10 + stop, GRID_STEP], lon=[0, stop, GRID_STEP])
+
+
+def poll_latency(service: KrigingService, process_id: object, grid: GeoGrid, duration: float) -> float:
+    """
+    Время от готовности процесса на сервере до ее обнаружения опросом
+    """
+    api = settings.kriging_api
+    start = time.perf_counter()
+    scheduler = PollingScheduler(api.POLL_INITIAL, api.POLL_MAX, api.POLL_FACTOR, api.POLL_DEADLINE)
+    while True:
+        state = service.get_process_state(process_id, grid)
+        if state.status == ProcessStatus.SUCCESS:
+            return max(time.perf_counter() - start - duration, 0.0)
+        delay = scheduler.next_delay(state.retry_after)
+        if delay is None:
+            raise CancelledError
+        time.sleep(delay)
+
+
+def render(result: GeoGridValues) -> None:
+    from PySide6 import QtWidgets
+
+    from gui.render import RenderWidget
+
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    widget = RenderWidget()
+    widget.resize(800, 600)
+    widget.show(None, result)
+    widget.canvas.draw()
+
+
+def run_case(
+    service: KrigingService, args: argparse.Namespace, directory: Path, points_count: int, grid_size: int
+) -> dict:
+    timer = Timer(args.trace_memory)
+    path = make_points_file(directory, points_count)
+    grid = make_grid(grid_size)
+    rows, cols = grid.shape
+
+    points = timer("parse_points", PointsFileLoader(settings.points_file).load, path)
+    points_id = timer("save_points", service.save_points, points)
+    process_id = timer(
+        "create_process", service.create_points_process, points_id, grid, Variogram.GAUSSIAN, KrigingModel.ORDINARY
+    )
+    latency = poll_latency(service, process_id, grid, args.duration)
+    timer.stages["poll_latency"] = {"seconds": round(latency, 5)}
+
+    result = timer("get_result_grid_npy", service.get_result_grid, process_id, grid)
+    if rows * cols <= args.geojson_max_nodes:
+        result_points = timer("get_result_process_geojson", service.get_result_process, process_id)
+        result = timer("assemble_grid", GeoGridValues.from_points, result_points, grid)
+    if args.render:
+        timer("render", render, result)
+
+    return {
+        "points": points_count,
+        "grid": f"{rows}x{cols}",
+        "nodes": rows * cols,
+        "file_bytes": path.stat().st_size,
+        "stages": timer.stages,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument("--grids", type=int, nargs="+", default=[100, 500, 1000, 2000, 4000], help="N узлов по оси")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответов сервера, с")
+    parser.add_argument("--duration", type=float, default=0.0, help="длительность процесса на сервере, с")
+    parser.add_argument("--dtype", default="<f8", help="тип значений npy результата")
+    parser.add_argument("--geojson-max-nodes", type=int, default=10**6, help="не замерять GeoJSON результат больше")
+    parser.add_argument("--render", action="store_true", help="замерять рисование (нужен PySide6)")
+    parser.add_argument("--trace-memory", action="store_true", help="замерять пиковую память (медленнее)")
+    parser.add_argument("--output", type=Path, help="дописать результаты в json lines файл")
+    args = parser.parse_args()
+
+    if args.render:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        render(GeoGridValues(grid=make_grid(10), values=np.arange(100.0).reshape(10, 10)))
+
+    server = start_server(FakeServerConfig(latency=args.latency, duration=args.duration, dtype=args.dtype))
+    settings.kriging_api.HOST = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    meta = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "latency": args.latency,
+        "duration": args.duration,
+        "dtype": args.dtype,
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        settings.cache.DIR = Path(directory) / "cache"
+        service = KrigingService()
+        try:
+            for points_count in args.points:
+                for grid_size in args.grids:
+                    record = {**meta, **run_case(service, args, Path(directory), points_count, grid_size)}
+                    line = json.dumps(record)
+                    print(line, flush=True)
+                    if args.output is not None:
+                        with open(args.output, "a") as file:
+                            file.write(line + "\n")
+        finally:
+            service.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
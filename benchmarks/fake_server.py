@@ -0,0 +1,285 @@
+"""
+Локальный сервер, заменяющий сервис кригинга для замеров.
+
+Реализует все пути `KrigingAPI`: точки принимаются в GeoJSON или колоночном
+npz, сжатые gzip (и zstd, если установлен zstandard), принимаемые форматы
+и сжатие объявляются в ответе OPTIONS, точки отдаются в GeoJSON, процесс
+завершается через `--duration` секунд, результат - синтетические значения
+в узлах сетки в npy (если клиент его принимает) или GeoJSON формате.
+Каждый ответ задерживается на `--latency` секунд.
+
+Запуск: python benchmarks/fake_server.py --port 8000 --latency 0.02 --duration 1
+"""
+
+import argparse
+import gzip
+import io
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from config.kriging import KrigingAPI  # noqa: E402
+from entity.point import GeoPointSet  # noqa: E402
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_ID = "(?P<id>[0-9a-f-]{36})"
+
+
+@dataclass
+class FakeServerConfig:
+    latency: float = 0.0
+    duration: float = 0.0
+    binary: bool = True
+    batch_status: bool = True
+    dtype: str = "<f8"
+    retry_after: float | None = None
+    points_binary: bool = True
+    encodings: tuple[str, ...] = ("gzip", "zstd") if zstandard is not None else ("gzip",)
+    upload_options: bool = True
+
+
+@dataclass
+class FakeState:
+    points: dict[str, tuple[bytes, str]] = field(default_factory=dict)
+    processes: dict[str, tuple[dict, float]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def route(path: str) -> re.Pattern:
+    return re.compile("^" + _ID.join(map(re.escape, re.split(r"\{\w+\}", path))) + "$")
+
+
+API = KrigingAPI()
+ROUTES = {
+    ("POST", route(API.SAVE_POINTS)): "save_points",
+    ("OPTIONS", route(API.SAVE_POINTS)): "points_options",
+    ("GET", route(API.GET_POINTS)): "get_points",
+    ("POST", route(API.CREATE_PROCESS)): "create_process",
+    ("GET", route(API.GET_PROCESS_RESULT)): "get_result",
+    ("GET", route(API.GET_PROCESS_DATA)): "get_data",
+    ("GET", route(API.GET_PROCESS_STATUS)): "get_status",
+    ("POST", route(API.GET_PROCESS_STATUSES)): "get_statuses",
+}
+
+
+def grid_values(data: dict) -> np.ndarray:
+    lat = np.arange(*data["grid"]["lat"])
+    lon = np.arange(*data["grid"]["lon"])
+    return np.sin(np.radians(lat))[:, None] * 10 + np.cos(np.radians(lon))[None, :]
+
+
+def geojson_result(data: dict) -> bytes:
+    lat = np.arange(*data["grid"]["lat"])
+    lon = np.arange(*data["grid"]["lon"])
+    values = grid_values(data)
+    lon_nodes, lat_nodes = np.meshgrid(lon, lat)
+    features = (
+        '{"type":"Feature","geometry":{"type":"Point","coordinates":[%r,%r],"properties":{"value":%r}}}'
+        % (x, y, v)
+        for x, y, v in zip(lon_nodes.ravel().tolist(), lat_nodes.ravel().tolist(), values.ravel().tolist())
+    )
+    return ('{"type":"FeatureCollection","features":[' + ",".join(features) + "]}").encode()
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    config: FakeServerConfig
+    state: FakeState
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_OPTIONS(self) -> None:
+        self._dispatch("OPTIONS")
+
+    def _dispatch(self, method: str) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)) if method == "POST" else b""
+        if self.config.latency:
+            time.sleep(self.config.latency)
+        path = urlparse(self.path).path
+        for (route_method, pattern), name in ROUTES.items():
+            match = pattern.match(path)
+            if route_method == method and match:
+                getattr(self, name)(body, match.groupdict().get("id"))
+                return
+        self._send(404, {"detail": "Not Found"})
+
+    def points_options(self, _: bytes, __: None) -> None:
+        if not self.config.upload_options:
+            self._send(405, {"detail": "Method Not Allowed"})
+            return
+        media_types = ["application/json", API.POINTS_MEDIA_TYPE] if self.config.points_binary else ["application/json"]
+        headers = {"Allow": "OPTIONS, POST", "Accept-Post": ", ".join(media_types)}
+        if self.config.encodings:
+            headers["Accept-Encoding"] = ", ".join(self.config.encodings)
+        self._send_bytes(204, b"", "text/plain", headers)
+
+    def save_points(self, body: bytes, _: None) -> None:
+        encoding = self.headers.get("Content-Encoding", "identity")
+        if encoding != "identity" and encoding not in self.config.encodings:
+            accept_encoding = {"Accept-Encoding": ", ".join(self.config.encodings)}
+            self._send(415, {"detail": "Unsupported Content-Encoding"}, accept_encoding)
+            return
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "zstd":
+            body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+
+        content_type = self.headers.get("Content-Type", "application/json")
+        if content_type not in ("application/json", API.POINTS_MEDIA_TYPE) or (
+            content_type == API.POINTS_MEDIA_TYPE and not self.config.points_binary
+        ):
+            self._send(415, {"detail": "Unsupported Media Type"})
+            return
+
+        points_id = str(uuid.uuid4())
+        with self.state.lock:
+            self.state.points[points_id] = (body, content_type)
+        self._send(200, {"id": points_id})
+
+    def get_points(self, _: bytes, points_id: str) -> None:
+        body, content_type = self.state.points.get(points_id, (None, None))
+        if body is None:
+            self._send(404, {"detail": "Not Found"})
+            return
+        if content_type == API.POINTS_MEDIA_TYPE:
+            with np.load(io.BytesIO(body)) as columns:
+                precision = float(columns["precision"]) if "precision" in columns else 1.0
+                points = GeoPointSet(
+                    lon=columns["lon"] * precision, lat=columns["lat"] * precision, value=columns["value"]
+                )
+            body = json.dumps(points.geojson()).encode()
+        self._send_bytes(200, body, "application/json")
+
+    def create_process(self, body: bytes, _: None) -> None:
+        data = json.loads(body)
+        if data["points_id"] not in self.state.points:
+            self._send(404, {"detail": "Not Found"})
+            return
+        process_id = str(uuid.uuid4())
+        with self.state.lock:
+            self.state.processes[process_id] = (data, time.monotonic() + self.config.duration)
+        self._send(200, {"id": process_id})
+
+    def get_status(self, _: bytes, process_id: str) -> None:
+        process = self.state.processes.get(process_id)
+        if process is None:
+            self._send(404, {"detail": "Not Found"})
+            return
+        is_ready = time.monotonic() >= process[1]
+        headers = {}
+        if not is_ready and self.config.retry_after is not None:
+            headers["Retry-After"] = str(self.config.retry_after)
+        self._send(200, {"status": "success" if is_ready else "running"}, headers)
+
+    def get_statuses(self, body: bytes, _: None) -> None:
+        if not self.config.batch_status:
+            self._send(405, {"detail": "Method Not Allowed"})
+            return
+        now = time.monotonic()
+        statuses = {
+            process_id: "success" if now >= self.state.processes[process_id][1] else "running"
+            for process_id in json.loads(body)["ids"]
+            if process_id in self.state.processes
+        }
+        self._send(200, {"statuses": statuses})
+
+    def get_data(self, _: bytes, process_id: str) -> None:
+        process = self.state.processes.get(process_id)
+        if process is None:
+            self._send(404, {"detail": "Not Found"})
+            return
+        self._send(200, process[0])
+
+    def get_result(self, _: bytes, process_id: str) -> None:
+        process = self.state.processes.get(process_id)
+        if process is None or time.monotonic() < process[1]:
+            self._send(404, {"detail": "Not Found"})
+            return
+        data = process[0]
+        if self.config.binary and API.RESULT_MEDIA_TYPE in self.headers.get("Accept", ""):
+            buffer = io.BytesIO()
+            np.save(buffer, grid_values(data).astype(self.config.dtype))
+            headers = {API.RESULT_GRID_HEADER: json.dumps(data["grid"])}
+            self._send_bytes(200, buffer.getvalue(), API.RESULT_MEDIA_TYPE, headers)
+        else:
+            self._send_bytes(200, geojson_result(data), "application/json")
+
+    def _send(self, status: int, data: dict, headers: dict | None = None) -> None:
+        self._send_bytes(status, json.dumps(data).encode(), "application/json", headers)
+
+    def _send_bytes(self, status: int, body: bytes, content_type: str, headers: dict | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(config: FakeServerConfig, port: int = 0) -> ThreadingHTTPServer:
+    """
+    Запустить сервер в фоновом потоке, адрес в `server.server_address`
+    """
+    handler = type("Handler", (FakeHandler,), {"config": config, "state": FakeState()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка каждого ответа, с")
+    parser.add_argument("--duration", type=float, default=0.0, help="длительность процесса, с")
+    parser.add_argument("--json", action="store_true", help="отдавать результат только в GeoJSON")
+    parser.add_argument("--dtype", default="<f8", help="тип значений npy результата")
+    parser.add_argument("--no-batch-status", action="store_true", help="не поддерживать запрос статусов набора")
+    parser.add_argument("--retry-after", type=float, help="Retry-After для незавершенных процессов")
+    parser.add_argument("--no-points-binary", action="store_true", help="принимать точки только в GeoJSON")
+    parser.add_argument("--no-upload-encoding", action="store_true", help="принимать точки только без сжатия")
+    parser.add_argument("--no-upload-options", action="store_true", help="не объявлять форматы точек в OPTIONS")
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        latency=args.latency,
+        duration=args.duration,
+        binary=not args.json,
+        dtype=args.dtype,
+        batch_status=not args.no_batch_status,
+        retry_after=args.retry_after,
+        points_binary=not args.no_points_binary,
+        encodings=() if args.no_upload_encoding else FakeServerConfig.encodings,
+        upload_options=not args.no_upload_options,
+    )
+    server = start_server(config, args.port)
+    print(f"http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
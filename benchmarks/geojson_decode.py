@@ -0,0 +1,70 @@
+"""
+Сравнение разбора GeoJSON коллекции точек: json + pydantic модели
+против потокового разбора в массивы numpy.
+
+Запуск: python benchmarks/geojson_decode.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from entity.point import GeoPointFeatureCollection, GeoPointSet  # noqa: E402
+from service.geojson import GeoJSONPointsDecoder  # noqa: E402
+
+CHUNK_SIZE = 1024**2
+
+
+def make_payload(size: int) -> bytes:
+    rng = np.random.default_rng(0)
+    points = GeoPointSet(
+        lon=rng.uniform(-180, 180, size), lat=rng.uniform(-90, 90, size), value=rng.normal(size=size)
+    )
+    return json.dumps(points.geojson()).encode()
+
+
+def decode_models(payload: bytes) -> int:
+    return len(GeoPointFeatureCollection(**json.loads(payload)).features)
+
+
+def decode_stream(payload: bytes) -> int:
+    chunks = (payload[i : i + CHUNK_SIZE] for i in range(0, len(payload), CHUNK_SIZE))
+    return len(GeoJSONPointsDecoder.decode(chunks))
+
+
+def measure(decode: Callable[[bytes], int], payload: bytes) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = decode(payload)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 4), "peak_bytes": peak, "features": count}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**4, 10**5, 10**6, 10**7])
+    parser.add_argument("--models-limit", type=int, default=10**6, help="не запускать pydantic разбор больше")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        payload = make_payload(size)
+        decoders = {"stream": decode_stream}
+        if size <= args.models_limit:
+            decoders["models"] = decode_models
+        for name, decode in decoders.items():
+            result = {"decoder": name, "size": size, "payload_bytes": len(payload), **measure(decode, payload)}
+            print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Время запуска приложения: время до первой отрисовки окна и время импорта модулей.
+
+Каждый запуск выполняется в отдельном процессе с `-X importtime`,
+окно рисуется на платформе Qt `offscreen`, если не задана другая.
+
+Запуск: python benchmarks/startup.py --runs 5 --max-first-paint 1.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+PACKAGES = ("PySide6", "matplotlib", "numpy", "pydantic", "pydantic_settings", "requests", "config", "entity", "gui")
+
+
+def child() -> None:
+    """
+    Создать окно как `main.py` и сообщить время первой отрисовки
+    """
+    start = time.perf_counter()
+    sys.path.insert(0, str(SRC))
+
+    from PySide6 import QtCore, QtWidgets
+
+    from gui.main_window import ApplicationWindow
+
+    imported = time.perf_counter()
+    q_app = QtWidgets.QApplication(sys.argv[:1])
+    app = ApplicationWindow()
+    created = time.perf_counter()
+
+    class FirstPaint(QtCore.QObject):
+        def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+            if event.type() == QtCore.QEvent.Type.Paint:
+                painted = time.perf_counter()
+                result = {
+                    "import_seconds": imported - start,
+                    "window_seconds": created - imported,
+                    "first_paint_seconds": painted - start,
+                    "modules": sorted(package for package in ("matplotlib", "requests") if package in sys.modules),
+                }
+                print(json.dumps(result), flush=True)
+                QtCore.QTimer.singleShot(0, q_app.quit)
+                watched.removeEventFilter(self)
+            return False
+
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    app.show()
+    q_app.exec()
+
+
+def import_times(stderr: str) -> dict[str, float]:
+    """
+    Время импорта пакетов с вложенными модулями из вывода `-X importtime`.
+
+    Пакет, импортированный другим пакетом, входит и в его время
+    """
+    times = dict.fromkeys(PACKAGES, 0.0)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() in times and cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def run() -> dict:
+    env = {**os.environ, "QT_QPA_PLATFORM": os.environ.get("QT_QPA_PLATFORM", "offscreen")}
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--child"], capture_output=True, text=True, env=env, check=True
+    )
+    wall = time.perf_counter() - start
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    return {"wall_seconds": wall, **result, "imports": import_times(process.stderr)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-first-paint", type=float, help="завершиться с ошибкой, если медиана больше")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    runs = [run() for _ in range(args.runs)]
+    for result in runs:
+        print(json.dumps({"run": result}), flush=True)
+
+    summary = {
+        key: round(statistics.median(result[key] for result in runs), 4)
+        for key in ("wall_seconds", "import_seconds", "window_seconds", "first_paint_seconds")
+    }
+    summary["imports"] = {
+        package: round(statistics.median(result["imports"][package] for result in runs), 4) for package in PACKAGES
+    }
+    summary["eager_modules"] = runs[-1]["modules"]
+    print(json.dumps({"summary": summary}), flush=True)
+
+    if args.max_first_paint is not None and summary["first_paint_seconds"] > args.max_first_paint:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
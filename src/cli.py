@@ -0,0 +1,198 @@
+"""
+Пакетный запуск кригинга без графического интерфейса.
+
+Задания - все сочетания файлов точек, сеток, вариограмм и методов кригинга
+из аргументов, либо строки json файла `--jobs`. Результат каждого задания
+сохраняется в файл сетки формата `--format` (npy по умолчанию), сводка пишется в stdout и `summary.jsonl`.
+Точки можно перед отправкой объединить (`--merge`) и проредить (`--thin`).
+
+Пример: python src/cli.py points.csv --grid 47:56.1:0.1,5:16.1:0.1 --vario gaussian --kriging ordinary
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from config import settings
+from entity.kriging import GeoGrid
+from entity.point import GeoPointSet
+from entity.states import Backend, ExportFormat, KrigingModel, Variogram
+from service.decimation import PointsDecimator
+from service.export import ExportError
+from service.kriging import KrigingService, KrigingServiceException
+from service.loader import PointsFileError, PointsFileLoader
+from service.trace import TRACER
+
+LOGGER = logging.getLogger(__name__)
+
+
+class KrigingJob(BaseModel):
+    """
+    Задание пакетного кригинга
+    """
+
+    points: Path
+    grid: GeoGrid
+    vario: Variogram
+    kriging: KrigingModel
+    backend: Backend | None = None
+
+    @property
+    def name(self) -> str:
+        lat, lon = ("-".join(f"{value:g}" for value in axis) for axis in (self.grid.lat, self.grid.lon))
+        return f"{self.points.stem}_{lat}_{lon}_{self.vario}_{self.kriging}"
+
+
+def parse_grid(text: str) -> GeoGrid:
+    """
+    Разобрать сетку вида `lat_start:lat_stop:lat_step,lon_start:lon_stop:lon_step`
+    """
+    try:
+        lat, lon = (list(map(float, axis.split(":"))) for axis in text.split(","))
+        return GeoGrid(lat=lat, lon=lon)
+    except (ValueError, ValidationError):
+        raise argparse.ArgumentTypeError(f"Некорректная сетка {text}")
+
+
+def read_jobs(args: argparse.Namespace) -> list[KrigingJob]:
+    """
+    Задания из json файла или из сочетаний аргументов
+    """
+    if args.jobs is not None:
+        with open(args.jobs) as file:
+            return [KrigingJob.model_validate_json(line) for line in file if line.strip()]
+    return [
+        KrigingJob(points=points, grid=grid, vario=vario, kriging=kriging, backend=args.backend)
+        for points, grid, vario, kriging in itertools.product(args.points, args.grid, args.vario, args.kriging)
+    ]
+
+
+class BatchRunner:
+    """
+    Выполнение заданий с ограничением числа одновременных процессов
+    """
+
+    def __init__(
+        self,
+        service: KrigingService,
+        output: Path,
+        workers: int,
+        export_format: ExportFormat = ExportFormat.NPY,
+        merge: bool = False,
+        thin: int | None = None,
+    ) -> None:
+        self.service = service
+        self.output = output
+        self.workers = workers
+        self.export_format = export_format
+        self.merge = merge
+        self.thin = thin
+        self.loader = PointsFileLoader(settings.points_file)
+        self.decimator = PointsDecimator(settings.decimation)
+        self.points: dict[Path, GeoPointSet] = {}
+
+    def run(self, jobs: list[KrigingJob]) -> int:
+        """
+        Выполнить задания, возвращает число неуспешных
+        """
+        self.output.mkdir(parents=True, exist_ok=True)
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="kriging-batch") as executor:
+            paths = {job.points for job in jobs}
+            for future in as_completed([executor.submit(self._load, path) for path in paths]):
+                future.result()
+
+            futures = [executor.submit(self._run_job, job) for job in jobs]
+            with open(self.output / "summary.jsonl", "a") as summary:
+                for future in as_completed(futures):
+                    record = future.result()
+                    failed += record["error"] is not None
+                    line = json.dumps(record, ensure_ascii=False)
+                    summary.write(line + "\n")
+                    print(line, flush=True)
+        return failed
+
+    def _load(self, path: Path) -> None:
+        try:
+            points = self.loader.load(path)
+            if self.merge or self.thin is not None:
+                points, report = self.decimator.decimate(points, self.merge, self.thin)
+                print(f"{path}: {report.summary()}", file=sys.stderr, flush=True)
+        except (OSError, PointsFileError, ValidationError) as ex:
+            LOGGER.error(f"Error load points {path}: {ex}")
+            return
+        except Exception:
+            LOGGER.exception(f"Error load points {path}")
+            return
+        self.points[path] = points
+
+    def _run_job(self, job: KrigingJob) -> dict:
+        start = time.perf_counter()
+        record = {"job": job.name, "process_id": None, "path": None, "seconds": None, "error": None}
+        points = self.points.get(job.points)
+        if points is None:
+            record["error"] = "Не удалось загрузить точки"
+            return record
+        try:
+            process_id = self.service.create_process(points, job.grid, job.vario, job.kriging, job.backend)
+            record["process_id"] = str(process_id)
+            record["bytes_sent"] = TRACER.transferred(process_id)[0]
+            result = self.service.wait_result(process_id, job.grid)
+            path = self.service.export_result(process_id, self.output / f"{job.name}.{self.export_format}", result)
+        except (KrigingServiceException, ExportError, OSError) as ex:
+            record["error"] = str(ex)
+        except Exception as ex:
+            LOGGER.exception(f"Error run job {job.name}")
+            record["error"] = f"{type(ex).__name__}: {ex}"
+        else:
+            record["path"] = str(path)
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        return record
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("points", type=Path, nargs="*", help="файлы с точками")
+    parser.add_argument("--grid", type=parse_grid, nargs="+", default=[], help="lat0:lat1:step,lon0:lon1:step")
+    parser.add_argument("--vario", type=Variogram, nargs="+", default=[Variogram.GAUSSIAN], choices=list(Variogram))
+    parser.add_argument(
+        "--kriging", type=KrigingModel, nargs="+", default=[KrigingModel.ORDINARY], choices=list(KrigingModel)
+    )
+    parser.add_argument("--backend", type=Backend, choices=list(Backend), default=None)
+    parser.add_argument("--jobs", type=Path, help="json lines файл с заданиями KrigingJob")
+    parser.add_argument("--workers", type=int, default=settings.kriging_api.WORKERS, help="одновременных заданий")
+    parser.add_argument("--output", type=Path, default=Path("results"))
+    parser.add_argument("--format", type=ExportFormat, choices=list(ExportFormat), default=ExportFormat.NPY)
+    parser.add_argument(
+        "--merge", action="store_true", default=settings.decimation.MERGE, help="объединять дубликаты точек"
+    )
+    parser.add_argument(
+        "--thin",
+        type=int,
+        default=settings.decimation.THIN_TARGET if settings.decimation.THIN else None,
+        help="проредить точки до заданного числа",
+    )
+    args = parser.parse_args()
+
+    if args.jobs is None and not (args.points and args.grid):
+        parser.error("нужны файлы с точками и --grid, либо --jobs")
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    service = KrigingService()
+    try:
+        runner = BatchRunner(service, args.output, args.workers, args.format, args.merge, args.thin)
+        failed = runner.run(read_jobs(args))
+    finally:
+        service.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+
+class CacheSettings(BaseModel):
+    """
+    Настройки локального кэша
+    """
+
+    DIR: Path = Field(Path.home() / ".cache" / "kriging-gui", env="KRIGING_CACHE_DIR")
+
+    POINTS_FILE: str = "points.json"
+    POINTS_VERIFY: bool = False
+
+    RESULTS_DIR: str = "results"
+    POINTS_DIR: str = "points"
+    STORE_SIZE: int = 2 * 1024**3
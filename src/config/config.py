@@ -1,6 +1,14 @@
 from pydantic_settings import BaseSettings
 
+from .cache import CacheSettings
+from .decimation import DecimationSettings
+from .engine import LocalEngine
+from .export import ExportSettings
 from .kriging import KrigingAPI
+from .points import PointsFile
+from .preflight import PreflightSettings
+from .render import RenderSettings
+from .trace import TraceSettings
 
 
 class Settings(BaseSettings):
@@ -12,6 +20,14 @@ class Settings(BaseSettings):
     VERSION: str = "0.1.0"
 
     kriging_api: KrigingAPI = KrigingAPI()
+    cache: CacheSettings = CacheSettings()
+    points_file: PointsFile = PointsFile()
+    decimation: DecimationSettings = DecimationSettings()
+    local_engine: LocalEngine = LocalEngine()
+    render: RenderSettings = RenderSettings()
+    trace: TraceSettings = TraceSettings()
+    export: ExportSettings = ExportSettings()
+    preflight: PreflightSettings = PreflightSettings()
 
 
 settings = Settings()
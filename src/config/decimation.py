@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+from entity.states import MergeRule, ThinMethod
+
+
+class DecimationSettings(BaseModel):
+    """
+    Настройки подготовки точек перед отправкой.
+
+    Точки ближе `MERGE_TOLERANCE` градусов (0 - только с одинаковыми координатами)
+    объединяются по правилу `MERGE_RULE`, прореживание `THIN_METHOD` оставляет
+    не больше `THIN_TARGET` точек. По умолчанию точки передаются без изменений
+    """
+
+    MERGE: bool = False
+    MERGE_TOLERANCE: float = 0.0
+    MERGE_RULE: MergeRule = MergeRule.MEAN
+
+    THIN: bool = False
+    THIN_METHOD: ThinMethod = ThinMethod.BINNING
+    THIN_TARGET: int = 3000
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+from entity.states import Backend
+
+
+class LocalEngine(BaseModel):
+    """
+    Настройки локального вычисления кригинга.
+
+    По умолчанию процессы считаются на сервере. При `Backend.AUTO` процесс считается
+    локально, если точек не больше `AUTO_MAX_POINTS` и произведение числа точек
+    на число узлов сетки не больше `AUTO_MAX_WORK`.
+    Перекрестная проверка хранит матрицу точек, поэтому ограничена `VALIDATION_MAX_POINTS` точками
+    """
+
+    BACKEND: Backend = Backend.REMOTE
+
+    AUTO_MAX_POINTS: int = 3000
+    AUTO_MAX_WORK: int = 2 * 10**9
+
+    BLOCK_BYTES: int = 64 * 1024**2
+    NUGGET: float = 1e-10
+    VARIOGRAM_SAMPLE: int = 2000
+    VARIOGRAM_BINS: int = 20
+    VALIDATION_MAX_POINTS: int = 20_000
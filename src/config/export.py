@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class ExportSettings(BaseModel):
+    """
+    Настройки экспорта результата.
+
+    Значения записываются блоками строк по `CHUNK_BYTES`, в `DTYPE`
+    ("float64" или "float32"); npz и GeoTIFF сжимаются deflate с уровнем
+    `COMPRESS_LEVEL` (0 - без сжатия)
+    """
+
+    CHUNK_BYTES: int = 16 * 1024**2
+    DTYPE: str = "float64"
+    COMPRESS_LEVEL: int = 6
+    TIFF_STRIP_BYTES: int = 256 * 1024
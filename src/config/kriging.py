@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
 
+from entity.states import ContentEncoding
+
 
 class KrigingAPI(BaseModel):
     """
@@ -15,3 +17,43 @@ class KrigingAPI(BaseModel):
     GET_PROCESS_RESULT: str = "/api/v0/kriging/geospatial/process/{process_id}/result"
     GET_PROCESS_DATA: str = "/api/v0/kriging/geospatial/process/{process_id}/data"
     GET_PROCESS_STATUS: str = "/api/v0/kriging/geospatial/process/{process_id}/status"
+    GET_PROCESS_STATUSES: str = "/api/v0/kriging/geospatial/process/statuses"
+
+    WORKERS: int = 4
+    RESULT_BINARY: bool = True
+    RESULT_MEDIA_TYPE: str = "application/x-npy"
+    RESULT_GRID_HEADER: str = "X-Kriging-Grid"
+    STREAM_CHUNK_SIZE: int = 1024**2
+
+    POINTS_BINARY: bool = True
+    POINTS_MEDIA_TYPE: str = "application/x-npz"
+    POINTS_PRECISION: float | None = None
+    UPLOAD_ENCODING: ContentEncoding = ContentEncoding.GZIP
+    UPLOAD_LEVEL: int = 3
+    UPLOAD_MIN_BYTES: int = 1024
+    UPLOAD_MIN_RATIO: float = 1.1
+    UPLOAD_NEGOTIATE: bool = True
+
+    POOL_SIZE: int = 10
+    KEEP_ALIVE: bool = True
+    RETRY_TOTAL: int = 3
+    RETRY_BACKOFF: float = 0.5
+    RETRY_STATUSES: list[int] = [502, 503, 504]
+    TIMEOUTS: dict[str, float] = {
+        "SAVE_POINTS": 60,
+        "GET_POINTS": 60,
+        "GET_PROCESS_RESULT": 60,
+    }
+
+    POLL_INITIAL: float = 0.1
+    POLL_MAX: float = 5
+    POLL_FACTOR: float = 2
+    POLL_DEADLINE: float = 3600
+    LONG_POLL: bool = False
+    LONG_POLL_WAIT: float = 20
+    BATCH_STATUS: bool = True
+
+    TILING: bool = False
+    TILE_NODES: int = 250_000
+    TILE_CONCURRENCY: int = 4
+    TILE_RETRIES: int = 2
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+
+class PointsFile(BaseModel):
+    """
+    Настройки чтения файлов с точками.
+
+    Столбцы задаются номером или именем из строки заголовка,
+    разделитель `None` определяется по первой строке данных
+    """
+
+    DELIMITER: str | None = None
+    COMMENTS: str = "#"
+    SKIP_ROWS: int = 0
+
+    LAT_COLUMN: int | str = 0
+    LON_COLUMN: int | str = 1
+    VALUE_COLUMN: int | str = 2
+
+    CHUNK_SIZE: int = 16 * 1024**2
+    EXTENSIONS: list[str] = [".txt", ".csv", ".dat", ".xyz", ".npy"]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class PreflightSettings(BaseModel):
+    """
+    Настройки предварительной оценки процесса кригинга.
+
+    При превышении мягкого бюджета (`SOFT_*`) запуск требует подтверждения,
+    жесткого (`HARD_*`) - запрещается, `None` отключает проверку.
+    Время процесса оценивается по последним `HISTORY_SIZE` запускам,
+    сохраненным в `HISTORY_FILE` кэша, степенная модель строится от `MIN_FIT_RUNS` запусков
+    """
+
+    SOFT_NODES: int | None = 2_000_000
+    HARD_NODES: int | None = 50_000_000
+    SOFT_MEMORY: int | None = 1024**3
+    HARD_MEMORY: int | None = 8 * 1024**3
+    SOFT_SECONDS: float | None = 600
+    HARD_SECONDS: float | None = None
+
+    HISTORY_FILE: str = "runs.json"
+    HISTORY_SIZE: int = 500
+    MIN_FIT_RUNS: int = 5
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from entity.states import RenderMode
+
+
+class RenderSettings(BaseModel):
+    """
+    Настройки отображения результата.
+
+    При `RenderMode.AUTO` сетки больше `RASTER_MIN_NODES` узлов рисуются растром,
+    `CACHE_SIZE` последних результатов хранятся вместе с построенными изолиниями
+    """
+
+    MODE: RenderMode = RenderMode.AUTO
+    RASTER_MIN_NODES: int = 250_000
+    CONTOUR_LEVELS: int = 50
+    CMAP: str = "coolwarm"
+    CACHE_SIZE: int = 8
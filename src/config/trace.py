@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class TraceSettings(BaseModel):
+    """
+    Настройки замеров этапов работы клиента.
+
+    Хранятся последние `MAX_SPANS` замеров, профилировщик снимает стеки
+    потоков каждые `PROFILE_INTERVAL` секунд и сохраняет их в `PROFILES_DIR` кэша
+    """
+
+    ENABLED: bool = True
+    MAX_SPANS: int = 20_000
+    PROFILE_INTERVAL: float = 0.005
+    PROFILES_DIR: str = "profiles"
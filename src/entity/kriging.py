@@ -1,17 +1,154 @@
+import io
+import math
 from uuid import UUID
 
-from pydantic import BaseModel, conlist
+import numpy as np
+from pydantic import BaseModel, ConfigDict, conlist, model_validator
 
-from entity.states import KrigingModel, Variogram
+from entity.point import GeoPointSet
+from entity.states import GRID_TOLERANCE, KrigingModel, Variogram
 
 
 class GeoGrid(BaseModel):
     lat: conlist(float, min_length=3, max_length=3)
     lon: conlist(float, min_length=3, max_length=3)
 
+    @property
+    def lat_axis(self) -> np.ndarray:
+        """
+        Узлы сетки по широте
+        """
+        return np.arange(*self.lat)
+
+    @property
+    def lon_axis(self) -> np.ndarray:
+        """
+        Узлы сетки по долготе
+        """
+        return np.arange(*self.lon)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Размер сетки (широта, долгота)
+        """
+        return len(self.lat_axis), len(self.lon_axis)
+
+    def tiles(self, size: int) -> list[tuple[slice, slice, "GeoGrid"]]:
+        """
+        Разбить сетку на выровненные по узлам подсетки не больше `size` узлов.
+
+        Возвращает срезы (широта, долгота) каждой подсетки в исходной сетке
+        """
+        rows, cols = self.shape
+        tile_rows = min(rows, max(math.isqrt(size), 2))
+        tile_cols = min(cols, max(size // tile_rows, 2))
+        tiles = []
+        for row_start, row_stop in self._axis_tiles(rows, tile_rows):
+            for col_start, col_stop in self._axis_tiles(cols, tile_cols):
+                grid = GeoGrid(
+                    lat=self._sub_axis(self.lat, row_start, row_stop),
+                    lon=self._sub_axis(self.lon, col_start, col_stop),
+                )
+                tiles.append((slice(row_start, row_stop), slice(col_start, col_stop), grid))
+        return tiles
+
+    @staticmethod
+    def _axis_tiles(count: int, size: int) -> list[tuple[int, int]]:
+        """
+        Границы частей оси, остаток из одного узла присоединяется к предыдущей части
+        """
+        bounds = [(start, min(start + size, count)) for start in range(0, count, size)]
+        if len(bounds) > 1 and bounds[-1][1] - bounds[-1][0] == 1:
+            bounds[-2:] = [(bounds[-2][0], count)]
+        return bounds
+
+    @staticmethod
+    def _sub_axis(axis: list[float], start: int, stop: int) -> list[float]:
+        """
+        Ось подсетки с узлами `start:stop` исходной оси, конец смещен на полшага внутрь
+        """
+        axis_start, _, step = axis
+        return [axis_start + start * step, axis_start + (stop - 0.5) * step, step]
+
+    def indexes(self, points: GeoPointSet, tolerance: float = GRID_TOLERANCE) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Целочисленные индексы узлов сетки (широта, долгота) для точек.
+
+        Точность совпадения координаты с узлом задается долей шага сетки
+        """
+        rows = self._axis_indexes(points.lat, self.lat, self.shape[0], tolerance)
+        cols = self._axis_indexes(points.lon, self.lon, self.shape[1], tolerance)
+        outside = np.flatnonzero((rows < 0) | (cols < 0))
+        if len(outside):
+            raise ValueError(f"Точки не лежат в узлах сетки: {len(outside)}, первая точка №{outside[0]}")
+        return rows, cols
+
+    @staticmethod
+    def _axis_indexes(coordinates: np.ndarray, axis: list[float], size: int, tolerance: float) -> np.ndarray:
+        start, _, step = axis
+        position = (coordinates - start) / step
+        indexes = np.rint(position).astype(np.intp)
+        mismatch = (np.abs(position - indexes) > tolerance) | (indexes < 0) | (indexes >= size)
+        indexes[mismatch] = -1
+        return indexes
+
 
 class GeoKrigingData(BaseModel):
     points_id: UUID
     grid: GeoGrid
     vario: Variogram
     kriging: KrigingModel
+
+
+class GeoGridValues(BaseModel):
+    """
+    Значения в узлах геопространственной сетки
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    grid: GeoGrid
+    values: np.ndarray
+
+    @model_validator(mode="after")
+    def validate_values(self) -> "GeoGridValues":
+        if self.values.shape != self.grid.shape:
+            raise ValueError(f"Размер значений {self.values.shape} не совпадает с сеткой {self.grid.shape}")
+        return self
+
+    @classmethod
+    def from_points(cls, points: GeoPointSet, grid: GeoGrid) -> "GeoGridValues":
+        """
+        Разложить точки по узлам сетки, узлы без точек заполняются NaN
+        """
+        rows, cols = grid.indexes(points)
+        values = np.full(grid.shape, np.nan)
+        values[rows, cols] = points.value
+        return cls(grid=grid, values=values)
+
+    @classmethod
+    def from_npy(cls, content: bytes, grid: GeoGrid) -> "GeoGridValues":
+        """
+        Прочитать значения сетки из npy массива (широта, долгота)
+        """
+        values = np.load(io.BytesIO(content), allow_pickle=False)
+        return cls(grid=grid, values=values)
+
+    @property
+    def min(self) -> float:
+        return float(np.nanmin(self.values))
+
+    @property
+    def max(self) -> float:
+        return float(np.nanmax(self.values))
+
+
+class GeoProcessState(BaseModel):
+    """
+    Состояние процесса кригинга
+    """
+
+    status: str
+    retry_after: float | None = None
+    result: GeoGridValues | None = None
@@ -1,6 +1,9 @@
-from typing import Literal
+import hashlib
+from functools import cached_property
+from typing import ClassVar, Literal
 
-from pydantic import BaseModel, conlist, field_validator
+import numpy as np
+from pydantic import BaseModel, ConfigDict, conlist, field_validator, model_validator
 
 
 class GeoModel(BaseModel):
@@ -42,3 +45,121 @@ class GeoPointFeature(Feature):
 
 class GeoPointFeatureCollection(FeatureCollection):
     features: list[GeoPointFeature]
+
+
+class GeoPointSet(BaseModel):
+    """
+    Колоночный набор точек координат.
+
+    Хранит долготы, широты и значения в массивах numpy, проверяет их целиком
+    и сериализуется в GeoJSON без создания модели на каждую точку
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    ERROR_INDEX_LIMIT: ClassVar[int] = 20
+
+    lon: np.ndarray
+    lat: np.ndarray
+    value: np.ndarray
+
+    @field_validator("lon", "lat", "value", mode="before")
+    @classmethod
+    def validate_column(cls, column: object) -> np.ndarray:
+        column = np.asarray(column, dtype=np.float64)
+        if column.ndim != 1:
+            raise ValueError("Столбец точек должен быть одномерным")
+        if column.flags.writeable:
+            column = column.view()
+            column.flags.writeable = False
+        return column
+
+    @model_validator(mode="after")
+    def validate_points(self) -> "GeoPointSet":
+        if not (len(self.lon) == len(self.lat) == len(self.value)):
+            raise ValueError("Столбцы долготы, широты и значений должны быть одной длины")
+
+        errors = []
+        for message, mask in (
+            ("Долгота должна быть между -180 и 180", ~((self.lon >= -180) & (self.lon <= 180))),
+            ("Широта должна быть между -90 и 90", ~((self.lat >= -90) & (self.lat <= 90))),
+            ("Значение должно быть конечным числом", ~np.isfinite(self.value)),
+        ):
+            indexes = np.flatnonzero(mask)
+            if len(indexes):
+                errors.append(f"{message} point index {self._format_indexes(indexes)}")
+        if errors:
+            raise ValueError("\n".join(errors))
+        return self
+
+    @classmethod
+    def _format_indexes(cls, indexes: np.ndarray) -> str:
+        text = ", ".join(map(str, indexes[: cls.ERROR_INDEX_LIMIT].tolist()))
+        if len(indexes) > cls.ERROR_INDEX_LIMIT:
+            text += f" ... (всего {len(indexes)})"
+        return text
+
+    @classmethod
+    def from_geojson(cls, data: dict) -> "GeoPointSet":
+        """
+        Создать набор из GeoJSON коллекции точек
+        """
+        features = data["features"]
+        coordinates = np.array(
+            [feature["geometry"]["coordinates"] for feature in features], dtype=np.float64
+        ).reshape(len(features), 2)
+        values = np.fromiter(
+            (feature["geometry"]["properties"]["value"] for feature in features), dtype=np.float64, count=len(features)
+        )
+        return cls(lon=coordinates[:, 0], lat=coordinates[:, 1], value=values)
+
+    @classmethod
+    def from_features(cls, collection: GeoPointFeatureCollection) -> "GeoPointSet":
+        """
+        Создать набор из коллекции моделей точек
+        """
+        return cls.from_geojson(collection.model_dump())
+
+    def geojson(self) -> dict:
+        """
+        Сериализовать набор в GeoJSON коллекцию точек
+        """
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat], "properties": {"value": value}},
+                }
+                for lon, lat, value in zip(self.lon.tolist(), self.lat.tolist(), self.value.tolist())
+            ],
+        }
+
+    @cached_property
+    def digest(self) -> str:
+        """
+        Хэш содержимого набора точек
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        for column in (self.lon, self.lat, self.value):
+            digest.update(np.ascontiguousarray(column, dtype="<f8").tobytes())
+        return digest.hexdigest()
+
+    @cached_property
+    def features(self) -> GeoPointFeatureCollection:
+        """
+        Коллекция моделей точек, создается при первом обращении
+        """
+        return GeoPointFeatureCollection.model_construct(
+            features=[
+                GeoPointFeature.model_construct(
+                    geometry=GeoPoint.model_construct(
+                        coordinates=[lon, lat], properties=GeoPointProperties.model_construct(value=value)
+                    )
+                )
+                for lon, lat, value in zip(self.lon.tolist(), self.lat.tolist(), self.value.tolist())
+            ]
+        )
+
+    def __len__(self) -> int:
+        return len(self.value)
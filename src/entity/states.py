@@ -13,4 +13,57 @@ class KrigingModel(StrEnum):
     UNIVERSAL = "universal"
 
 
+class Backend(StrEnum):
+    REMOTE = "remote"
+    LOCAL = "local"
+    AUTO = "auto"
+
+
+class RenderMode(StrEnum):
+    AUTO = "auto"
+    RASTER = "raster"
+    CONTOUR = "contour"
+
+
+class ExportFormat(StrEnum):
+    NPY = "npy"
+    NPZ = "npz"
+    NETCDF = "nc"
+    GEOTIFF = "tif"
+
+
+class ContentEncoding(StrEnum):
+    IDENTITY = "identity"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+class MergeRule(StrEnum):
+    MEAN = "mean"
+    MEDIAN = "median"
+    FIRST = "first"
+
+
+class ThinMethod(StrEnum):
+    BINNING = "binning"
+    KNN = "knn"
+
+
+class Budget(StrEnum):
+    OK = "ok"
+    SOFT = "soft"
+    HARD = "hard"
+
+
+class ProcessStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FAILED_PROCESS_STATUSES = frozenset({ProcessStatus.FAILED, ProcessStatus.CANCELLED})
+
 TIMEOUT = 10
+GRID_TOLERANCE = 1e-3
@@ -1,6 +1,7 @@
 from PySide6 import QtWidgets
 
-from entity.states import KrigingModel, Variogram
+from config import settings
+from entity.states import Backend, KrigingModel, Variogram
 
 
 class VarioButtonsWidget(QtWidgets.QWidget):
@@ -103,3 +104,56 @@ class KrigingButtonsWidget(QtWidgets.QWidget):
         """
         button = self.findChild(QtWidgets.QRadioButton, state)
         button.setChecked(True)
+
+
+class BackendButtonsWidget(QtWidgets.QWidget):
+    """
+    Виджет кнопок с выбором места вычисления кригинга
+    """
+
+    _BACKEND_BTN_IDS = {
+        1: Backend.AUTO,
+        2: Backend.REMOTE,
+        3: Backend.LOCAL,
+    }
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        layout = QtWidgets.QGridLayout()
+        layout.addWidget(QtWidgets.QLabel("Вычисление"))
+        self.setLayout(layout)
+
+        self.btn_group = QtWidgets.QButtonGroup()
+
+        auto_radio = QtWidgets.QRadioButton(Backend.AUTO, self)
+        auto_radio.setObjectName(Backend.AUTO)
+        self.btn_group.addButton(auto_radio, 1)
+        layout.addWidget(auto_radio)
+
+        remote_radio = QtWidgets.QRadioButton(Backend.REMOTE, self)
+        remote_radio.setObjectName(Backend.REMOTE)
+        self.btn_group.addButton(remote_radio, 2)
+        layout.addWidget(remote_radio)
+
+        local_radio = QtWidgets.QRadioButton(Backend.LOCAL, self)
+        local_radio.setObjectName(Backend.LOCAL)
+        self.btn_group.addButton(local_radio, 3)
+        layout.addWidget(local_radio)
+
+        self.state = settings.local_engine.BACKEND
+
+    @property
+    def state(self) -> Backend | None:
+        """
+        Получить состояние виджета
+        """
+        return self._BACKEND_BTN_IDS.get(self.btn_group.checkedId())
+
+    @state.setter
+    def state(self, state: Backend) -> None:
+        """
+        Определить состояние объекта
+        """
+        button = self.findChild(QtWidgets.QRadioButton, state)
+        button.setChecked(True)
@@ -0,0 +1,141 @@
+from pathlib import Path
+from uuid import UUID
+
+from PySide6 import QtCore, QtWidgets
+
+from service.trace import TRACER, Span
+
+CATEGORY_NAMES = {
+    "http": "сеть",
+    "wait": "ожидание",
+    "serialize": "сериализация",
+    "parse": "разбор",
+    "validate": "проверка",
+    "compute": "вычисление",
+    "render": "рисование",
+    "export": "экспорт",
+}
+
+
+class DiagnosticsWidget(QtWidgets.QWidget):
+    """
+    Виджет замеров этапов процесса кригинга.
+
+    Показывает замеры текущего процесса (или последние замеры), сохраняет
+    их в формате Chrome trace и включает профилирование следующего запуска
+    """
+
+    summary_signal = QtCore.Signal(str)
+
+    COLUMNS = ("Процесс", "Этап", "Категория", "Время, мс", "Отправлено, байт", "Получено, байт")
+    MAX_ROWS = 500
+    REFRESH_MS = 1000
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.process_id = None
+
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+
+        self.summary_label = QtWidgets.QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        layout.addWidget(self.table)
+
+        buttons_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(buttons_layout)
+
+        self.profile_check = QtWidgets.QCheckBox("Профилировать следующий запуск")
+        self.profile_check.toggled.connect(self._set_profile)
+        buttons_layout.addWidget(self.profile_check)
+
+        self.export_btn = QtWidgets.QPushButton("Сохранить trace")
+        self.export_btn.clicked.connect(self.export)
+        buttons_layout.addWidget(self.export_btn)
+
+        self.clear_btn = QtWidgets.QPushButton("Очистить")
+        self.clear_btn.clicked.connect(self.clear)
+        buttons_layout.addWidget(self.clear_btn)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+    @QtCore.Slot(UUID)
+    def process(self, process_id: UUID) -> None:
+        """
+        Показывать замеры процесса
+        """
+        self.process_id = process_id
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Обновить сводку и, если виджет виден, таблицу замеров
+        """
+        if not TRACER.profile_next and self.profile_check.isChecked():
+            self.profile_check.setChecked(False)
+
+        if self.process_id is not None:
+            summary = self.summary(self.process_id)
+            self.summary_label.setText(summary)
+            self.summary_signal.emit(summary)
+        if not self.isVisible():
+            return
+
+        if self.process_id is not None:
+            spans = TRACER.process_spans(self.process_id)
+        else:
+            spans = list(TRACER.spans)
+        self._fill(spans[-self.MAX_ROWS :])
+
+    @staticmethod
+    def summary(process_id: UUID) -> str:
+        """
+        Сводка времени процесса по категориям этапов
+        """
+        totals = TRACER.summary(process_id)
+        parts = [f"{name} {totals[category]:.2f} с" for category, name in CATEGORY_NAMES.items() if category in totals]
+        return f"Процесс {process_id}: " + (", ".join(parts) or "нет замеров")
+
+    def export(self) -> None:
+        """
+        Сохранить замеры в json файл формата Chrome trace
+        """
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Сохранить trace", "trace.json", "Trace (*.json)")
+        if not path:
+            return
+        try:
+            TRACER.export(Path(path))
+        except OSError as ex:
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+            error_msg.setText(str(ex))
+            error_msg.exec()
+
+    def clear(self) -> None:
+        TRACER.spans.clear()
+        self.refresh()
+
+    def _set_profile(self, is_checked: bool) -> None:
+        TRACER.profile_next = is_checked
+
+    def _fill(self, spans: list[Span]) -> None:
+        self.table.setRowCount(len(spans))
+        for row, span in enumerate(reversed(spans)):
+            values = (
+                str(span.process_id or ""),
+                span.name,
+                CATEGORY_NAMES.get(span.category, span.category),
+                f"{span.duration * 1000:.1f}",
+                str(span.args.get("bytes_sent") or ""),
+                str(span.args.get("bytes_received") or ""),
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(value))
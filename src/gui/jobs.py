@@ -0,0 +1,175 @@
+from uuid import UUID
+
+from PySide6 import QtCore, QtWidgets
+
+from entity.kriging import GeoGrid, GeoGridValues
+from entity.states import ProcessStatus
+from service.executor import AsyncKrigingService
+from service.jobs import Job, JobScheduler
+from service.trace import TRACER
+
+from .tasks import TaskRunner
+
+
+class JobsWidget(QtWidgets.QWidget):
+    """
+    Виджет отслеживаемых процессов кригинга.
+
+    Все процессы опрашиваются общим расписанием `JobScheduler`,
+    результат выбранного завершенного процесса загружается из хранилища
+    и отправляется на рисование
+    """
+
+    job_signal = QtCore.Signal(object)
+    finished_signal = QtCore.Signal(object)
+    process_signal = QtCore.Signal(UUID)
+    process_result_signal = QtCore.Signal(UUID, GeoGridValues)
+
+    COLUMNS = ("Процесс", "Параметры", "Статус", "Время, с", "Точек", "Узлов", "Отправлено, байт", "Получено, байт")
+    REFRESH_MS = 1000
+
+    def __init__(self, kriging_service: AsyncKrigingService) -> None:
+        super().__init__()
+        self.scheduler = JobScheduler(kriging_service, on_change=self.job_signal.emit)
+        self.rows: dict[UUID, int] = {}
+        self.tasks = TaskRunner()
+
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().hide()
+        self.table.cellClicked.connect(self._on_row_clicked)
+        layout.addWidget(self.table)
+
+        buttons_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(buttons_layout)
+
+        self.remove_btn = QtWidgets.QPushButton("Убрать выбранные")
+        self.remove_btn.clicked.connect(self.remove_selected)
+        buttons_layout.addWidget(self.remove_btn)
+
+        self.clear_btn = QtWidgets.QPushButton("Убрать завершенные")
+        self.clear_btn.clicked.connect(self.remove_finished)
+        buttons_layout.addWidget(self.clear_btn)
+
+        self.job_signal.connect(self._on_job_changed, QtCore.Qt.ConnectionType.QueuedConnection)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self._refresh_pending)
+        self.timer.start()
+
+    @QtCore.Slot(UUID, object, str, object)
+    def track(self, process_id: UUID, grid: GeoGrid | None, description: str, points: int | None) -> None:
+        """
+        Добавить процесс в таблицу
+        """
+        job = self.scheduler.add(process_id, grid, description, points)
+        self._on_job_changed(job)
+
+    @QtCore.Slot(UUID)
+    def remove(self, process_id: UUID) -> None:
+        """
+        Перестать отслеживать процесс
+        """
+        self.scheduler.remove(process_id)
+        row = self.rows.get(process_id)
+        if row is not None:
+            self._remove_rows([row])
+
+    def remove_selected(self) -> None:
+        """
+        Перестать отслеживать выбранные процессы
+        """
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        for process_id, row in list(self.rows.items()):
+            if row in rows:
+                self.scheduler.remove(process_id)
+        self._remove_rows(rows)
+
+    def remove_finished(self) -> None:
+        """
+        Убрать завершенные процессы
+        """
+        rows = []
+        for process_id, row in list(self.rows.items()):
+            job = self.scheduler.jobs.get(process_id)
+            if job is None or job.is_done:
+                self.scheduler.remove(process_id)
+                rows.append(row)
+        self._remove_rows(sorted(rows, reverse=True))
+
+    def shutdown(self) -> None:
+        self.tasks.cancel()
+        self.scheduler.stop()
+
+    def _on_job_changed(self, job: Job) -> None:
+        if job.process_id not in self.scheduler.jobs:
+            return
+        row = self.rows.get(job.process_id)
+        if row is None:
+            row = self.rows[job.process_id] = self.table.rowCount()
+            self.table.insertRow(row)
+        self._fill(row, job)
+        if job.is_done:
+            self.finished_signal.emit(job)
+
+    def _refresh_pending(self) -> None:
+        for process_id, row in self.rows.items():
+            job = self.scheduler.jobs.get(process_id)
+            if job is not None and not job.is_done:
+                self._fill(row, job)
+
+    def _fill(self, row: int, job: Job) -> None:
+        if job.error is not None:
+            status = f"ошибка: {job.error}"
+        elif job.status == ProcessStatus.SUCCESS and not job.is_done:
+            status = "загрузка результата"
+        else:
+            status = job.status
+        sent, received = TRACER.transferred(job.process_id)
+        values = (
+            str(job.process_id),
+            job.description,
+            status,
+            f"{job.elapsed:.1f}",
+            str(job.points or ""),
+            str(job.nodes or ""),
+            str(sent or ""),
+            str(received or ""),
+        )
+        for column, value in enumerate(values):
+            self.table.setItem(row, column, QtWidgets.QTableWidgetItem(value))
+
+    def _remove_rows(self, rows: list[int]) -> None:
+        for row in rows:
+            self.table.removeRow(row)
+        process_ids = [process_id for process_id, _ in sorted(self.rows.items(), key=lambda item: item[1])]
+        self.rows = {}
+        for process_id in process_ids:
+            if process_id in self.scheduler.jobs:
+                self.rows[process_id] = len(self.rows)
+
+    def _on_row_clicked(self, row: int, column: int) -> None:
+        process_id = next((process_id for process_id, index in self.rows.items() if index == row), None)
+        job = self.scheduler.jobs.get(process_id)
+        if job is None:
+            return
+        self.process_signal.emit(job.process_id)
+        if job.is_done and job.error is None:
+            self.tasks.cancel()
+            self.tasks.run(
+                self.scheduler.load(job),
+                lambda result: self.process_result_signal.emit(job.process_id, result),
+                self._on_error,
+            )
+
+    def _on_error(self, error: Exception) -> None:
+        error_msg = QtWidgets.QMessageBox(self)
+        error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        error_msg.setText(str(error))
+        error_msg.exec()
@@ -1,14 +1,20 @@
-from PySide6 import QtWidgets
+from PySide6 import QtCore, QtGui, QtWidgets
 
 from gui.render import RenderWidget
-from service.kriging import KrigingService
+from service.executor import AsyncKrigingService
 
+from .diagnostics import DiagnosticsWidget
+from .jobs import JobsWidget
 from .process import KrigingProcessWidget, SearchProcessWidget
 
 
 class ApplicationWindow(QtWidgets.QMainWindow):
     """
-    Главное окно приложения
+    Главное окно приложения.
+
+    Сервис кригинга создается в пуле потоков после показа окна,
+    запущенные и найденные процессы отслеживаются в панели процессов,
+    замеры этапов показываются в строке состояния и панели диагностики
     """
 
     def __init__(self) -> None:
@@ -18,7 +24,7 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
 
-        kriging_service = KrigingService()
+        self.kriging_service = kriging_service = AsyncKrigingService()
 
         search_process = SearchProcessWidget(kriging_service)
         main_layout.addWidget(search_process)
@@ -29,6 +35,38 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         render_points = RenderWidget()
         main_layout.addWidget(render_points)
 
+        self.jobs = jobs = JobsWidget(kriging_service)
+        jobs_dock = QtWidgets.QDockWidget("Процессы", self)
+        jobs_dock.setWidget(jobs)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea.RightDockWidgetArea, jobs_dock)
+
+        diagnostics = DiagnosticsWidget()
+        diagnostics_dock = QtWidgets.QDockWidget("Диагностика", self)
+        diagnostics_dock.setWidget(diagnostics)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea.BottomDockWidgetArea, diagnostics_dock)
+        diagnostics_dock.hide()
+
+        view_menu = self.menuBar().addMenu("Вид")
+        view_menu.addAction(jobs_dock.toggleViewAction())
+        view_menu.addAction(diagnostics_dock.toggleViewAction())
+
         kriging_process.process_signal.connect(search_process.process)
+        kriging_process.process_signal.connect(diagnostics.process)
         kriging_process.process_result_signal.connect(render_points.show)
         search_process.search_signal.connect(kriging_process.define_kriging)
+        search_process.search_signal.connect(lambda process_id, data, result: diagnostics.process(process_id))
+        search_process.track_signal.connect(jobs.track)
+        kriging_process.job_signal.connect(jobs.track)
+        kriging_process.cancel_job_signal.connect(jobs.remove)
+        jobs.finished_signal.connect(kriging_process.job_finished)
+        jobs.process_signal.connect(search_process.process)
+        jobs.process_signal.connect(diagnostics.process)
+        jobs.process_result_signal.connect(render_points.show)
+        diagnostics.summary_signal.connect(self.statusBar().showMessage)
+
+        QtCore.QTimer.singleShot(0, self.kriging_service.warm_up)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.jobs.shutdown()
+        self.kriging_service.shutdown()
+        super().closeEvent(event)
@@ -1,15 +1,31 @@
+import re
+from collections.abc import Callable
 from pathlib import Path
 from uuid import UUID
 
-import numpy as np
 from pydantic import ValidationError
 from PySide6 import QtCore, QtGui, QtWidgets
 
-from entity.kriging import GeoGrid, GeoKrigingData
-from entity.point import GeoPoint, GeoPointFeature, GeoPointFeatureCollection, GeoPointProperties
-from service.kriging import KrigingService
+from config import settings
+from entity.kriging import GeoGrid, GeoGridValues, GeoKrigingData
+from entity.point import GeoPointSet
+from entity.states import Backend, Budget, ExportFormat, KrigingModel, Variogram
+from service.executor import AsyncKrigingService
+from service.jobs import Job
+from service.decimation import DecimationReport, PointsDecimator
+from service.loader import PointsFileLoader
+from service.preflight import CostEstimate, format_bytes
+from service.trace import TRACER
 
-from .buttons import KrigingButtonsWidget, VarioButtonsWidget
+from .buttons import BackendButtonsWidget, KrigingButtonsWidget, VarioButtonsWidget
+from .tasks import TaskRunner
+
+EXPORT_FILTERS = {
+    ExportFormat.NPY: "NumPy",
+    ExportFormat.NPZ: "NumPy zip",
+    ExportFormat.NETCDF: "NetCDF",
+    ExportFormat.GEOTIFF: "GeoTIFF",
+}
 
 
 class KrigingProcessWidget(QtWidgets.QWidget):
@@ -18,19 +34,30 @@ class KrigingProcessWidget(QtWidgets.QWidget):
     """
 
     process_signal = QtCore.Signal(UUID)
-    process_result_signal = QtCore.Signal(GeoPointFeatureCollection, GeoGrid)
+    process_result_signal = QtCore.Signal(UUID, GeoGridValues)
+    points_progress_signal = QtCore.Signal(int)
+    job_signal = QtCore.Signal(UUID, object, str, object)
+    cancel_job_signal = QtCore.Signal(UUID)
+
+    ESTIMATE_DELAY_MS = 300
 
-    def __init__(self, kriging_service: KrigingService) -> None:
+    def __init__(self, kriging_service: AsyncKrigingService) -> None:
         super().__init__()
         self.kriging_service = kriging_service
+        self.tasks = TaskRunner()
+        self.points_loader = PointsFileLoader(settings.points_file)
+        self.points_decimator = PointsDecimator(settings.decimation)
         self.points_path = None
+        self.file_points = None
         self.input_points = None
         self.result_points = None
         self.process_id = None
-
-        self.timer_result = QtCore.QTimer()
-        self.timer_result.setInterval(2000)
-        self.timer_result.timeout.connect(self._get_result_process)
+        self.process_grid = None
+        self.process_description = ""
+        self.is_waiting = False
+        self.estimate: tuple[tuple, CostEstimate] | None = None
+        self.estimate_tasks = TaskRunner()
+        self.start_estimate_tasks = TaskRunner()
 
         layout = QtWidgets.QVBoxLayout()
         layout.addWidget(QtWidgets.QLabel("Процесс кригинга"))
@@ -43,18 +70,81 @@ class KrigingProcessWidget(QtWidgets.QWidget):
         radio_buttons_layout.addWidget(self.vario_buttons)
         self.kriging_buttons = KrigingButtonsWidget()
         radio_buttons_layout.addWidget(self.kriging_buttons)
+        self.backend_buttons = BackendButtonsWidget()
+        radio_buttons_layout.addWidget(self.backend_buttons)
 
         self.geo_grid = GeoGridWidget()
         layout.addWidget(self.geo_grid)
+        self.estimate_timer = QtCore.QTimer(self)
+        self.estimate_timer.setSingleShot(True)
+        self.estimate_timer.setInterval(self.ESTIMATE_DELAY_MS)
+        self.estimate_timer.timeout.connect(self.update_estimate)
+        self.geo_grid.changed.connect(self.estimate_timer.start)
+        self.kriging_buttons.btn_group.idToggled.connect(lambda *_: self.estimate_timer.start())
+        self.backend_buttons.btn_group.idToggled.connect(lambda *_: self.estimate_timer.start())
 
         self.browse_points_btn = QtWidgets.QPushButton("Выбрать файл с точками")
         self.browse_points_btn.clicked.connect(self.open_points_file)
         layout.addWidget(self.browse_points_btn)
 
+        decimation_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(decimation_layout)
+
+        self.merge_check = QtWidgets.QCheckBox("Объединять дубликаты")
+        self.merge_check.setChecked(settings.decimation.MERGE)
+        self.merge_check.toggled.connect(self.prepare_points)
+        decimation_layout.addWidget(self.merge_check)
+
+        self.thin_check = QtWidgets.QCheckBox("Прореживать до")
+        self.thin_check.setChecked(settings.decimation.THIN)
+        self.thin_check.toggled.connect(self.prepare_points)
+        decimation_layout.addWidget(self.thin_check)
+
+        self.thin_target = QtWidgets.QSpinBox()
+        self.thin_target.setRange(1, 10**8)
+        self.thin_target.setValue(settings.decimation.THIN_TARGET)
+        self.thin_target.setSuffix(" точек")
+        self.thin_target.editingFinished.connect(self.prepare_points)
+        decimation_layout.addWidget(self.thin_target)
+
+        self.points_progress = QtWidgets.QProgressBar()
+        self.points_progress.hide()
+        layout.addWidget(self.points_progress)
+        self.points_progress_signal.connect(
+            self.points_progress.setValue, QtCore.Qt.ConnectionType.QueuedConnection
+        )
+
+        process_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(process_layout)
+
         self.start_btn = QtWidgets.QPushButton("Запустить процесс")
         self.start_btn.clicked.connect(self.start_process)
+        process_layout.addWidget(self.start_btn)
+
+        self.cancel_btn = QtWidgets.QPushButton("Отменить")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_process)
+        process_layout.addWidget(self.cancel_btn)
+
+        self.sweep_btn = QtWidgets.QPushButton("Перебор вариантов")
+        self.sweep_btn.clicked.connect(self.open_sweep)
+        process_layout.addWidget(self.sweep_btn)
+        self.sweep_widget = None
+
+        self.validation_btn = QtWidgets.QPushButton("Перекрестная проверка")
+        self.validation_btn.clicked.connect(self.open_validation)
+        process_layout.addWidget(self.validation_btn)
+        self.validation_widget = None
 
-        layout.addWidget(self.start_btn)
+        self.export_btn = QtWidgets.QPushButton("Экспорт результата")
+        self.export_btn.setEnabled(False)
+        self.export_btn.clicked.connect(self.export_result)
+        process_layout.addWidget(self.export_btn)
+
+        self.status_label = QtWidgets.QLabel()
+        layout.addWidget(self.status_label)
+
+        self.tasks.busy_changed.connect(self._set_busy)
 
     def open_points_file(self) -> None:
         """
@@ -62,13 +152,11 @@ class KrigingProcessWidget(QtWidgets.QWidget):
         """
         dialog = QtWidgets.QFileDialog(self)
         dialog.setFileMode(QtWidgets.QFileDialog.FileMode.ExistingFile)
-        dialog.setNameFilter("Text files (*.txt)")
+        extensions = " ".join(f"*{extension}" for extension in settings.points_file.EXTENSIONS)
+        dialog.setNameFilter(f"Point files ({extensions})")
         if dialog.exec():
             filenames = dialog.selectedFiles()
-            self.points_path = Path(filenames[0])
-            is_points_extracted = self._extract_points_from_file(self.points_path)
-            if is_points_extracted:
-                self.browse_points_btn.setText(self.points_path.name)
+            self._extract_points_from_file(Path(filenames[0]))
 
     def start_process(self) -> None:
         """
@@ -89,7 +177,7 @@ class KrigingProcessWidget(QtWidgets.QWidget):
             error_msg.exec()
             return
 
-        if not (self.points_path is None or self.input_points):
+        if self.input_points is None:
             error_msg.setText("Не выбран файл с точками")
             error_msg.exec()
             return
@@ -97,78 +185,356 @@ class KrigingProcessWidget(QtWidgets.QWidget):
         grid = self.geo_grid.state
         if grid is None:
             return
+        points, backend = self.input_points, self.backend_buttons.state
+        self._with_estimate(
+            points,
+            grid,
+            kriging_value,
+            backend,
+            lambda estimate: self._create_process(estimate, points, grid, vario_value, kriging_value, backend),
+        )
+
+    def _create_process(
+        self,
+        estimate: CostEstimate,
+        points: GeoPointSet,
+        grid: GeoGrid,
+        vario_value: Variogram,
+        kriging_value: KrigingModel,
+        backend: Backend | None,
+    ) -> None:
+        if not self._confirm_estimate(estimate):
+            return
 
-        self.process_id = self.kriging_service.create_process(
-            points=self.input_points,
-            grid=grid,
-            vario_type=vario_value,
-            kriging_type=kriging_value,
+        self.process_grid = grid
+        self.process_description = f"{vario_value}, {kriging_value}"
+        self.result_points = None
+        self.status_label.setText("Отправка точек и создание процесса")
+        TRACER.start_profile()
+        self.tasks.run(
+            self.kriging_service.create_process(
+                points=points,
+                grid=grid,
+                vario_type=vario_value,
+                kriging_type=kriging_value,
+                backend=backend,
+            ),
+            self._on_process_created,
+            self._on_error,
         )
-        self.process_signal.emit(self.process_id)
-        self.timer_result.start()
 
-    @QtCore.Slot(UUID, GeoKrigingData, GeoPointFeatureCollection)
-    def define_kriging(self, process_id: UUID, data: GeoKrigingData, result: GeoPointFeatureCollection) -> None:
+    def open_sweep(self) -> None:
+        """
+        Открыть перебор сочетаний вариограммы и метода кригинга для выбранных точек и сетки
+        """
+        if self.input_points is None:
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+            error_msg.setText("Не выбран файл с точками")
+            error_msg.exec()
+            return
+
+        grid = self.geo_grid.state
+        if grid is None:
+            return
+        points, backend = self.input_points, self.backend_buttons.state
+        self._with_estimate(
+            points,
+            grid,
+            self.kriging_buttons.state,
+            backend,
+            lambda estimate: self._open_sweep(estimate, points, grid, backend),
+        )
+
+    def _open_sweep(self, estimate: CostEstimate, points: GeoPointSet, grid: GeoGrid, backend: Backend | None) -> None:
+        if not self._confirm_estimate(estimate):
+            return
+
+        if self.sweep_widget is None:
+            from .sweep import SweepWidget
+
+            self.sweep_widget = SweepWidget(self.kriging_service)
+        self.sweep_widget.define_input(points, grid, backend)
+        self.sweep_widget.show()
+        self.sweep_widget.raise_()
+
+    def open_validation(self) -> None:
+        """
+        Открыть перекрестную проверку сочетаний вариограммы и метода кригинга для выбранных точек
+        """
+        if self.input_points is None:
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+            error_msg.setText("Не выбран файл с точками")
+            error_msg.exec()
+            return
+
+        if self.validation_widget is None:
+            from .validation import CrossValidationWidget
+
+            self.validation_widget = CrossValidationWidget(self.kriging_service)
+            self.validation_widget.selected_signal.connect(self.select_combination)
+        self.validation_widget.define_input(self.input_points)
+        self.validation_widget.show()
+        self.validation_widget.raise_()
+
+    def select_combination(self, vario_type: Variogram, kriging_type: KrigingModel) -> None:
+        """
+        Выбрать вариограмму и метод кригинга
+        """
+        self.vario_buttons.state = vario_type
+        self.kriging_buttons.state = kriging_type
+
+    def update_estimate(self) -> None:
+        """
+        Обновить оценку процесса для введенной сетки, оценка не обращается к серверу
+        и вычисляется в пуле потоков
+        """
+        self.estimate_timer.stop()
+        grid = self.geo_grid.preview
+        if grid is None:
+            self.estimate_tasks.cancel()
+            self.geo_grid.show_estimate(None)
+            return
+        self._with_estimate(self.input_points, grid, self.kriging_buttons.state, self.backend_buttons.state)
+
+    def _with_estimate(
+        self,
+        points: GeoPointSet | None,
+        grid: GeoGrid,
+        kriging_type: KrigingModel | None,
+        backend: Backend | None,
+        on_estimate: Callable[[CostEstimate], None] | None = None,
+    ) -> None:
+        """
+        Показать оценку процесса и передать ее в `on_estimate`.
+
+        Используется последняя оценка, если она вычислена для тех же точек, сетки,
+        метода и места вычисления, иначе оценка вычисляется в пуле потоков.
+        Оценка перед запуском выполняется отдельно от предварительной,
+        чтобы обновление предварительной оценки ее не отменяло
+        """
+        key = (points, grid, kriging_type, backend)
+        if self.estimate is not None:
+            (last_points, *last_key), estimate = self.estimate
+            if last_points is points and last_key == [grid, kriging_type, backend]:
+                self.geo_grid.show_estimate(estimate)
+                if on_estimate is not None:
+                    on_estimate(estimate)
+                return
+
+        def estimated(estimate: CostEstimate) -> None:
+            self.estimate = (key, estimate)
+            self.geo_grid.show_estimate(estimate)
+            if on_estimate is not None:
+                on_estimate(estimate)
+
+        tasks = self.estimate_tasks if on_estimate is None else self.start_estimate_tasks
+        tasks.cancel()
+        tasks.run(
+            self.kriging_service.estimate(points, grid, kriging_type, backend),
+            estimated,
+            self._on_error if on_estimate is not None else lambda error: self.geo_grid.show_estimate(None),
+        )
+
+    def _confirm_estimate(self, estimate: CostEstimate) -> bool:
+        """
+        Проверить бюджет процесса: при превышении мягкого - спросить, жесткого - запретить запуск
+        """
+        if estimate.budget == Budget.OK:
+            return True
+        reasons = "\n".join(estimate.reasons)
+        if estimate.budget == Budget.HARD:
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+            error_msg.setText(f"Процесс превышает бюджет:\n{reasons}")
+            error_msg.exec()
+            return False
+        answer = QtWidgets.QMessageBox.question(self, "Оценка процесса", f"{reasons}\nЗапустить процесс?")
+        return answer == QtWidgets.QMessageBox.StandardButton.Yes
+
+    def export_result(self) -> None:
+        """
+        Экспорт результата процесса в файл сетки
+        """
+        filters = {f"{name} (*.{extension})": extension for extension, name in EXPORT_FILTERS.items()}
+        path, selected = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Экспорт результата", str(self.process_id), ";;".join(filters)
+        )
+        if not path:
+            return
+        if path.rsplit(".", 1)[-1].lower() not in {*EXPORT_FILTERS, "tiff"}:
+            path = f"{path}.{filters.get(selected, ExportFormat.NPY)}"
+        self.status_label.setText(f"Экспорт в {Path(path).name}")
+        self.points_progress.setValue(0)
+        self.points_progress.show()
+        self.tasks.run(
+            self.kriging_service.export_result(
+                self.process_id, Path(path), self.result_points, progress=self.points_progress_signal.emit
+            ),
+            self._on_result_exported,
+            self._on_points_error,
+        )
+
+    def cancel_process(self) -> None:
+        """
+        Отмена ожидания процесса кригинга
+        """
+        self.tasks.cancel()
+        self.start_estimate_tasks.cancel()
+        if self.is_waiting:
+            self.is_waiting = False
+            self.cancel_job_signal.emit(self.process_id)
+            self._set_busy(False)
+        self.points_progress.hide()
+        self.status_label.setText("Отменено")
+        self._stop_profile()
+
+    @QtCore.Slot(UUID, GeoKrigingData, GeoGridValues)
+    def define_kriging(self, process_id: UUID, data: GeoKrigingData, result: GeoGridValues) -> None:
         """
         Определить данные кригинга
         """
-        self.input_points = self.kriging_service.get_points(data.points_id)
         self.result_points = result
         self.process_id = process_id
+        self.process_grid = data.grid
 
         self.vario_buttons.state = data.vario
         self.kriging_buttons.state = data.kriging
         self.geo_grid.state = data.grid
 
-        self.process_result_signal.emit(self.result_points, self.geo_grid.state)
+        self.process_result_signal.emit(self.process_id, self.result_points)
+        self.tasks.run(self.kriging_service.get_points(data.points_id), self._on_points_loaded, self._on_error)
 
-    def _extract_points_from_file(self, path: Path) -> bool:
+    def _extract_points_from_file(self, path: Path) -> None:
         """
         Получить точки из файла
         """
+        self.status_label.setText(f"Загрузка точек из {path.name}")
+        self.points_progress.setValue(0)
+        self.points_progress.show()
+        self.tasks.run(
+            self.kriging_service.submit_cancellable(
+                self.points_loader.load, path, progress=self.points_progress_signal.emit
+            ),
+            lambda points: self._on_points_extracted(path, points),
+            self._on_points_error,
+        )
+
+    def _on_points_extracted(self, path: Path, points: GeoPointSet) -> None:
+        self.file_points = points
+        self.points_path = path
+        self.browse_points_btn.setText(path.name)
+        self.points_progress.hide()
+        self.prepare_points()
+
+    def prepare_points(self) -> None:
+        """
+        Объединить дубликаты и проредить загруженные точки, если это выбрано
+        """
+        if self.file_points is None:
+            return
+        merge = self.merge_check.isChecked()
+        target = self.thin_target.value() if self.thin_check.isChecked() else None
+        if not merge and target is None:
+            self._on_points_prepared(self.file_points, None)
+            return
+
+        self.status_label.setText("Подготовка точек")
+        self.tasks.run(
+            self.kriging_service.submit_cancellable(self.points_decimator.decimate, self.file_points, merge, target),
+            lambda result: self._on_points_prepared(*result),
+            self._on_points_error,
+        )
+
+    def _on_points_prepared(self, points: GeoPointSet, report: DecimationReport | None) -> None:
+        self.input_points = points
+        if report is None:
+            self.status_label.setText(f"Загружено точек: {len(points)}")
+        else:
+            self.status_label.setText(f"Загружено {report.summary()}")
+        self.update_estimate()
+
+    def _on_points_error(self, error: Exception) -> None:
+        self.points_progress.hide()
+        self.status_label.setText("")
+
         error_msg = QtWidgets.QMessageBox(self)
         error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
-        try:
-            values = np.loadtxt(path, usecols=(0, 1, 2)).T
-        except ValueError as ex:
-            error_msg.setText(ex.args[0])
-            error_msg.exec()
-            return False
+        if isinstance(error, ValidationError):
+            error_msg.setText("\n".join(item["msg"] for item in error.errors()))
+        else:
+            error_msg.setText(str(error))
+        error_msg.exec()
+
+    @QtCore.Slot(object)
+    def job_finished(self, job: Job) -> None:
+        """
+        Завершение отслеживаемого процесса, результат загружается из хранилища
+        и показывается для последнего запущенного
+        """
+        if not self.is_waiting or job.process_id != self.process_id:
+            return
+        self.is_waiting = False
+        self._set_busy(self.tasks.is_busy)
+        if job.error is not None:
+            self._on_error(job.error)
+        else:
+            future = self.kriging_service.fetch_result(job.process_id, job.grid)
+            self.tasks.run(future, self._on_result_loaded, self._on_error)
+
+    def _on_process_created(self, process_id: UUID) -> None:
+        self.estimate = None
+        self.process_id = process_id
+        self.is_waiting = True
+        self.process_signal.emit(self.process_id)
+        status = "Ожидание результата"
+        sent = TRACER.transferred(process_id)[0]
+        self.status_label.setText(f"{status}, отправлено {format_bytes(sent)}" if sent else status)
+        self.job_signal.emit(self.process_id, self.process_grid, self.process_description, len(self.input_points))
+        self._set_busy(self.tasks.is_busy)
 
-        if len(values) != 3:
-            error_msg.setText("Файл с текстом должен содержать lat lon values")
-            error_msg.exec()
-            return False
+    def _on_result_loaded(self, result: GeoGridValues) -> None:
+        self.result_points = result
+        self.export_btn.setEnabled(not self.tasks.is_busy)
+        self.status_label.setText("Готово")
+        self.process_result_signal.emit(self.process_id, self.result_points)
+        self._stop_profile()
 
-        points = []
-        for i in range(len(values[0])):
-            try:
-                point = GeoPoint(
-                    coordinates=[values[1][i], values[0][i]],
-                    properties=GeoPointProperties(value=values[2][i]),
-                )
-                feature_point = GeoPointFeature(geometry=point)
-            except ValidationError as ex:
-                error_msg.setText("\n".join(f"{error['msg']} point index {i}" for error in ex.errors()))
-                error_msg.exec()
-                return False
-            points.append(feature_point)
+    def _on_result_exported(self, path: Path) -> None:
+        self.points_progress.hide()
+        self.status_label.setText(f"Результат сохранен в {path}")
 
-        self.input_points = GeoPointFeatureCollection(features=points)
-        return True
+    def _on_points_loaded(self, points: GeoPointSet) -> None:
+        self.file_points = self.input_points = points
+        self.update_estimate()
 
-    def _get_result_process(self) -> None:
+    def _on_error(self, error: Exception) -> None:
+        self.tasks.cancel()
+        self.status_label.setText("Ошибка")
+        self._stop_profile()
+
+        error_msg = QtWidgets.QMessageBox(self)
+        error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        error_msg.setText(str(error))
+        error_msg.exec()
+
+    def _stop_profile(self) -> None:
         """
-        Получить результат кригинга
+        Сохранить профиль запуска, если он снимался
         """
-        process_status = self.kriging_service.get_process_status(self.process_id)
+        path = TRACER.stop_profile(self.process_id)
+        if path is not None:
+            self.status_label.setText(f"{self.status_label.text()}, профиль сохранен в {path}")
 
-        if process_status != "success":
-            return None
-
-        self.result_points = self.kriging_service.get_result_process(self.process_id)
-        self.process_result_signal.emit(self.result_points, self.geo_grid.state)
-        self.timer_result.stop()
+    def _set_busy(self, is_busy: bool) -> None:
+        self.start_btn.setEnabled(not is_busy)
+        self.browse_points_btn.setEnabled(not is_busy)
+        self.merge_check.setEnabled(not is_busy)
+        self.thin_check.setEnabled(not is_busy)
+        self.thin_target.setEnabled(not is_busy)
+        self.cancel_btn.setEnabled(is_busy or self.is_waiting)
+        self.export_btn.setEnabled(not is_busy and self.result_points is not None)
 
 
 class SearchProcessWidget(QtWidgets.QWidget):
@@ -176,62 +542,100 @@ class SearchProcessWidget(QtWidgets.QWidget):
     Виджет поиска процесса кригинга
     """
 
-    search_signal = QtCore.Signal(UUID, GeoKrigingData, GeoPointFeatureCollection)
+    search_signal = QtCore.Signal(UUID, GeoKrigingData, GeoGridValues)
+    track_signal = QtCore.Signal(UUID, object, str, object)
 
-    def __init__(self, kriging_service: KrigingService) -> None:
+    def __init__(self, kriging_service: AsyncKrigingService) -> None:
         super().__init__()
 
         self.kriging_service = kriging_service
+        self.tasks = TaskRunner()
 
         layout = QtWidgets.QHBoxLayout()
         layout.addWidget(QtWidgets.QLabel("Поиск процесса кригинга"))
         self.setLayout(layout)
 
         self.search_line = QtWidgets.QLineEdit()
-        self.search_line.setPlaceholderText("uuid")
+        self.search_line.setPlaceholderText("uuid, несколько через запятую")
         layout.addWidget(self.search_line)
 
         self.search_btn = QtWidgets.QPushButton("Поиск")
         layout.addWidget(self.search_btn)
         self.search_btn.clicked.connect(self.search)
 
+        self.cancel_btn = QtWidgets.QPushButton("Отменить")
+        self.cancel_btn.setEnabled(False)
+        layout.addWidget(self.cancel_btn)
+        self.cancel_btn.clicked.connect(self.tasks.cancel)
+
+        self.tasks.busy_changed.connect(self._set_busy)
+
     def search(self) -> None:
         """
-        Поиск процесса
+        Поиск процесса, несколько процессов добавляются в список процессов
         """
         error_msg = QtWidgets.QMessageBox(self)
         error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
         try:
-            uuid = UUID(self.search_line.text().replace(" ", ""))
+            texts = re.split(r"[,;]", self.search_line.text())
+            uuids = [UUID(text.replace(" ", "")) for text in texts if text.strip()]
         except ValueError:
             error_msg.setText("Некорректный UUID")
             error_msg.exec()
             return
-
-        try:
-            process_status = self.kriging_service.get_process_status(uuid)
-            if process_status != "success":
-                error_msg.setText("Процесс еще не завершен")
-                error_msg.exec()
-                return
-            process_data = self.kriging_service.get_process_data(uuid)
-            process_result = self.kriging_service.get_result_process(uuid)
-            self.search_signal.emit(uuid, process_data, process_result)
-        except self.kriging_service.EXCEPTIONS.NotFoundError:
-            error_msg.setText("Процесс не найден")
-            error_msg.exec()
+        if not uuids:
             return
+        if len(uuids) > 1:
+            for uuid in uuids:
+                self.track_signal.emit(uuid, None, "", None)
+            return
+
+        uuid = uuids[0]
+        self.tasks.run(
+            self.kriging_service.load_process(uuid),
+            lambda result: self._on_process_loaded(uuid, result),
+            self._on_error,
+        )
 
     @QtCore.Slot(UUID)
     def process(self, process_id: UUID) -> None:
-        self.search_line.setText(process_id)
+        self.search_line.setText(str(process_id))
+
+    def _on_process_loaded(self, process_id: UUID, result: tuple[GeoKrigingData, GeoGridValues] | None) -> None:
+        if result is None:
+            self.track_signal.emit(process_id, None, "", None)
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Information)
+            error_msg.setText("Процесс еще не завершен и добавлен в список процессов")
+            error_msg.exec()
+            return
+        self.search_signal.emit(process_id, *result)
+
+    def _on_error(self, error: Exception) -> None:
+        error_msg = QtWidgets.QMessageBox(self)
+        error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        if isinstance(error, self.kriging_service.EXCEPTIONS.NotFoundError):
+            error_msg.setText("Процесс не найден")
+        else:
+            error_msg.setText(str(error))
+        error_msg.exec()
+
+    def _set_busy(self, is_busy: bool) -> None:
+        self.search_btn.setEnabled(not is_busy)
+        self.cancel_btn.setEnabled(is_busy)
 
 
 class GeoGridWidget(QtWidgets.QWidget):
     """
-    Виджет геопространственной сетки интерполяции
+    Виджет геопространственной сетки интерполяции.
+
+    Под полями показывается оценка процесса для введенной сетки
     """
 
+    changed = QtCore.Signal()
+
+    BUDGET_COLORS = {Budget.OK: "", Budget.SOFT: "color: darkorange", Budget.HARD: "color: red"}
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -285,6 +689,13 @@ class GeoGridWidget(QtWidgets.QWidget):
         self.lon_step.setPlaceholderText("step")
         self.lon_lines = [self.lon_start, self.lon_stop, self.lon_step]
 
+        for line in (*self.lat_lines, *self.lon_lines):
+            line.textChanged.connect(self.changed)
+
+        self.estimate_label = QtWidgets.QLabel()
+        self.estimate_label.setWordWrap(True)
+        layout.addWidget(self.estimate_label)
+
         # test data
         # self.lat_start.setText("47")
         # self.lat_stop.setText("56,1")
@@ -299,20 +710,54 @@ class GeoGridWidget(QtWidgets.QWidget):
         """
         Получить состояние виджета
         """
-        error_msg = QtWidgets.QMessageBox(self)
-        error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        grid, error = self._parse()
+        if error is not None:
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+            error_msg.setText(error)
+            error_msg.exec()
+        return grid
+
+    @property
+    def preview(self) -> GeoGrid | None:
+        """
+        Сетка из полей без сообщений об ошибках
+        """
+        return self._parse()[0]
 
+    def show_estimate(self, estimate: CostEstimate | None) -> None:
+        """
+        Показать оценку процесса
+        """
+        if estimate is None:
+            self.estimate_label.clear()
+            return
+
+        if estimate.seconds is None:
+            seconds = "время неизвестно"
+        else:
+            seconds = f"время ~{estimate.seconds:.1f} с по {estimate.runs} запускам"
+        where = "локально" if estimate.backend == Backend.LOCAL else "на сервере"
+        lines = [
+            f"Узлов: {estimate.nodes}, {where}, {seconds}",
+            f"Запрос: {format_bytes(estimate.request_bytes)}, ответ: {format_bytes(estimate.response_bytes)}, "
+            f"память: {format_bytes(estimate.memory_bytes)}",
+            *estimate.reasons,
+        ]
+        self.estimate_label.setText("\n".join(lines))
+        self.estimate_label.setStyleSheet(self.BUDGET_COLORS[estimate.budget])
+
+    def _parse(self) -> tuple[GeoGrid | None, str | None]:
+        """
+        Сетка из полей или текст ошибки
+        """
         lat_texts = [line.text() for line in self.lat_lines]
         if not all(lat_texts):
-            error_msg.setText("Введите все данные о широте")
-            error_msg.exec()
-            return
+            return None, "Введите все данные о широте"
 
         lon_texts = [line.text() for line in self.lon_lines]
         if not all(lon_texts):
-            error_msg.setText("Введите все данные о долготе")
-            error_msg.exec()
-            return
+            return None, "Введите все данные о долготе"
 
         lat_values = list(value[0] for value in map(self.locale.toDouble, lat_texts))
         if (
@@ -320,9 +765,7 @@ class GeoGridWidget(QtWidgets.QWidget):
             or (not (-90 <= lat_values[0] <= 90) or not (-90 <= lat_values[1] <= 90))
             or (lat_values[2] < 0.1 or lat_values[2] > lat_values[1] - lat_values[0])
         ):
-            error_msg.setText("Некорректные данные широты")
-            error_msg.exec()
-            return
+            return None, "Некорректные данные широты"
 
         lon_values = list(value[0] for value in map(self.locale.toDouble, lon_texts))
         if (
@@ -330,11 +773,9 @@ class GeoGridWidget(QtWidgets.QWidget):
             or (not (-180 <= lon_values[0] <= 180) or not (-180 <= lon_values[1] <= 180))
             or (lon_values[2] < 0.1 or lon_values[2] > lon_values[1] - lon_values[0])
         ):
-            error_msg.setText("Некорректные данные долготы")
-            error_msg.exec()
-            return
+            return None, "Некорректные данные долготы"
 
-        return GeoGrid(lat=lat_values, lon=lon_values)
+        return GeoGrid(lat=lat_values, lon=lon_values), None
 
     @state.setter
     def state(self, grid: GeoGrid) -> None:
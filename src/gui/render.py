@@ -1,61 +1,224 @@
+import math
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+from uuid import UUID
+
 import numpy as np
-from matplotlib import pyplot as plt
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from PySide6 import QtCore, QtWidgets
 
-from entity.kriging import GeoGrid
-from entity.point import GeoPointFeatureCollection
+from config import settings
+from entity.kriging import GeoGridValues
+from entity.states import RenderMode
+from service.trace import TRACER
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.contour import ContourSet
 
 
 class RenderWidget(QtWidgets.QWidget):
     """
-    Виджет рисования точек координат
+    Виджет рисования точек координат.
+
+    Небольшие сетки рисуются изолиниями, большие - растром, который
+    прореживается до размера области рисования и пересчитывается
+    при масштабировании и сдвиге.
+
+    Оси, растр и шкала создаются один раз и обновляются на месте,
+    изолинии последних результатов хранятся по идентификатору процесса.
+    Matplotlib загружается и холст создается при первом результате
     """
 
     def __init__(self) -> None:
         super().__init__()
 
-        layout = QtWidgets.QVBoxLayout()
-        self.setLayout(layout)
+        self.canvas_layout = QtWidgets.QVBoxLayout()
+        self.setLayout(self.canvas_layout)
         self.setMinimumHeight(100)
+        self.placeholder = QtWidgets.QLabel("Здесь появится результат кригинга")
+        self.placeholder.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.canvas_layout.addWidget(self.placeholder)
+
+        self.figure = None
+        self.canvas = None
+        self.ax = None
+        self.image = None
+        self.colorbar = None
+        self.contour = None
+        self.result = None
+        self.draw_request: tuple[float, UUID] | None = None
+        self.cache: OrderedDict[UUID, tuple[GeoGridValues, "ContourSet | None"]] = OrderedDict()
+
+    def _create_canvas(self) -> None:
+        """
+        Создать фигуру и холст matplotlib
+        """
+        from matplotlib import pyplot as plt
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg, NavigationToolbar2QT
+
         self.figure = plt.figure(layout="tight")
         self.canvas = FigureCanvasQTAgg(self.figure)
-        layout.addWidget(self.canvas)
+        self.canvas.mpl_connect("resize_event", self._on_resize)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas_layout.removeWidget(self.placeholder)
+        self.placeholder.deleteLater()
+        self.canvas_layout.addWidget(NavigationToolbar2QT(self.canvas, self))
+        self.canvas_layout.addWidget(self.canvas)
 
-    @QtCore.Slot(GeoPointFeatureCollection, GeoGrid)
-    def show(self, geo_points: GeoPointFeatureCollection, grid: GeoGrid) -> None:
+    @staticmethod
+    def render_mode(result: GeoGridValues) -> RenderMode:
         """
-        Изобразить точки
+        Способ рисования результата
         """
-        self.figure.clear()
+        config = settings.render
+        if config.MODE != RenderMode.AUTO:
+            return config.MODE
+        rows, cols = result.grid.shape
+        return RenderMode.RASTER if rows * cols > config.RASTER_MIN_NODES else RenderMode.CONTOUR
 
-        grid_lat = np.arange(*grid.lat)
-        grid_lon = np.arange(*grid.lon)
+    @QtCore.Slot(UUID, GeoGridValues)
+    def show(self, process_id: UUID, result: GeoGridValues) -> None:
+        """
+        Изобразить точки.
+
+        Этапы рисования замеряются, отрисовка холста - до события `draw_event`
+        """
+        with TRACER.process(process_id):
+            self._show(process_id, result)
+
+    def _show(self, process_id: UUID, result: GeoGridValues) -> None:
+        with TRACER.span("render_prepare", "render"):
+            if self.canvas is None:
+                self._create_canvas()
+            entry = self.cache.get(process_id)
+            contour = entry[1] if entry is not None and entry[0].grid == result.grid else None
 
-        points = {
-            (point.geometry.coordinates[0], point.geometry.coordinates[1]): point.geometry.properties.value
-            for point in geo_points.features
-        }
+            ax = self._axes()
+            if self.contour is not None:
+                self.contour.remove()
+                self.contour = None
+            self.image.set_visible(False)
+            self.result = result
 
-        values = []
-        max_value = float("-inf")
-        min_value = float("inf")
-        for lat in grid_lat:
-            tmp = []
-            for lon in grid_lon:
-                value = points[(lon, lat)]
-                max_value = max(max_value, value)
-                min_value = min(min_value, value)
-                tmp.append(value)
-            values.append(tmp)
+        mode = self.render_mode(result)
+        with TRACER.span(f"render_{mode}", "render", cached=contour is not None):
+            if mode == RenderMode.RASTER:
+                mappable = self._show_raster(ax, result)
+            else:
+                mappable = self.contour = self._show_contour(ax, result, contour)
 
-        levels = np.linspace(min_value, max_value)
+        with TRACER.span("render_colorbar", "render"):
+            if self.colorbar is None:
+                self.colorbar = self.figure.colorbar(mappable, label="Значения")
+            elif mappable is self.image and self.colorbar.mappable is self.image:
+                self.colorbar.update_normal(mappable)
+            else:
+                self._rebuild_colorbar(mappable)
 
-        ax = self.figure.add_subplot()
-        ax.set_xlabel("Долгота")
-        ax.set_ylabel("Широта")
+        self.cache[process_id] = (result, self.contour)
+        self.cache.move_to_end(process_id)
+        while len(self.cache) > settings.render.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        self.draw_request = (time.perf_counter(), process_id)
+        self.canvas.draw_idle()
 
-        co = ax.contourf(grid_lon, grid_lat, values, levels, cmap="coolwarm")
+    def _axes(self) -> "Axes":
+        """
+        Оси и растр, создаются при первом рисовании
+        """
+        if self.ax is None:
+            self.ax = self.figure.add_subplot()
+            self.ax.set_xlabel("Долгота")
+            self.ax.set_ylabel("Широта")
+            self.image = self.ax.imshow(
+                np.empty((1, 1)),
+                origin="lower",
+                aspect="auto",
+                interpolation="nearest",
+                cmap=settings.render.CMAP,
+            )
+            self.ax.set_autoscale_on(False)
+            self.ax.callbacks.connect("xlim_changed", self._resample)
+            self.ax.callbacks.connect("ylim_changed", self._resample)
+        return self.ax
+
+    def _rebuild_colorbar(self, mappable: object) -> None:
+        """
+        Построить шкалу заново в тех же осях.
 
-        self.figure.colorbar(co, label="Значения")
-        self.canvas.draw()
+        Шкала изолиний закрепляет уровни первого результата, `update_normal` их не сбрасывает
+        """
+        previous = self.colorbar.mappable
+        previous.callbacks.disconnect(previous.colorbar_cid)
+        previous.colorbar = previous.colorbar_cid = None
+
+        cax = self.colorbar.ax
+        cax.clear()
+        self.colorbar = self.figure.colorbar(mappable, cax=cax, label="Значения")
+
+    def _show_contour(self, ax: "Axes", result: GeoGridValues, contour: "ContourSet | None") -> "ContourSet":
+        lon_axis, lat_axis = result.grid.lon_axis, result.grid.lat_axis
+        ax.set_xlim(lon_axis[0], lon_axis[-1])
+        ax.set_ylim(lat_axis[0], lat_axis[-1])
+        if contour is not None:
+            ax.add_collection(contour, autolim=False)
+            return contour
+
+        levels = np.linspace(result.min, result.max, settings.render.CONTOUR_LEVELS)
+        values = np.ma.masked_invalid(result.values)
+        return ax.contourf(lon_axis, lat_axis, values, levels, cmap=settings.render.CMAP)
+
+    def _show_raster(self, ax: "Axes", result: GeoGridValues) -> object:
+        from matplotlib.colors import Normalize
+
+        lon_start, _, lon_step = result.grid.lon
+        lat_start, _, lat_step = result.grid.lat
+        rows, cols = result.grid.shape
+
+        self.image.set_norm(Normalize(result.min, result.max))
+        self.image.set_visible(True)
+        ax.set_xlim(lon_start - lon_step / 2, lon_start + (cols - 0.5) * lon_step)
+        ax.set_ylim(lat_start - lat_step / 2, lat_start + (rows - 0.5) * lat_step)
+        self._resample(ax)
+        return self.image
+
+    def _on_draw(self, event: object) -> None:
+        if self.draw_request is not None:
+            start, process_id = self.draw_request
+            self.draw_request = None
+            TRACER.add("render_draw", "render", start, process_id)
+
+    def _on_resize(self, event: object) -> None:
+        if self.ax is not None:
+            self._resample(self.ax)
+
+    def _resample(self, ax: "Axes") -> None:
+        """
+        Взять видимую часть сетки с шагом, при котором на пиксель приходится не больше одного узла
+        """
+        if self.image is None or not self.image.get_visible() or self.result is None:
+            return
+        grid = self.result.grid
+        rows, row_stride, row_extent = self._axis_window(ax.get_ylim(), grid.lat, grid.shape[0], ax.bbox.height)
+        cols, col_stride, col_extent = self._axis_window(ax.get_xlim(), grid.lon, grid.shape[1], ax.bbox.width)
+
+        values = self.result.values[rows.start : rows.stop : row_stride, cols.start : cols.stop : col_stride]
+        self.image.set_data(np.ma.masked_invalid(values))
+        self.image.set_extent((*col_extent, *row_extent))
+
+    @staticmethod
+    def _axis_window(
+        limits: tuple[float, float], axis: list[float], size: int, pixels: float
+    ) -> tuple[slice, int, tuple[float, float]]:
+        """
+        Видимые узлы оси, шаг прореживания и границы полученного растра
+        """
+        start, _, step = axis
+        low, high = sorted(limits)
+        first = min(max(math.floor((low - start) / step + 0.5), 0), size - 1)
+        last = min(max(math.ceil((high - start) / step - 0.5), first), size - 1)
+        stride = max(math.ceil((last - first + 1) / max(pixels, 1)), 1)
+        count = (last - first) // stride + 1
+        extent = (start + (first - 0.5) * step, start + (first + count * stride - 0.5) * step)
+        return slice(first, first + count * stride), stride, extent
@@ -0,0 +1,213 @@
+from uuid import UUID
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from PySide6 import QtCore, QtWidgets
+
+from entity.kriging import GeoGrid, GeoGridValues
+from entity.point import GeoPointSet
+from entity.states import Backend, KrigingModel, Variogram
+from service.executor import AsyncKrigingService
+
+from .tasks import TaskRunner
+
+
+class SweepWidget(QtWidgets.QWidget):
+    """
+    Виджет перебора сочетаний вариограммы и метода кригинга.
+
+    Все сочетания считаются одним набором процессов, результаты
+    рисуются в таблице графиков по мере завершения
+    """
+
+    result_signal = QtCore.Signal(object, object)
+
+    def __init__(self, kriging_service: AsyncKrigingService) -> None:
+        super().__init__()
+        self.setWindowTitle("Перебор вариантов кригинга")
+        self.kriging_service = kriging_service
+        self.tasks = TaskRunner()
+        self.points = None
+        self.grid = None
+        self.backend = None
+        self.processes: dict[UUID, tuple[Variogram, KrigingModel]] = {}
+        self.errors: dict[tuple[Variogram, KrigingModel], Exception] = {}
+        self.finished: set[UUID] = set()
+        self.axes: dict[tuple[Variogram, KrigingModel], object] = {}
+
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+
+        options_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(options_layout)
+
+        vario_layout = QtWidgets.QVBoxLayout()
+        vario_layout.addWidget(QtWidgets.QLabel("Вариограммы"))
+        options_layout.addLayout(vario_layout)
+        self.vario_boxes = {}
+        for vario in Variogram:
+            box = QtWidgets.QCheckBox(vario, self)
+            box.setChecked(True)
+            vario_layout.addWidget(box)
+            self.vario_boxes[vario] = box
+
+        kriging_layout = QtWidgets.QVBoxLayout()
+        kriging_layout.addWidget(QtWidgets.QLabel("Методы кригинга"))
+        options_layout.addLayout(kriging_layout)
+        self.kriging_boxes = {}
+        for kriging in KrigingModel:
+            box = QtWidgets.QCheckBox(kriging, self)
+            box.setChecked(True)
+            kriging_layout.addWidget(box)
+            self.kriging_boxes[kriging] = box
+
+        process_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(process_layout)
+
+        self.start_btn = QtWidgets.QPushButton("Запустить перебор")
+        self.start_btn.clicked.connect(self.start)
+        process_layout.addWidget(self.start_btn)
+
+        self.cancel_btn = QtWidgets.QPushButton("Отменить")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+        process_layout.addWidget(self.cancel_btn)
+
+        self.status_label = QtWidgets.QLabel()
+        layout.addWidget(self.status_label)
+
+        self.figure = plt.figure(layout="tight")
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.canvas.setMinimumSize(600, 400)
+        layout.addWidget(self.canvas)
+
+        self.result_signal.connect(self._on_result, QtCore.Qt.ConnectionType.QueuedConnection)
+        self.tasks.busy_changed.connect(self._set_busy)
+
+    def define_input(self, points: GeoPointSet, grid: GeoGrid, backend: Backend | None) -> None:
+        """
+        Определить точки и сетку перебора
+        """
+        self.points = points
+        self.grid = grid
+        self.backend = backend
+        self.status_label.setText(f"Точек: {len(points)}, сетка {grid.shape[0]}x{grid.shape[1]}")
+
+    @property
+    def combinations(self) -> list[tuple[Variogram, KrigingModel]]:
+        """
+        Выбранные сочетания вариограммы и метода кригинга
+        """
+        varios = [vario for vario, box in self.vario_boxes.items() if box.isChecked()]
+        krigings = [kriging for kriging, box in self.kriging_boxes.items() if box.isChecked()]
+        return [(vario, kriging) for vario in varios for kriging in krigings]
+
+    def start(self) -> None:
+        """
+        Запуск перебора
+        """
+        combinations = self.combinations
+        if self.points is None or self.grid is None or not combinations:
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+            error_msg.setText("Не выбраны точки, сетка или сочетания")
+            error_msg.exec()
+            return
+
+        self._prepare_axes(combinations)
+        self.processes = {}
+        self.errors = {}
+        self.finished = set()
+        self.status_label.setText(f"Создание процессов: {len(combinations)}")
+        self.tasks.run(
+            self.kriging_service.create_sweep(self.points, self.grid, combinations, self.backend),
+            self._on_processes_created,
+            self._on_error,
+        )
+
+    def cancel(self) -> None:
+        """
+        Отмена ожидания перебора
+        """
+        self.tasks.cancel()
+        self.status_label.setText("Отменено")
+
+    def _prepare_axes(self, combinations: list[tuple[Variogram, KrigingModel]]) -> None:
+        varios = list(dict.fromkeys(vario for vario, _ in combinations))
+        krigings = list(dict.fromkeys(kriging for _, kriging in combinations))
+
+        self.figure.clear()
+        self.axes = {}
+        for row, vario in enumerate(varios):
+            for col, kriging in enumerate(krigings):
+                ax = self.figure.add_subplot(len(varios), len(krigings), row * len(krigings) + col + 1)
+                ax.set_title(f"{vario} / {kriging}", fontsize="small")
+                ax.tick_params(labelsize="x-small")
+                self.axes[vario, kriging] = ax
+        self.canvas.draw_idle()
+
+    def _on_processes_created(self, processes: dict[tuple[Variogram, KrigingModel], UUID | Exception]) -> None:
+        self.processes = {}
+        self.errors = {}
+        for combination, process_id in processes.items():
+            if isinstance(process_id, Exception):
+                self.errors[combination] = process_id
+                self._show_result(combination, process_id)
+            else:
+                self.processes[process_id] = combination
+        self.canvas.draw_idle()
+        if not self.processes:
+            self._on_batch_finished({})
+            return
+
+        self.status_label.setText(f"Ожидание результатов: 0 из {len(self.processes)}")
+        self.tasks.run(
+            self.kriging_service.wait_batch(list(self.processes), self.grid, on_result=self.result_signal.emit),
+            self._on_batch_finished,
+            self._on_error,
+        )
+
+    def _on_result(self, process_id: UUID, result: GeoGridValues | Exception) -> None:
+        combination = self.processes.get(process_id)
+        if not self._show_result(combination, result):
+            return
+        self.canvas.draw_idle()
+
+        self.finished.add(process_id)
+        self.status_label.setText(f"Ожидание результатов: {len(self.finished)} из {len(self.processes)}")
+
+    def _show_result(
+        self, combination: tuple[Variogram, KrigingModel] | None, result: GeoGridValues | Exception
+    ) -> bool:
+        """
+        Нарисовать результат или ошибку сочетания, `False` если графика сочетания нет
+        """
+        ax = self.axes.get(combination)
+        if ax is None:
+            return False
+
+        if isinstance(result, Exception):
+            ax.text(0.5, 0.5, "Ошибка", ha="center", va="center", transform=ax.transAxes)
+        else:
+            values = np.ma.masked_invalid(result.values)
+            levels = np.linspace(result.min, result.max)
+            ax.contourf(result.grid.lon_axis, result.grid.lat_axis, values, levels, cmap="coolwarm")
+        return True
+
+    def _on_batch_finished(self, results: dict[UUID, GeoGridValues | Exception]) -> None:
+        failed = sum(isinstance(result, Exception) for result in results.values()) + len(self.errors)
+        self.status_label.setText(f"Готово: {len(results) + len(self.errors) - failed}, ошибок: {failed}")
+
+    def _on_error(self, error: Exception) -> None:
+        self.tasks.cancel()
+        self.status_label.setText("Ошибка")
+
+        error_msg = QtWidgets.QMessageBox(self)
+        error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        error_msg.setText(str(error))
+        error_msg.exec()
+
+    def _set_busy(self, is_busy: bool) -> None:
+        self.start_btn.setEnabled(not is_busy)
+        self.cancel_btn.setEnabled(is_busy)
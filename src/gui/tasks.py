@@ -0,0 +1,98 @@
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from PySide6 import QtCore
+
+
+class Task(QtCore.QObject):
+    """
+    Связь `Future` с сигналами Qt.
+
+    Результат доставляется в поток GUI через очередь событий,
+    отмененная задача ничего не доставляет
+    """
+
+    finished = QtCore.Signal(object)
+    failed = QtCore.Signal(object)
+
+    def __init__(self, future: Future) -> None:
+        super().__init__()
+        self.future = future
+        self.is_cancelled = False
+
+    def start(self) -> None:
+        self.future.add_done_callback(self._done)
+
+    def cancel(self) -> None:
+        """
+        Отменить задачу
+        """
+        self.is_cancelled = True
+        self.future.cancel()
+
+    def _done(self, future: Future) -> None:
+        if self.is_cancelled or future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.finished.emit(future.result())
+        else:
+            self.failed.emit(error)
+
+
+class TaskRunner(QtCore.QObject):
+    """
+    Набор выполняющихся задач виджета
+    """
+
+    busy_changed = QtCore.Signal(bool)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tasks: set[Task] = set()
+
+    @property
+    def is_busy(self) -> bool:
+        return bool(self.tasks)
+
+    def run(
+        self,
+        future: Future,
+        on_finished: Callable[[object], None],
+        on_failed: Callable[[Exception], None] | None = None,
+    ) -> Task:
+        """
+        Доставить результат `Future` в обработчики в потоке GUI
+        """
+        task = Task(future)
+        queued = QtCore.Qt.ConnectionType.QueuedConnection
+        task.finished.connect(lambda result: self._finish(task, on_finished, result), queued)
+        task.failed.connect(lambda error: self._finish(task, on_failed, error), queued)
+
+        self.tasks.add(task)
+        if len(self.tasks) == 1:
+            self.busy_changed.emit(True)
+        task.start()
+        return task
+
+    def cancel(self) -> None:
+        """
+        Отменить все задачи
+        """
+        for task in self.tasks:
+            task.cancel()
+        self._clear(*self.tasks)
+
+    def _finish(self, task: Task, handler: Callable[[object], None] | None, value: object) -> None:
+        if task.is_cancelled:
+            return
+        self._clear(task)
+        if handler is not None:
+            handler(value)
+
+    def _clear(self, *tasks: Task) -> None:
+        if not self.tasks:
+            return
+        self.tasks.difference_update(tasks)
+        if not self.tasks:
+            self.busy_changed.emit(False)
@@ -0,0 +1,171 @@
+from matplotlib import pyplot as plt
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.colors import CenteredNorm
+from PySide6 import QtCore, QtWidgets
+
+from entity.point import GeoPointSet
+from service.executor import AsyncKrigingService
+from service.validation import CrossValidationReport, ValidationResult
+
+from .tasks import TaskRunner
+
+
+class CrossValidationWidget(QtWidgets.QWidget):
+    """
+    Виджет перекрестной проверки сочетаний вариограммы и метода кригинга.
+
+    Показывает ошибки прогноза каждой точки по остальным точкам для всех
+    сочетаний, рисует остатки выбранного сочетания на точках и выбирает
+    в процессе кригинга сочетание с наименьшей ошибкой
+    """
+
+    selected_signal = QtCore.Signal(object, object)
+
+    COLUMNS = ("Вариограмма", "Метод", "RMSE", "Средняя ошибка", "Средний станд.", "RMSE станд.")
+
+    def __init__(self, kriging_service: AsyncKrigingService) -> None:
+        super().__init__()
+        self.setWindowTitle("Перекрестная проверка")
+        self.kriging_service = kriging_service
+        self.tasks = TaskRunner()
+        self.points = None
+        self.results: list[ValidationResult] = []
+
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+
+        buttons_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(buttons_layout)
+
+        self.start_btn = QtWidgets.QPushButton("Запустить проверку")
+        self.start_btn.clicked.connect(self.start)
+        buttons_layout.addWidget(self.start_btn)
+
+        self.cancel_btn = QtWidgets.QPushButton("Отменить")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+        buttons_layout.addWidget(self.cancel_btn)
+
+        self.select_btn = QtWidgets.QPushButton("Выбрать сочетание")
+        self.select_btn.setEnabled(False)
+        self.select_btn.clicked.connect(self.select)
+        buttons_layout.addWidget(self.select_btn)
+
+        self.status_label = QtWidgets.QLabel()
+        layout.addWidget(self.status_label)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.itemSelectionChanged.connect(self._show_selected)
+        layout.addWidget(self.table)
+
+        self.figure = plt.figure(layout="tight")
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.canvas.setMinimumSize(500, 400)
+        layout.addWidget(self.canvas)
+
+        self.tasks.busy_changed.connect(self._set_busy)
+
+    def define_input(self, points: GeoPointSet) -> None:
+        """
+        Определить точки проверки
+        """
+        self.tasks.cancel()
+        self.points = points
+        self.results = []
+        self.table.setRowCount(0)
+        self.figure.clear()
+        self.canvas.draw_idle()
+        self.status_label.setText(f"Точек: {len(points)}")
+        self._set_busy(self.tasks.is_busy)
+
+    def start(self) -> None:
+        """
+        Запуск проверки всех сочетаний
+        """
+        if self.points is None:
+            error_msg = QtWidgets.QMessageBox(self)
+            error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+            error_msg.setText("Не выбраны точки")
+            error_msg.exec()
+            return
+
+        self.status_label.setText(f"Проверка по {len(self.points)} точкам")
+        self.tasks.run(self.kriging_service.cross_validate(self.points), self._on_validated, self._on_error)
+
+    def cancel(self) -> None:
+        """
+        Отмена проверки
+        """
+        self.tasks.cancel()
+        self.status_label.setText("Отменено")
+
+    def select(self) -> None:
+        """
+        Выбрать сочетание выделенной строки в процессе кригинга
+        """
+        result = self._selected_result()
+        if result is not None and result.error is None:
+            self.selected_signal.emit(result.variogram, result.kriging)
+
+    def _selected_result(self) -> ValidationResult | None:
+        row = self.table.currentRow()
+        return self.results[row] if 0 <= row < len(self.results) else None
+
+    def _on_validated(self, report: CrossValidationReport) -> None:
+        self.results = sorted(report.results, key=lambda result: (result.error is not None, result.rmse))
+        self.table.setRowCount(len(self.results))
+        for row, result in enumerate(self.results):
+            if result.error is None:
+                metrics = (result.rmse, result.mean_error, result.mean_standardized, result.rmse_standardized)
+                values = (result.variogram, result.kriging, *(f"{value:.4g}" for value in metrics))
+            else:
+                values = (result.variogram, result.kriging, result.error)
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(value))
+
+        self._set_busy(self.tasks.is_busy)
+
+        best = report.best
+        if best is None:
+            self.status_label.setText("Ни одно сочетание не удалось проверить")
+            return
+        self.table.selectRow(0)
+        self.status_label.setText(f"Наименьшая ошибка: {best.variogram} / {best.kriging}, RMSE {best.rmse:.4g}")
+        self.selected_signal.emit(best.variogram, best.kriging)
+
+    def _show_selected(self) -> None:
+        result = self._selected_result()
+        self.figure.clear()
+        if result is None:
+            self.canvas.draw_idle()
+            return
+
+        ax = self.figure.add_subplot()
+        ax.set_title(f"Остатки {result.variogram} / {result.kriging}", fontsize="small")
+        if result.residuals is None:
+            ax.text(0.5, 0.5, result.error, ha="center", va="center", transform=ax.transAxes)
+        else:
+            scatter = ax.scatter(
+                self.points.lon, self.points.lat, c=result.residuals, s=8, cmap="coolwarm", norm=CenteredNorm()
+            )
+            self.figure.colorbar(scatter, ax=ax, label="значение - прогноз")
+        self.canvas.draw_idle()
+
+    def _on_error(self, error: Exception) -> None:
+        self.tasks.cancel()
+        self.status_label.setText("Ошибка")
+
+        error_msg = QtWidgets.QMessageBox(self)
+        error_msg.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        error_msg.setText(str(error))
+        error_msg.exec()
+
+    def _set_busy(self, is_busy: bool) -> None:
+        self.start_btn.setEnabled(not is_busy)
+        self.cancel_btn.setEnabled(is_busy)
+        self.select_btn.setEnabled(not is_busy and bool(self.results))
@@ -0,0 +1,62 @@
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+from uuid import UUID
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PointsCache:
+    """
+    Соответствие хэша набора точек и идентификатора точек на сервере.
+
+    Хранится в памяти и сохраняется в json файл
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = Lock()
+        self.entries: dict[str, str] = self._load()
+
+    def get(self, digest: str) -> UUID | None:
+        """
+        Получить идентификатор точек по хэшу
+        """
+        points_id = self.entries.get(digest)
+        return None if points_id is None else UUID(points_id)
+
+    def set(self, digest: str, points_id: UUID) -> None:
+        """
+        Запомнить идентификатор точек
+        """
+        with self.lock:
+            self.entries[digest] = str(points_id)
+            self._save()
+
+    def discard(self, digest: str) -> None:
+        """
+        Удалить запись о точках
+        """
+        with self.lock:
+            if self.entries.pop(digest, None) is not None:
+                self._save()
+
+    def _load(self) -> dict[str, str]:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as ex:
+            LOGGER.warning(f"Error read points cache: {ex}")
+            return {}
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self.entries))
+            os.replace(tmp_path, self.path)
+        except OSError as ex:
+            LOGGER.warning(f"Error write points cache: {ex}")
@@ -0,0 +1,229 @@
+from concurrent.futures import CancelledError
+from threading import Event
+
+import numpy as np
+from pydantic import BaseModel
+
+from config.decimation import DecimationSettings
+from entity.point import GeoPointSet
+from entity.states import MergeRule, ThinMethod
+
+from .trace import TRACER
+
+
+class DecimationReport(BaseModel):
+    """
+    Итог подготовки точек
+    """
+
+    input: int
+    merged: int
+    thinned: int
+
+    @property
+    def output(self) -> int:
+        return self.input - self.merged - self.thinned
+
+    @property
+    def speedup(self) -> float:
+        """
+        Ожидаемое ускорение решения системы кригинга, время которого растет как куб числа точек
+        """
+        return (self.input / max(self.output, 1)) ** 3
+
+    def summary(self) -> str:
+        return (
+            f"точек {self.input} -> {self.output}: объединено {self.merged}, прорежено {self.thinned}, "
+            f"ожидаемое ускорение решения ~{self.speedup:.1f} раз"
+        )
+
+
+class PointsDecimator:
+    """
+    Объединение дубликатов и прореживание точек перед отправкой.
+
+    Дубликаты - точки в одной ячейке со стороной `MERGE_TOLERANCE` градусов
+    (при 0 - с одинаковыми координатами), объединяются в точку со средними
+    координатами и значением по правилу `MergeRule`. Прореживание биннингом
+    подбирает бисекцией размер ячейки, при котором занятых ячеек не больше
+    целевого числа, и объединяет точки ячеек. Прореживание по ближайшим соседям
+    раундами удаляет точки с самым близким соседом, соседи ищутся приближенно
+    среди соседей по нескольким сдвинутым кривым Мортона. Долгота масштабируется
+    на косинус средней широты, чтобы ячейки и расстояния были близки к равным на местности
+    """
+
+    BINNING_ITERATIONS = 30
+    KNN_WINDOW = 4
+    KNN_SHIFTS = 3
+    KNN_ROUND_FRACTION = 0.5
+    MORTON_BITS = 31
+
+    def __init__(self, config: DecimationSettings) -> None:
+        self.config = config
+
+    def decimate(
+        self,
+        points: GeoPointSet,
+        merge: bool,
+        target: int | None,
+        cancel_event: Event | None = None,
+    ) -> tuple[GeoPointSet, DecimationReport]:
+        """
+        Объединить дубликаты (`merge`) и проредить точки до `target`, без изменений набор возвращается как есть
+        """
+        cancel_event = cancel_event or Event()
+        lat, lon, value = points.lat, points.lon, points.value
+        merged = thinned = 0
+        with TRACER.span("decimate_points", "compute", points=len(points)) as span:
+            if merge:
+                tolerance = self.config.MERGE_TOLERANCE
+                keys = (lat, lon) if tolerance <= 0 else self._cells(lat, lon, tolerance)
+                lat, lon, value = self._merge(lat, lon, value, keys, self.config.MERGE_RULE)
+                merged = len(points) - len(value)
+
+            if target is not None and len(value) > max(target, 1):
+                count = len(value)
+                x, y = self._project(lat, lon)
+                if self.config.THIN_METHOD == ThinMethod.KNN:
+                    index = self._thin_knn(x, y, max(target, 1), cancel_event)
+                    lat, lon, value = lat[index], lon[index], value[index]
+                else:
+                    cell = self._binning_cell(x, y, max(target, 1), cancel_event)
+                    lat, lon, value = self._merge(lat, lon, value, self._cells(y, x, cell), self.config.MERGE_RULE)
+                thinned = count - len(value)
+            span.args["output"] = len(value)
+
+        report = DecimationReport(input=len(points), merged=merged, thinned=thinned)
+        if not merged and not thinned:
+            return points, report
+        return GeoPointSet(lon=lon, lat=lat, value=value), report
+
+    @staticmethod
+    def _project(lat: np.ndarray, lon: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return lon * np.cos(np.radians(np.mean(lat))), lat
+
+    @staticmethod
+    def _cells(y: np.ndarray, x: np.ndarray, cell: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Номера ячеек со стороной `cell`, отсчитываемых от минимальных координат
+        """
+        return np.floor((y - y.min()) / cell).astype(np.int64), np.floor((x - x.min()) / cell).astype(np.int64)
+
+    @staticmethod
+    def _merge(
+        lat: np.ndarray,
+        lon: np.ndarray,
+        value: np.ndarray,
+        keys: tuple[np.ndarray, np.ndarray],
+        rule: MergeRule,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Объединить точки с одинаковыми ключами, порядок - по первой точке группы
+        """
+        if rule == MergeRule.MEDIAN:
+            order = np.lexsort((value, keys[1], keys[0]))
+        else:
+            order = np.lexsort((keys[1], keys[0]))
+        first_key, second_key = keys[0][order], keys[1][order]
+        change = np.ones(len(order), dtype=bool)
+        change[1:] = (first_key[1:] != first_key[:-1]) | (second_key[1:] != second_key[:-1])
+        starts = np.flatnonzero(change)
+        if len(starts) == len(order):
+            return lat, lon, value
+
+        if rule == MergeRule.FIRST:
+            index = np.sort(order[starts])
+            return lat[index], lon[index], value[index]
+
+        counts = np.diff(np.append(starts, len(order)))
+        merged_lat = np.add.reduceat(lat[order], starts) / counts
+        merged_lon = np.add.reduceat(lon[order], starts) / counts
+        if rule == MergeRule.MEDIAN:
+            sorted_value = value[order]
+            merged_value = (sorted_value[starts + (counts - 1) // 2] + sorted_value[starts + counts // 2]) / 2
+        else:
+            merged_value = np.add.reduceat(value[order], starts) / counts
+
+        rank = np.argsort(np.minimum.reduceat(order, starts))
+        return merged_lat[rank], merged_lon[rank], merged_value[rank]
+
+    def _binning_cell(self, x: np.ndarray, y: np.ndarray, target: int, cancel_event: Event) -> float:
+        """
+        Наименьший найденный бисекцией размер ячейки, при котором занятых ячеек не больше `target`
+        """
+
+        def occupied(cell: float) -> int:
+            rows, cols = self._cells(y, x, cell)
+            return len(np.unique(rows * (cols.max() + 1) + cols))
+
+        extent = max(np.ptp(x), np.ptp(y)) or 1.0
+        low, high = extent / (4 * len(x)), extent * 2
+        for _ in range(self.BINNING_ITERATIONS):
+            if cancel_event.is_set():
+                raise CancelledError
+            middle = np.sqrt(low * high)
+            if occupied(middle) > target:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def _thin_knn(self, x: np.ndarray, y: np.ndarray, target: int, cancel_event: Event) -> np.ndarray:
+        """
+        Номера оставшихся точек: раундами удаляются точки с самым близким соседом,
+        из пары взаимно близких точек удаляется одна
+        """
+        index = np.arange(len(x))
+        while len(index) > target:
+            if cancel_event.is_set():
+                raise CancelledError
+            distance, nearest = self._nearest(x[index], y[index])
+            count = min(len(index) - target, max(1, int(len(index) * self.KNN_ROUND_FRACTION)))
+            candidates = np.argpartition(distance, count - 1)[:count]
+            is_candidate = np.zeros(len(index), dtype=bool)
+            is_candidate[candidates] = True
+            partners = nearest[candidates]
+            drop = candidates[~(is_candidate[partners] & (partners < candidates))]
+            keep = np.ones(len(index), dtype=bool)
+            keep[drop] = False
+            index = index[keep]
+        return index
+
+    def _nearest(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Приближенные расстояние до ближайшего соседа и его номер: соседи ищутся
+        среди `KNN_WINDOW` точек с каждой стороны на `KNN_SHIFTS` сдвинутых кривых Мортона
+        """
+        distance = np.full(len(x), np.inf)
+        nearest = np.arange(len(x))
+        extent = max(np.ptp(x), np.ptp(y)) or 1.0
+        scale = (2**self.MORTON_BITS - 1) / (2 * extent)
+        for shift in np.arange(self.KNN_SHIFTS) * extent / self.KNN_SHIFTS:
+            codes = self._morton(((x - x.min() + shift) * scale).astype(np.uint64)) | (
+                self._morton(((y - y.min() + shift) * scale).astype(np.uint64)) << np.uint64(1)
+            )
+            order = np.argsort(codes, kind="stable")
+            sorted_x, sorted_y = x[order], y[order]
+            for step in range(1, min(self.KNN_WINDOW, len(x) - 1) + 1):
+                step_distance = np.hypot(sorted_x[step:] - sorted_x[:-step], sorted_y[step:] - sorted_y[:-step])
+                for points, neighbours in ((order[:-step], order[step:]), (order[step:], order[:-step])):
+                    is_closer = step_distance < distance[points]
+                    distance[points[is_closer]] = step_distance[is_closer]
+                    nearest[points[is_closer]] = neighbours[is_closer]
+        return distance, nearest
+
+    @staticmethod
+    def _morton(values: np.ndarray) -> np.ndarray:
+        """
+        Разнести биты 32-битных чисел через один
+        """
+        values = values & np.uint64(0xFFFFFFFF)
+        for shift, mask in (
+            (16, 0x0000FFFF0000FFFF),
+            (8, 0x00FF00FF00FF00FF),
+            (4, 0x0F0F0F0F0F0F0F0F),
+            (2, 0x3333333333333333),
+            (1, 0x5555555555555555),
+        ):
+            values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+        return values
@@ -0,0 +1,162 @@
+from concurrent.futures import CancelledError
+from threading import Event
+
+import numpy as np
+
+from entity.kriging import GeoGrid, GeoGridValues
+from entity.point import GeoPointSet
+from entity.states import KrigingModel, Variogram
+
+from .trace import TRACER
+
+
+def variogram(kind: Variogram, distance: np.ndarray, sill: float, range_: float) -> np.ndarray:
+    """
+    Значение модели вариограммы, `range_` - практическая дальность
+    """
+    ratio = distance / range_
+    match kind:
+        case Variogram.GAUSSIAN:
+            return sill * (1 - np.exp(-3 * ratio**2))
+        case Variogram.EXPONENTIAL:
+            return sill * (1 - np.exp(-3 * ratio))
+        case Variogram.SPHERICAL:
+            ratio = np.minimum(ratio, 1)
+            return sill * (1.5 * ratio - 0.5 * ratio**3)
+    raise ValueError(f"Неизвестная вариограмма {kind}")
+
+
+def distances(x1: np.ndarray, y1: np.ndarray, x2: np.ndarray, y2: np.ndarray) -> np.ndarray:
+    """
+    Матрица расстояний между двумя наборами точек
+    """
+    return np.hypot(x1[:, None] - x2[None, :], y1[:, None] - y2[None, :])
+
+
+class KrigingEngine:
+    """
+    Локальное вычисление кригинга.
+
+    Система кригинга решается один раз в двойственной форме, после чего
+    значение в любом узле сетки - скалярное произведение ковариаций с весами.
+    Узлы сетки обрабатываются блоками ограниченного размера
+    """
+
+    def __init__(self, block_bytes: int, nugget: float, sample: int, bins: int) -> None:
+        self.block_bytes = block_bytes
+        self.nugget = nugget
+        self.sample = sample
+        self.bins = bins
+
+    def fit(self, points: GeoPointSet, kind: Variogram) -> tuple[float, float]:
+        """
+        Подобрать порог и дальность вариограммы по эмпирической вариограмме
+        """
+        sill = float(np.var(points.value)) or 1.0
+        index = np.arange(len(points))
+        if len(index) > self.sample:
+            index = np.random.default_rng(0).choice(index, self.sample, replace=False)
+        lon, lat, value = points.lon[index], points.lat[index], points.value[index]
+
+        distance = distances(lon, lat, lon, lat)
+        upper = np.triu_indices(len(index), k=1)
+        distance = distance[upper]
+        if not len(distance) or distance.max() == 0:
+            return sill, 1.0
+        semivariance = 0.5 * (value[:, None] - value[None, :])[upper] ** 2
+
+        edges = np.linspace(0, distance.max() / 2, self.bins + 1)
+        bin_index = np.digitize(distance, edges) - 1
+        valid = (bin_index >= 0) & (bin_index < self.bins)
+        counts = np.bincount(bin_index[valid], minlength=self.bins)
+        sums = np.bincount(bin_index[valid], weights=semivariance[valid], minlength=self.bins)
+        filled = counts > 0
+        lags = ((edges[:-1] + edges[1:]) / 2)[filled]
+        empirical = sums[filled] / counts[filled]
+
+        candidates = np.geomspace(distance.max() / 100, distance.max(), 100)
+        errors = [np.sum(counts[filled] * (variogram(kind, lags, sill, c) - empirical) ** 2) for c in candidates]
+        return sill, float(candidates[int(np.argmin(errors))])
+
+    def system(
+        self, points: GeoPointSet, kind: Variogram, model: KrigingModel, sill: float, range_: float
+    ) -> np.ndarray:
+        """
+        Матрица системы кригинга в ковариационной форме
+        """
+        count = len(points)
+        covariance = sill - variogram(kind, distances(points.lon, points.lat, points.lon, points.lat), sill, range_)
+        covariance[np.diag_indices(count)] += self.nugget * sill
+
+        drift = self.drift(points.lon, points.lat, points, model)
+        if drift is None:
+            return covariance
+
+        size = count + drift.shape[1]
+        matrix = np.zeros((size, size))
+        matrix[:count, :count] = covariance
+        matrix[:count, count:] = drift
+        matrix[count:, :count] = drift.T
+        return matrix
+
+    @staticmethod
+    def drift(lon: np.ndarray, lat: np.ndarray, points: GeoPointSet, model: KrigingModel) -> np.ndarray | None:
+        """
+        Функции тренда: константа для обычного кригинга, линейный тренд для универсального
+        """
+        match model:
+            case KrigingModel.SIMPLE:
+                return None
+            case KrigingModel.ORDINARY:
+                return np.ones((len(lon), 1))
+            case KrigingModel.UNIVERSAL:
+                center_lon, center_lat = points.lon.mean(), points.lat.mean()
+                scale = max(np.ptp(points.lon), np.ptp(points.lat)) or 1.0
+                return np.column_stack([np.ones(len(lon)), (lon - center_lon) / scale, (lat - center_lat) / scale])
+        raise ValueError(f"Неизвестный метод кригинга {model}")
+
+    def run(
+        self,
+        points: GeoPointSet,
+        grid: GeoGrid,
+        kind: Variogram,
+        model: KrigingModel,
+        cancel_event: Event | None = None,
+    ) -> GeoGridValues:
+        """
+        Вычислить значения кригинга в узлах сетки
+        """
+        cancel_event = cancel_event or Event()
+        with TRACER.span("fit_variogram", "compute", points=len(points)):
+            sill, range_ = self.fit(points, kind)
+
+        with TRACER.span("solve_system", "compute", points=len(points)):
+            matrix = self.system(points, kind, model, sill, range_)
+            mean = float(points.value.mean()) if model == KrigingModel.SIMPLE else 0.0
+            rhs = np.zeros(len(matrix))
+            rhs[: len(points)] = points.value - mean
+            try:
+                weights = np.linalg.solve(matrix, rhs)
+            except np.linalg.LinAlgError:
+                weights = np.linalg.lstsq(matrix, rhs, rcond=None)[0]
+        covariance_weights, drift_weights = weights[: len(points)], weights[len(points) :]
+
+        lat_axis, lon_axis = grid.lat_axis, grid.lon_axis
+        node_lat = np.repeat(lat_axis, len(lon_axis))
+        node_lon = np.tile(lon_axis, len(lat_axis))
+        values = np.empty(len(node_lat))
+
+        block = max(self.block_bytes // (8 * max(len(points), 1)), 1)
+        with TRACER.span("predict_grid", "compute", nodes=len(values)):
+            for start in range(0, len(values), block):
+                if cancel_event.is_set():
+                    raise CancelledError
+                lon, lat = node_lon[start : start + block], node_lat[start : start + block]
+                covariance = sill - variogram(kind, distances(lon, lat, points.lon, points.lat), sill, range_)
+                block_values = covariance @ covariance_weights + mean
+                drift = self.drift(lon, lat, points, model)
+                if drift is not None:
+                    block_values += drift @ drift_weights
+                values[start : start + block] = block_values
+
+        return GeoGridValues(grid=grid, values=values.reshape(grid.shape))
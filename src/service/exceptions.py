@@ -0,0 +1,61 @@
+class KrigingServiceException(Exception):
+    """Базовое исключение сервиса кригинга"""
+
+
+class KrigingServiceExceptions:
+    class InternalError(KrigingServiceException):
+        """Внутрення ошибка"""
+
+        message = "Произошла внутреняя ошибка"
+
+        def __init__(self) -> None:
+            super(self.__class__, self).__init__(self.message)
+
+    class NotFoundError(KrigingServiceException):
+        """Не найден искомый объект"""
+
+        message = "Не найден искомый объект"
+
+        def __init__(self) -> None:
+            super(self.__class__, self).__init__(self.message)
+
+    class IncorrectDataError(KrigingServiceException):
+        """Ошибка ввода"""
+
+        message = "Произошла ошибка ввода данных. {errors}"
+
+        def __init__(self, errors: str) -> None:
+            super(self.__class__, self).__init__(self.message.format(errors=errors))
+
+    class IncorrectResponseError(KrigingServiceException):
+        """Некорректный ответ сервера"""
+
+        message = "Сервер вернул некорректный ответ. {errors}"
+
+        def __init__(self, errors: str) -> None:
+            super(self.__class__, self).__init__(self.message.format(errors=errors))
+
+    class UnsupportedMediaTypeError(KrigingServiceException):
+        """Сервер не принимает формат или сжатие тела запроса"""
+
+        message = "Сервер не принимает формат тела запроса"
+
+        def __init__(self, accept_encoding: str | None = None) -> None:
+            super(self.__class__, self).__init__(self.message)
+            self.accept_encoding = accept_encoding
+
+    class ProcessFailedError(KrigingServiceException):
+        """Процесс завершился неуспешно"""
+
+        message = "Процесс кригинга завершился со статусом {status}"
+
+        def __init__(self, status: str) -> None:
+            super(self.__class__, self).__init__(self.message.format(status=status))
+
+    class DeadlineError(KrigingServiceException):
+        """Истекло время ожидания"""
+
+        message = "Истекло время ожидания процесса кригинга"
+
+        def __init__(self) -> None:
+            super(self.__class__, self).__init__(self.message)
@@ -0,0 +1,200 @@
+from collections.abc import Callable
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from pathlib import Path
+from threading import Event, Lock
+from typing import TYPE_CHECKING, ParamSpec, TypeVar
+from uuid import UUID
+
+from config import settings
+from entity.kriging import GeoGrid, GeoGridValues, GeoKrigingData
+from entity.point import GeoPointSet
+from entity.states import Backend, KrigingModel, Variogram
+
+from .exceptions import KrigingServiceExceptions
+
+if TYPE_CHECKING:
+    from .kriging import KrigingService
+    from .preflight import CostEstimate
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class CancellableFuture(Future):
+    """
+    `Future`, отмена которого прерывает уже выполняющуюся операцию
+    через событие `cancel_event`
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.cancel_event = Event()
+
+    def cancel(self) -> bool:
+        self.cancel_event.set()
+        return super().cancel()
+
+
+class AsyncKrigingService:
+    """
+    Асинхронный сервис кригинга.
+
+    Операции выполняются в пуле потоков и возвращают `Future`,
+    разбор ответов и валидация моделей тоже происходят в потоках пула.
+    Если сервис не передан, он создается при первом обращении
+    """
+
+    EXCEPTIONS = KrigingServiceExceptions
+
+    def __init__(self, service: "KrigingService | None" = None, workers: int | None = None) -> None:
+        self._service = service
+        self._service_lock = Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or settings.kriging_api.WORKERS, thread_name_prefix="kriging"
+        )
+
+    @property
+    def service(self) -> "KrigingService":
+        """
+        Синхронный сервис, модуль сервиса и сессия создаются при первом обращении
+        """
+        with self._service_lock:
+            if self._service is None:
+                from .kriging import KrigingService
+
+                self._service = KrigingService()
+            return self._service
+
+    def warm_up(self) -> Future["KrigingService"]:
+        """
+        Создать сервис в пуле потоков заранее
+        """
+        return self.submit(lambda: self.service)
+
+    def _call(self, name: str, *args: object, **kwargs: object) -> object:
+        """
+        Вызвать метод сервиса, сервис получается в потоке пула, а не в вызывающем
+        """
+        return getattr(self.service, name)(*args, **kwargs)
+
+    def submit(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> Future[T]:
+        """
+        Выполнить функцию в пуле потоков
+        """
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def submit_cancellable(self, fn: Callable[..., T], *args: object, **kwargs: object) -> CancellableFuture:
+        """
+        Выполнить в пуле потоков функцию, принимающую `cancel_event`
+        """
+        future = CancellableFuture()
+
+        def run() -> None:
+            if future.cancel_event.is_set():
+                return
+            try:
+                result = fn(*args, cancel_event=future.cancel_event, **kwargs)
+            except BaseException as ex:
+                set_value, value = future.set_exception, ex
+            else:
+                set_value, value = future.set_result, result
+            try:
+                set_value(value)
+            except InvalidStateError:
+                pass
+
+        self.executor.submit(run)
+        return future
+
+    def estimate(
+        self,
+        points: GeoPointSet | None,
+        grid: GeoGrid,
+        kriging_type: KrigingModel | None,
+        backend: Backend | None = None,
+    ) -> Future["CostEstimate"]:
+        """
+        Оценка процесса до запуска, сервис создается в пуле потоков, а не в вызывающем
+        """
+        return self.submit(lambda: self.service.estimate(points, grid, kriging_type, backend))
+
+    def save_points(self, points: GeoPointSet) -> Future[UUID]:
+        return self.submit(self._call, "save_points", points)
+
+    def get_points(self, points_id: UUID) -> Future[GeoPointSet]:
+        return self.submit(self._call, "get_points", points_id)
+
+    def create_process(
+        self,
+        points: GeoPointSet,
+        grid: GeoGrid,
+        vario_type: Variogram,
+        kriging_type: KrigingModel,
+        backend: Backend | None = None,
+    ) -> Future[UUID]:
+        return self.submit(self._call, "create_process", points, grid, vario_type, kriging_type, backend)
+
+    def create_sweep(
+        self,
+        points: GeoPointSet,
+        grid: GeoGrid,
+        combinations: list[tuple[Variogram, KrigingModel]],
+        backend: Backend | None = None,
+    ) -> Future[dict[tuple[Variogram, KrigingModel], UUID | Exception]]:
+        return self.submit(self._call, "create_sweep", points, grid, combinations, backend)
+
+    def get_result_process(self, process_id: UUID) -> Future[GeoPointSet]:
+        return self.submit(self._call, "get_result_process", process_id)
+
+    def get_result_grid(self, process_id: UUID, grid: GeoGrid) -> Future[GeoGridValues]:
+        return self.submit(self._call, "get_result_grid", process_id, grid)
+
+    def load_process(self, process_id: UUID) -> Future[tuple[GeoKrigingData, GeoGridValues] | None]:
+        return self.submit(self._call, "load_process", process_id)
+
+    def get_process_data(self, process_id: UUID) -> Future[GeoKrigingData]:
+        return self.submit(self._call, "get_process_data", process_id)
+
+    def get_process_status(self, process_id: UUID) -> Future[str]:
+        return self.submit(self._call, "get_process_status", process_id)
+
+    def get_process_statuses(self, process_ids: list[UUID]) -> Future[dict[UUID, str | Exception]]:
+        return self.submit(self._call, "get_process_statuses", process_ids)
+
+    def fetch_result(self, process_id: UUID, grid: GeoGrid) -> Future[GeoGridValues]:
+        return self.submit(self._call, "fetch_result", process_id, grid)
+
+    def export_result(
+        self,
+        process_id: UUID,
+        path: Path,
+        result: GeoGridValues | None = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> CancellableFuture:
+        return self.submit_cancellable(self._call, "export_result", process_id, path, result, progress=progress)
+
+    def cross_validate(
+        self,
+        points: GeoPointSet,
+        combinations: list[tuple[Variogram, KrigingModel]] | None = None,
+    ) -> CancellableFuture:
+        return self.submit_cancellable(self._call, "cross_validate", points, combinations)
+
+    def wait_result(self, process_id: UUID, grid: GeoGrid) -> CancellableFuture:
+        return self.submit_cancellable(self._call, "wait_result", process_id, grid)
+
+    def wait_batch(
+        self,
+        process_ids: list[UUID],
+        grid: GeoGrid,
+        on_result: Callable[[UUID, GeoGridValues | Exception], None] | None = None,
+    ) -> CancellableFuture:
+        return self.submit_cancellable(self._call, "wait_batch", process_ids, grid, on_result=on_result)
+
+    def shutdown(self) -> None:
+        """
+        Остановить пул, отменив ожидающие операции
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self._service is not None:
+            self._service.close()
@@ -0,0 +1,329 @@
+import json
+import struct
+import zipfile
+import zlib
+from collections.abc import Callable, Iterator
+from concurrent.futures import CancelledError
+from pathlib import Path
+from threading import Event
+from typing import BinaryIO
+from uuid import UUID
+
+import numpy as np
+
+from config.export import ExportSettings
+from entity.kriging import GeoGridValues, GeoKrigingData
+from entity.states import ExportFormat
+
+from .trace import TRACER
+
+_NC_DIMENSION, _NC_VARIABLE, _NC_ATTRIBUTE = 10, 11, 12
+_NC_CHAR, _NC_INT, _NC_FLOAT, _NC_DOUBLE = 2, 4, 5, 6
+
+_TIFF_ASCII, _TIFF_SHORT, _TIFF_LONG, _TIFF_DOUBLE = 2, 3, 4, 12
+_TIFF_FORMATS = {_TIFF_ASCII: "s", _TIFF_SHORT: "H", _TIFF_LONG: "I", _TIFF_DOUBLE: "d"}
+_TIFF_MAX_BYTES = 2**32 - 2**20
+
+
+class ExportError(ValueError):
+    """Ошибка экспорта результата"""
+
+
+class GridExporter:
+    """
+    Потоковая запись результата кригинга в файлы.
+
+    Значения читаются блоками строк из массива в памяти или отображенного
+    из хранилища файла, поэтому сетка целиком не копируется.
+    Вместе со значениями сохраняются привязка сетки и параметры процесса:
+
+    - npy: массив (широта, долгота) и json файл с параметрами рядом
+    - npz: сжатые `values.npy`, оси `lat.npy`, `lon.npy` и `metadata.json`
+    - nc: NetCDF (classic, 64-bit offset) с осями и атрибутами CF
+    - tif: GeoTIFF в WGS 84, строки сверху вниз по широте
+    """
+
+    def __init__(self, config: ExportSettings) -> None:
+        self.config = config
+
+    @staticmethod
+    def format_of(path: Path) -> ExportFormat:
+        """
+        Формат по расширению файла
+        """
+        suffix = path.suffix.lower().lstrip(".")
+        try:
+            return ExportFormat("tif" if suffix == "tiff" else suffix)
+        except ValueError:
+            raise ExportError(f"Неизвестный формат файла {path.name}")
+
+    @staticmethod
+    def metadata(result: GeoGridValues, data: GeoKrigingData | None, process_id: UUID | None) -> dict:
+        """
+        Привязка сетки и параметры процесса
+        """
+        metadata = {"grid": result.grid.model_dump(mode="json"), "shape": list(result.grid.shape)}
+        if process_id is not None:
+            metadata["process_id"] = str(process_id)
+        if data is not None:
+            metadata.update(data.model_dump(mode="json", exclude={"grid"}))
+        return metadata
+
+    def export(
+        self,
+        path: Path,
+        result: GeoGridValues,
+        data: GeoKrigingData | None = None,
+        process_id: UUID | None = None,
+        progress: Callable[[int], None] | None = None,
+        cancel_event: Event | None = None,
+    ) -> Path:
+        """
+        Записать результат в файл, формат определяется расширением.
+
+        Файл пишется рядом во временный и заменяет существующий после записи,
+        прогресс передается в процентах
+        """
+        progress = progress or (lambda percent: None)
+        cancel_event = cancel_event or Event()
+        export_format = self.format_of(path)
+        writer = {
+            ExportFormat.NPY: self._write_npy,
+            ExportFormat.NPZ: self._write_npz,
+            ExportFormat.NETCDF: self._write_netcdf,
+            ExportFormat.GEOTIFF: self._write_geotiff,
+        }[export_format]
+        dtype = np.dtype(self.config.DTYPE)
+        metadata = self.metadata(result, data, process_id)
+
+        partial = path.with_name(f"{path.name}.part")
+        with TRACER.span(f"export_{export_format}", "export", nodes=result.values.size) as span:
+            try:
+                with open(partial, "wb") as file:
+                    writer(file, result, dtype, metadata, progress, cancel_event)
+                span.args["bytes"] = partial.stat().st_size
+                partial.replace(path)
+            finally:
+                partial.unlink(missing_ok=True)
+        if export_format == ExportFormat.NPY:
+            path.with_suffix(".json").write_text(json.dumps(metadata, ensure_ascii=False, indent=2))
+        progress(100)
+        return path
+
+    def _block_rows(self, cols: int, dtype: np.dtype) -> int:
+        return max(self.config.CHUNK_BYTES // max(cols * dtype.itemsize, 1), 1)
+
+    @staticmethod
+    def _blocks(
+        values: np.ndarray,
+        dtype: np.dtype,
+        step: int,
+        progress: Callable[[int], None],
+        cancel_event: Event,
+        top_down: bool = False,
+    ) -> Iterator[np.ndarray]:
+        """
+        Блоки строк значений в типе `dtype`, при `top_down` - от последней строки к первой
+        """
+        rows = len(values)
+        count = -(-rows // step)
+        for index, start in enumerate(range(0, rows, step)):
+            if cancel_event.is_set():
+                raise CancelledError
+            stop = min(start + step, rows)
+            if top_down:
+                block = values[rows - stop : rows - start][::-1]
+            else:
+                block = values[start:stop]
+            yield np.ascontiguousarray(block, dtype=dtype)
+            progress(min((index + 1) * 100 // count, 99))
+
+    def _write_npy(
+        self,
+        file: BinaryIO,
+        result: GeoGridValues,
+        dtype: np.dtype,
+        metadata: dict,
+        progress: Callable[[int], None],
+        cancel_event: Event,
+    ) -> None:
+        self._write_npy_array(file, result.values, dtype, progress, cancel_event)
+
+    def _write_npy_array(
+        self,
+        file: BinaryIO,
+        values: np.ndarray,
+        dtype: np.dtype,
+        progress: Callable[[int], None],
+        cancel_event: Event,
+    ) -> None:
+        header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": values.shape}
+        np.lib.format.write_array_header_1_0(file, header)
+        step = self._block_rows(values.shape[1], dtype)
+        for block in self._blocks(values, dtype, step, progress, cancel_event):
+            file.write(block.data)
+
+    def _write_npz(
+        self,
+        file: BinaryIO,
+        result: GeoGridValues,
+        dtype: np.dtype,
+        metadata: dict,
+        progress: Callable[[int], None],
+        cancel_event: Event,
+    ) -> None:
+        level = self.config.COMPRESS_LEVEL
+        compression = zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED
+        with zipfile.ZipFile(file, "w", compression=compression, compresslevel=level or None) as archive:
+            with archive.open("values.npy", "w", force_zip64=True) as entry:
+                self._write_npy_array(entry, result.values, dtype, progress, cancel_event)
+            for name, axis in (("lat", result.grid.lat_axis), ("lon", result.grid.lon_axis)):
+                with archive.open(f"{name}.npy", "w") as entry:
+                    np.lib.format.write_array(entry, axis)
+            archive.writestr("metadata.json", json.dumps(metadata, ensure_ascii=False, indent=2))
+
+    def _write_netcdf(
+        self,
+        file: BinaryIO,
+        result: GeoGridValues,
+        dtype: np.dtype,
+        metadata: dict,
+        progress: Callable[[int], None],
+        cancel_event: Event,
+    ) -> None:
+        rows, cols = result.grid.shape
+        value_dtype = dtype.newbyteorder(">")
+        value_type = _NC_DOUBLE if dtype.itemsize == 8 else _NC_FLOAT
+        global_attributes = {
+            "Conventions": "CF-1.6",
+            "title": "kriging result",
+            **{key: value if isinstance(value, str) else json.dumps(value) for key, value in metadata.items()},
+        }
+        variables = [
+            ("lat", [0], {"standard_name": "latitude", "units": "degrees_north"}, _NC_DOUBLE, rows * 8),
+            ("lon", [1], {"standard_name": "longitude", "units": "degrees_east"}, _NC_DOUBLE, cols * 8),
+            (
+                "value",
+                [0, 1],
+                {"long_name": "kriging estimate", "_FillValue": np.array([np.nan], dtype=value_dtype)},
+                value_type,
+                rows * cols * dtype.itemsize,
+            ),
+        ]
+
+        def header(begins: list[int]) -> bytes:
+            content = b"CDF\x02" + struct.pack(">i", 0)
+            content += struct.pack(">ii", _NC_DIMENSION, 2)
+            content += self._nc_name("lat") + struct.pack(">i", rows)
+            content += self._nc_name("lon") + struct.pack(">i", cols)
+            content += self._nc_attributes(global_attributes)
+            content += struct.pack(">ii", _NC_VARIABLE, len(variables))
+            for (name, dimensions, attributes, nc_type, size), begin in zip(variables, begins):
+                content += self._nc_name(name) + struct.pack(f">i{len(dimensions)}i", len(dimensions), *dimensions)
+                content += self._nc_attributes(attributes)
+                content += struct.pack(">iIq", nc_type, min(size + -size % 4, 2**32 - 1), begin)
+            return content
+
+        begins = [len(header([0] * len(variables)))]
+        for *_, size in variables[:-1]:
+            begins.append(begins[-1] + size + -size % 4)
+        file.write(header(begins))
+        file.write(result.grid.lat_axis.astype(">f8").data)
+        file.write(result.grid.lon_axis.astype(">f8").data)
+        for block in self._blocks(result.values, value_dtype, self._block_rows(cols, dtype), progress, cancel_event):
+            file.write(block.data)
+        size = variables[-1][-1]
+        file.write(b"\0" * (-size % 4))
+
+    @staticmethod
+    def _nc_pad(content: bytes) -> bytes:
+        return content + b"\0" * (-len(content) % 4)
+
+    @classmethod
+    def _nc_name(cls, name: str) -> bytes:
+        content = name.encode()
+        return struct.pack(">i", len(content)) + cls._nc_pad(content)
+
+    @classmethod
+    def _nc_attributes(cls, attributes: dict[str, str | np.ndarray]) -> bytes:
+        content = struct.pack(">ii", _NC_ATTRIBUTE, len(attributes))
+        for name, value in attributes.items():
+            content += cls._nc_name(name)
+            if isinstance(value, str):
+                text = value.encode()
+                content += struct.pack(">ii", _NC_CHAR, len(text)) + cls._nc_pad(text)
+                continue
+            nc_type = {"f8": _NC_DOUBLE, "f4": _NC_FLOAT, "i4": _NC_INT}[value.dtype.str[1:]]
+            data = value.astype(value.dtype.newbyteorder(">")).tobytes()
+            content += struct.pack(">ii", nc_type, len(value)) + cls._nc_pad(data)
+        return content
+
+    def _write_geotiff(
+        self,
+        file: BinaryIO,
+        result: GeoGridValues,
+        dtype: np.dtype,
+        metadata: dict,
+        progress: Callable[[int], None],
+        cancel_event: Event,
+    ) -> None:
+        rows, cols = result.grid.shape
+        row_bytes = cols * dtype.itemsize
+        if rows * row_bytes > _TIFF_MAX_BYTES:
+            raise ExportError("GeoTIFF больше 4 ГБ не поддерживается, используйте nc или npy")
+
+        level = self.config.COMPRESS_LEVEL
+        strip_rows = min(max(self.config.TIFF_STRIP_BYTES // row_bytes, 1), rows)
+        step = strip_rows * max(self._block_rows(cols, dtype) // strip_rows, 1)
+
+        file.write(b"II*\0" + struct.pack("<I", 0))
+        offsets, counts = [], []
+        for block in self._blocks(result.values, dtype.newbyteorder("<"), step, progress, cancel_event, top_down=True):
+            for start in range(0, len(block), strip_rows):
+                strip = block[start : start + strip_rows].tobytes()
+                if level:
+                    strip = zlib.compress(strip, level)
+                offsets.append(file.tell())
+                counts.append(len(strip))
+                file.write(strip)
+                if file.tell() % 2:
+                    file.write(b"\0")
+
+        lon_start, _, lon_step = result.grid.lon
+        lat_start, _, lat_step = result.grid.lat
+        entries = [
+            (256, _TIFF_LONG, [cols]),
+            (257, _TIFF_LONG, [rows]),
+            (258, _TIFF_SHORT, [dtype.itemsize * 8]),
+            (259, _TIFF_SHORT, [8 if level else 1]),
+            (262, _TIFF_SHORT, [1]),
+            (270, _TIFF_ASCII, json.dumps(metadata).encode() + b"\0"),
+            (273, _TIFF_LONG, offsets),
+            (277, _TIFF_SHORT, [1]),
+            (278, _TIFF_LONG, [strip_rows]),
+            (279, _TIFF_LONG, counts),
+            (284, _TIFF_SHORT, [1]),
+            (339, _TIFF_SHORT, [3]),
+            (33550, _TIFF_DOUBLE, [lon_step, lat_step, 0.0]),
+            (33922, _TIFF_DOUBLE, [0.0, 0.0, 0.0, lon_start - lon_step / 2, lat_start + (rows - 0.5) * lat_step, 0.0]),
+            (34735, _TIFF_SHORT, [1, 1, 0, 3, 1024, 0, 1, 2, 1025, 0, 1, 1, 2048, 0, 1, 4326]),
+            (42113, _TIFF_ASCII, b"nan\0"),
+        ]
+
+        directory = struct.pack("<H", len(entries))
+        for tag, tiff_type, values in entries:
+            count = len(values)
+            items = [values] if tiff_type == _TIFF_ASCII else values
+            content = struct.pack(f"<{count}{_TIFF_FORMATS[tiff_type]}", *items)
+            if len(content) <= 4:
+                directory += struct.pack("<HHI", tag, tiff_type, count) + content.ljust(4, b"\0")
+                continue
+            directory += struct.pack("<HHII", tag, tiff_type, count, file.tell())
+            file.write(content)
+            if file.tell() % 2:
+                file.write(b"\0")
+
+        directory_offset = file.tell()
+        file.write(directory + struct.pack("<I", 0))
+        file.seek(4)
+        file.write(struct.pack("<I", directory_offset))
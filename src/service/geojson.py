@@ -0,0 +1,92 @@
+import re
+from collections.abc import Iterable
+
+import numpy as np
+
+from entity.point import GeoPointSet
+
+from .exceptions import KrigingServiceExceptions
+from .loader import ColumnsBuffer
+
+_NUMBER = rb"-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|NaN|-?Infinity"
+_COORDINATES = re.compile(rb'"coordinates"\s*:\s*\[\s*((?:' + _NUMBER + rb")\s*,\s*(?:" + _NUMBER + rb"))\s*\]")
+_VALUE = re.compile(rb'"properties"\s*:\s*\{[^{}]*?"value"\s*:\s*(' + _NUMBER + rb"|null)")
+_COORDINATES_KEY = b'"coordinates"'
+
+
+class GeoJSONPointsDecoder:
+    """
+    Потоковый разбор GeoJSON коллекции точек в массивы numpy.
+
+    Из потока извлекаются только координаты и значения из свойств точек,
+    дерево json целиком не создается. Значение `null` становится NaN
+    """
+
+    def __init__(self, size: int | None = None) -> None:
+        self.buffer = ColumnsBuffer(estimate=size or 0)
+        self.tail = b""
+        self.coordinates = np.empty((0, 2))
+        self.values = np.empty(0)
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Разобрать очередную часть ответа
+        """
+        data = self.tail + chunk
+        cut = data.rfind(_COORDINATES_KEY)
+        if cut <= 0:
+            self.tail = data
+            return
+        self._parse(data[:cut])
+        self.tail = data[cut:]
+
+    def finish(self) -> GeoPointSet:
+        """
+        Завершить разбор и получить набор точек
+        """
+        self._parse(self.tail)
+        self.tail = b""
+        if len(self.coordinates) or len(self.values):
+            self._mismatch()
+        lon, lat, value = self.buffer.columns()
+        return GeoPointSet(lon=lon, lat=lat, value=value)
+
+    @classmethod
+    def decode(cls, chunks: Iterable[bytes], size: int | None = None) -> GeoPointSet:
+        """
+        Разобрать ответ, переданный частями
+        """
+        decoder = cls(size=size)
+        for chunk in chunks:
+            decoder.feed(chunk)
+        return decoder.finish()
+
+    def _parse(self, data: bytes) -> None:
+        """
+        Разобрать часть ответа из целых ключей.
+
+        Координаты и значения одной точки могут попасть в разные части,
+        поэтому непарный остаток из одной точки переносится на следующий разбор
+        """
+        coordinates = _COORDINATES.findall(data)
+        values = _VALUE.findall(data)
+        if coordinates:
+            coordinates = np.fromstring(b" ".join(coordinates).replace(b",", b" "), sep=" ").reshape(-1, 2)
+            self.coordinates = np.concatenate([self.coordinates, coordinates])
+        if values:
+            values = np.fromstring(b" ".join(values).replace(b"null", b"NaN"), sep=" ")
+            self.values = np.concatenate([self.values, values])
+
+        count = min(len(self.coordinates), len(self.values))
+        if count:
+            self.buffer.append(self.coordinates[:count, 0], self.coordinates[:count, 1], self.values[:count])
+            self.coordinates = self.coordinates[count:]
+            self.values = self.values[count:]
+        if len(self.coordinates) > 1 or len(self.values) > 1:
+            self._mismatch()
+
+    @staticmethod
+    def _mismatch() -> None:
+        raise KrigingServiceExceptions.IncorrectResponseError(
+            errors="Число координат точек не совпадает с числом значений"
+        )
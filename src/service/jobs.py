@@ -0,0 +1,231 @@
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from threading import Event, Lock, Thread
+from uuid import UUID
+
+from config import settings
+from entity.kriging import GeoGrid, GeoGridValues
+from entity.states import FAILED_PROCESS_STATUSES, ProcessStatus
+
+from .exceptions import KrigingServiceException, KrigingServiceExceptions
+from .executor import AsyncKrigingService
+from .polling import PollingScheduler
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    Отслеживаемый процесс кригинга.
+
+    Сетка процесса, найденного по идентификатору, определяется при загрузке результата.
+    Результат завершенного процесса не хранится в задании, он загружается
+    из хранилища результатов через `JobScheduler.load`
+    """
+
+    def __init__(self, process_id: UUID, grid: GeoGrid | None, description: str, points: int | None) -> None:
+        self.process_id = process_id
+        self.grid = grid
+        self.description = description
+        self.points = points
+        self.status: str = ProcessStatus.PENDING
+        self.created = time.monotonic()
+        self.finished: float | None = None
+        self.error: Exception | None = None
+        self.future: Future | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.created
+
+    @property
+    def nodes(self) -> int | None:
+        if self.grid is None:
+            return None
+        rows, cols = self.grid.shape
+        return rows * cols
+
+    @property
+    def is_done(self) -> bool:
+        return self.finished is not None
+
+
+class JobScheduler:
+    """
+    Общее расписание опроса отслеживаемых процессов.
+
+    Статусы всех незавершенных процессов сервера запрашиваются вместе в одном
+    потоке, задержка между опросами растет экспоненциально и сбрасывается
+    при добавлении процесса. Результаты завершенных процессов загружаются
+    в хранилище заранее, процессы клиента вычисляются в пуле. Процесс, не
+    завершившийся за `POLL_DEADLINE`, считается неуспешным.
+    Об изменении процесса сообщается в `on_change` из фоновых потоков
+    """
+
+    def __init__(self, kriging_service: AsyncKrigingService, on_change: Callable[[Job], None]) -> None:
+        self.kriging_service = kriging_service
+        self.on_change = on_change
+        self.jobs: dict[UUID, Job] = {}
+        self.lock = Lock()
+        self.wake_event = Event()
+        self.stop_event = Event()
+        self.thread: Thread | None = None
+        self.scheduler = self._create_scheduler()
+
+    @staticmethod
+    def _create_scheduler() -> PollingScheduler:
+        api = settings.kriging_api
+        return PollingScheduler(
+            initial=api.POLL_INITIAL, maximum=api.POLL_MAX, factor=api.POLL_FACTOR, deadline=api.POLL_DEADLINE
+        )
+
+    def add(
+        self, process_id: UUID, grid: GeoGrid | None = None, description: str = "", points: int | None = None
+    ) -> Job:
+        """
+        Отслеживать процесс, повторно добавленный процесс не перезапускается
+        """
+        with self.lock:
+            job = self.jobs.get(process_id)
+            if job is not None:
+                return job
+            job = self.jobs[process_id] = Job(process_id, grid, description, points)
+            self.scheduler = self._create_scheduler()
+            if self.thread is None:
+                self.thread = Thread(target=self._run, name="kriging-jobs", daemon=True)
+                self.thread.start()
+        self.wake_event.set()
+        return job
+
+    def remove(self, process_id: UUID) -> None:
+        """
+        Перестать отслеживать процесс, вычисление процесса клиента отменяется
+        """
+        with self.lock:
+            job = self.jobs.pop(process_id, None)
+        if job is not None and job.future is not None:
+            job.future.cancel()
+
+    def stop(self) -> None:
+        """
+        Остановить опрос и отменить вычисления
+        """
+        self.stop_event.set()
+        self.wake_event.set()
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if job.future is not None:
+                job.future.cancel()
+
+    def load(self, job: Job) -> Future[GeoGridValues]:
+        """
+        Загрузить результат успешно завершенного процесса из хранилища или с сервера
+        """
+        return self.kriging_service.fetch_result(job.process_id, job.grid)
+
+    def _run(self) -> None:
+        while not self.stop_event.is_set():
+            with self.lock:
+                pending = [job for job in self.jobs.values() if job.future is None and not job.is_done]
+            try:
+                remote = self._poll(pending)
+            except KrigingServiceException as ex:
+                LOGGER.error(f"Error poll jobs: {ex}")
+                remote = pending
+            except Exception as ex:
+                LOGGER.exception("Error poll jobs")
+                for job in pending:
+                    if job.future is None and not job.is_done:
+                        self._fail(job, ex)
+                remote = []
+
+            for job in remote:
+                if job.elapsed > settings.kriging_api.POLL_DEADLINE:
+                    self._fail(job, KrigingServiceExceptions.DeadlineError())
+            remote = [job for job in remote if not job.is_done]
+
+            delay = None
+            if remote:
+                delay = self.scheduler.next_delay() or settings.kriging_api.POLL_MAX
+            self.wake_event.wait(delay)
+            self.wake_event.clear()
+
+    def _poll(self, pending: list[Job]) -> list[Job]:
+        """
+        Запросить статусы процессов сервера, возвращает еще не завершенные.
+
+        Процесс с ошибкой запроса статуса опрашивается дальше до `POLL_DEADLINE`,
+        неуспешным считается только не найденный процесс
+        """
+        service = self.kriging_service.service
+        remote = []
+        for job in pending:
+            if service.is_client_process(job.process_id):
+                job.status = ProcessStatus.RUNNING
+                job.future = self.kriging_service.wait_result(job.process_id, job.grid)
+                job.future.add_done_callback(lambda future, job=job: self._done(job, future))
+                self._notify(job)
+            else:
+                remote.append(job)
+        if not remote:
+            return []
+
+        statuses = service.get_process_statuses([job.process_id for job in remote])
+        running = []
+        for job in remote:
+            status = statuses[job.process_id]
+            if isinstance(status, KrigingServiceExceptions.NotFoundError):
+                self._fail(job, status)
+            elif isinstance(status, KrigingServiceException):
+                LOGGER.warning(f"Error poll job {job.process_id}: {status}")
+                running.append(job)
+            elif status == ProcessStatus.SUCCESS:
+                job.status = status
+                job.future = self.kriging_service.submit(self._fetch, job)
+                job.future.add_done_callback(lambda future, job=job: self._done(job, future))
+                self._notify(job)
+            elif status in FAILED_PROCESS_STATUSES:
+                job.status = status
+                self._fail(job, KrigingServiceExceptions.ProcessFailedError(status=status))
+            else:
+                running.append(job)
+                if status != job.status:
+                    job.status = status
+                    self._notify(job)
+        return running
+
+    def _fetch(self, job: Job) -> GeoGridValues:
+        """
+        Загрузить результат завершенного процесса в хранилище, для найденного процесса - вместе с его данными
+        """
+        service = self.kriging_service.service
+        if job.grid is None:
+            data = service.get_process_data(job.process_id)
+            job.grid = data.grid
+            job.description = job.description or f"{data.vario}, {data.kriging}"
+            service.result_store.put_data(job.process_id, data)
+        return service.fetch_result(job.process_id, job.grid)
+
+    def _done(self, job: Job, future: Future[GeoGridValues]) -> None:
+        if future.cancelled():
+            return
+        job.future = None
+        error = future.exception()
+        if error is not None:
+            self._fail(job, error)
+            return
+        job.status = ProcessStatus.SUCCESS
+        job.finished = time.monotonic()
+        self._notify(job)
+
+    def _fail(self, job: Job, error: Exception) -> None:
+        job.error = error
+        job.finished = time.monotonic()
+        self._notify(job)
+
+    def _notify(self, job: Job) -> None:
+        if job.process_id in self.jobs:
+            self.on_change(job)
@@ -1,153 +1,1121 @@
 import logging
+import re
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from contextvars import copy_context
+from functools import partial
 from http import HTTPMethod, HTTPStatus
-from uuid import UUID
+from pathlib import Path
+from threading import Event, Lock
+from uuid import UUID, uuid4
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import settings
-from entity.kriging import GeoGrid, GeoKrigingData
-from entity.point import GeoPointFeatureCollection
-from entity.states import TIMEOUT, KrigingModel, Variogram
+from entity.kriging import GeoGrid, GeoGridValues, GeoKrigingData, GeoProcessState
+from entity.point import GeoPointSet
+from entity.states import FAILED_PROCESS_STATUSES, TIMEOUT, Backend, KrigingModel, ProcessStatus, Variogram
+
+from .cache import PointsCache
+from .engine import KrigingEngine
+from .exceptions import KrigingServiceException, KrigingServiceExceptions
+from .export import GridExporter
+from .geojson import GeoJSONPointsDecoder
+from .polling import PollingScheduler, parse_retry_after
+from .preflight import CostEstimate, PreflightEstimator, RunHistory
+from .store import ResultStore
+from .trace import TRACER
+from .upload import PointsEncoder
+from .validation import CrossValidationReport, CrossValidator
 
 LOGGER = logging.getLogger(__name__)
 
+_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
 
-class KrigingServiceException(Exception):
-    """Базовое исключение сервиса кригинга"""
 
+class KrigingService:
+    """
+    Сервис кригинга
+    """
 
-class KrigingServiceExceptions:
-    class InternalError(KrigingServiceException):
-        """Внутрення ошибка"""
+    EXCEPTIONS = KrigingServiceExceptions
 
-        message = "Произошла внутреняя ошибка"
+    def __init__(self) -> None:
+        self.timeout = TIMEOUT
+        self.session = self._create_session()
+        self.points_cache = PointsCache(settings.cache.DIR / settings.cache.POINTS_FILE)
+        self.verified_points: set[UUID] = set()
+        self.upload_lock = Lock()
+        self.upload_locks: dict[str, Lock] = {}
+        self.result_store = ResultStore(
+            results_dir=settings.cache.DIR / settings.cache.RESULTS_DIR,
+            points_dir=settings.cache.DIR / settings.cache.POINTS_DIR,
+            size=settings.cache.STORE_SIZE,
+            pending_age=settings.kriging_api.POLL_DEADLINE,
+        )
+        self.engine = KrigingEngine(
+            block_bytes=settings.local_engine.BLOCK_BYTES,
+            nugget=settings.local_engine.NUGGET,
+            sample=settings.local_engine.VARIOGRAM_SAMPLE,
+            bins=settings.local_engine.VARIOGRAM_BINS,
+        )
+        self.validator = CrossValidator(self.engine, max_points=settings.local_engine.VALIDATION_MAX_POINTS)
+        self.exporter = GridExporter(settings.export)
+        self.points_encoder = PointsEncoder(settings.kriging_api)
+        self.run_history = RunHistory(
+            settings.cache.DIR / settings.preflight.HISTORY_FILE, size=settings.preflight.HISTORY_SIZE
+        )
+        self.estimator = PreflightEstimator(settings.preflight, self.run_history, self.points_encoder)
+        self.runs: dict[UUID, tuple[float, Backend, KrigingModel, int, int]] = {}
+        self.local_processes: dict[UUID, tuple[GeoPointSet, GeoKrigingData]] = {}
+        self.local_lock = Lock()
+        self.tiled_processes: dict[UUID, tuple[GeoPointSet, GeoKrigingData]] = {}
+        self.batch_status = settings.kriging_api.BATCH_STATUS
+        self.status_executor = ThreadPoolExecutor(
+            max_workers=settings.kriging_api.WORKERS, thread_name_prefix="kriging-status"
+        )
 
-        def __init__(self) -> None:
-            super(self.__class__, self).__init__(self.message)
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """
+        Создать сессию с пулом соединений и повторами идемпотентных запросов
+        """
+        api = settings.kriging_api
+        retry = Retry(
+            total=api.RETRY_TOTAL,
+            backoff_factor=api.RETRY_BACKOFF,
+            status_forcelist=api.RETRY_STATUSES,
+            allowed_methods=frozenset({HTTPMethod.GET}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=api.POOL_SIZE, pool_maxsize=api.POOL_SIZE, max_retries=retry)
 
-    class NotFoundError(KrigingServiceException):
-        """Не найден искомый объект"""
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not api.KEEP_ALIVE:
+            session.headers["Connection"] = "close"
+        return session
 
-        message = "Не найден искомый объект"
+    @property
+    def connection_stats(self) -> dict[str, int]:
+        """
+        Счетчики запросов и открытых соединений пула
+        """
+        stats = {"requests": 0, "connections": 0}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+        stats["reused"] = stats["requests"] - stats["connections"]
+        return stats
 
-        def __init__(self) -> None:
-            super(self.__class__, self).__init__(self.message)
+    def close(self) -> None:
+        """
+        Закрыть соединения сессии и пул запросов статусов
+        """
+        self.status_executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
 
-    class IncorrectDataError(KrigingServiceException):
-        """Ошибка ввода"""
+    def _timeout(self, endpoint: str) -> float:
+        return settings.kriging_api.TIMEOUTS.get(endpoint, self.timeout)
 
-        message = "Произошла ошибка ввода данных. {errors}"
+    def save_points(self, points: GeoPointSet) -> UUID:
+        """
+        Сохранить точки координат.
 
-        def __init__(self, errors: str) -> None:
-            super(self.__class__, self).__init__(self.message.format(errors=errors))
+        Точки кодируются `PointsEncoder` в формате и сжатии, которые сервер
+        объявил в ответе OPTIONS (запрашивается один раз), если сервер все же
+        отвечает 415, они отправляются заново в более простом кодировании
+        """
+        plain = not self._negotiate_upload()
+        while True:
+            with TRACER.span("encode_points", "serialize", points=len(points)) as span:
+                encoded = self.points_encoder.encode(points, plain=plain)
+                span.args.update(
+                    media_type=encoded.media_type,
+                    encoding=encoded.encoding,
+                    raw_bytes=encoded.raw_bytes,
+                    encoded_bytes=len(encoded.body),
+                )
+            try:
+                response_data = self.__connect(
+                    method=HTTPMethod.POST,
+                    url=settings.kriging_api.SAVE_POINTS,
+                    body=encoded.body,
+                    headers=encoded.headers,
+                    timeout=self._timeout("SAVE_POINTS"),
+                )
+            except KrigingServiceExceptions.UnsupportedMediaTypeError as ex:
+                if plain or not self.points_encoder.downgrade(encoded, ex.accept_encoding):
+                    raise
+                continue
+            LOGGER.info(
+                f"Saved {len(points)} points: {encoded.raw_bytes} bytes {encoded.media_type}, "
+                f"{len(encoded.body)} bytes {encoded.encoding} ({encoded.ratio:.1f}x)"
+            )
+            return UUID(response_data["id"])
 
+    def _negotiate_upload(self) -> bool:
+        """
+        Запросить у сервера принимаемые форматы и сжатие точек, если это еще не сделано.
 
-class KrigingService:
-    """
-    Сервис кригинга
-    """
+        Сервер без OPTIONS (404, 405, 501) получает GeoJSON без сжатия. При другой
+        ошибке возвращает `False`: точки отправляются так же, а запрос повторится
+        при следующей отправке
+        """
+        encoder = self.points_encoder
+        with encoder.lock:
+            if encoder.is_negotiated:
+                return True
+            unsupported = (HTTPStatus.NOT_FOUND, HTTPStatus.METHOD_NOT_ALLOWED, HTTPStatus.NOT_IMPLEMENTED)
+            try:
+                response = self.__request(
+                    method=HTTPMethod.OPTIONS,
+                    url=settings.kriging_api.SAVE_POINTS,
+                    passthrough=unsupported,
+                )
+            except KrigingServiceException as ex:
+                LOGGER.warning(f"Error request upload formats, send points as GeoJSON: {ex}")
+                return False
+            if response.status_code in unsupported:
+                encoder.negotiate(None, None)
+            else:
+                encoder.negotiate(response.headers.get("Accept-Post"), response.headers.get("Accept-Encoding"))
+            return True
 
-    EXCEPTIONS = KrigingServiceExceptions
+    def get_points(self, points_id: UUID) -> GeoPointSet:
+        """
+        Получить точки координат
+        """
+        points = self.result_store.get_points(points_id)
+        if points is not None:
+            return points
 
-    def __init__(self) -> None:
-        self.timeout = TIMEOUT
+        points = self._get_server_points(points_id)
+        self.result_store.put_points(points_id, points)
+        return points
 
-    def save_points(self, points: GeoPointFeatureCollection) -> UUID:
+    def _get_server_points(self, points_id: UUID) -> GeoPointSet:
         """
-        Сохранить точки координат
+        Получить точки координат с сервера, минуя хранилище
         """
-        response_data = self.__connect(
-            method=HTTPMethod.POST, url=settings.kriging_api.SAVE_POINTS, data=points.model_dump(mode="json")
+        response = self.__request(
+            method=HTTPMethod.GET,
+            url=settings.kriging_api.GET_POINTS.format(points_id=points_id),
+            timeout=self._timeout("GET_POINTS"),
+            stream=True,
         )
-        return response_data["id"]
+        return self._decode_points(response)
 
-    def get_points(self, points_id: UUID) -> GeoPointFeatureCollection:
+    def upload_points(self, points: GeoPointSet) -> tuple[UUID, bool]:
         """
-        Получить точки координат
+        Сохранить точки координат, если их еще нет на сервере.
+
+        Возвращает идентификатор точек и признак того, что он взят из кэша.
+        Одинаковые наборы, отправляемые одновременно, отправляются один раз
         """
-        response_data = self.__connect(
-            method=HTTPMethod.GET, url=settings.kriging_api.GET_POINTS.format(points_id=points_id)
-        )
-        return GeoPointFeatureCollection(**response_data)
+        with self.upload_lock:
+            lock = self.upload_locks.setdefault(points.digest, Lock())
+        with lock:
+            return self._upload_points(points)
+
+    def _upload_points(self, points: GeoPointSet) -> tuple[UUID, bool]:
+        points_id = self.points_cache.get(points.digest)
+        if points_id is not None and settings.cache.POINTS_VERIFY and points_id not in self.verified_points:
+            try:
+                self._get_server_points(points_id)
+                self.verified_points.add(points_id)
+            except KrigingServiceExceptions.NotFoundError:
+                self.points_cache.discard(points.digest)
+                points_id = None
+        if points_id is not None:
+            self.result_store.put_points(points_id, points)
+            return points_id, True
+
+        points_id = self.save_points(points=points)
+        self.points_cache.set(points.digest, points_id)
+        self.result_store.put_points(points_id, points)
+        return points_id, False
 
     def create_process(
         self,
-        points: GeoPointFeatureCollection,
+        points: GeoPointSet,
         grid: GeoGrid,
         vario_type: Variogram,
         kriging_type: KrigingModel,
+        backend: Backend | None = None,
     ) -> UUID:
         """
-        Создать процесс кригинга
+        Создать процесс кригинга.
+
+        Если `backend` не задан, используется `LocalEngine.BACKEND`.
+        При `KrigingAPI.TILING` большая сетка считается на сервере частями
+        """
+        backend = self.select_backend(points, grid, backend)
+        with TRACER.span("create_process", points=len(points)) as span:
+            if backend == Backend.LOCAL:
+                span.process_id = self.create_local_process(points, grid, vario_type, kriging_type)
+            else:
+                span.process_id = self._create_remote_process(points, grid, vario_type, kriging_type)[1]
+        self._start_run(span.process_id, backend, kriging_type, points, grid)
+        return span.process_id
+
+    def create_sweep(
+        self,
+        points: GeoPointSet,
+        grid: GeoGrid,
+        combinations: list[tuple[Variogram, KrigingModel]],
+        backend: Backend | None = None,
+    ) -> dict[tuple[Variogram, KrigingModel], UUID | KrigingServiceException]:
+        """
+        Создать процессы кригинга для всех сочетаний вариограммы и метода.
+
+        Точки отправляются один раз, процессы создаются одновременно.
+        Ошибка создания процесса сочетания возвращается вместо его идентификатора,
+        остальные процессы запускаются
+        """
+        if not combinations:
+            return {}
+        if self.select_backend(points, grid, backend) == Backend.LOCAL:
+            processes = {
+                (vario_type, kriging_type): self.create_local_process(points, grid, vario_type, kriging_type)
+                for vario_type, kriging_type in combinations
+            }
+            for (_, kriging_type), process_id in processes.items():
+                self._start_run(process_id, Backend.LOCAL, kriging_type, points, grid)
+            return processes
+
+        first, *others = combinations
+        points_id, process_id = self._create_remote_process(points, grid, *first)
+        processes: dict[tuple[Variogram, KrigingModel], UUID | KrigingServiceException] = {first: process_id}
+        create = partial(self.create_tiled_process, points) if self.is_tiled(grid) else self.create_points_process
+        with ThreadPoolExecutor(
+            max_workers=settings.kriging_api.WORKERS, thread_name_prefix="kriging-sweep"
+        ) as executor:
+            futures = {
+                (vario_type, kriging_type): executor.submit(create, points_id, grid, vario_type, kriging_type)
+                for vario_type, kriging_type in others
+            }
+            for combination, future in futures.items():
+                try:
+                    processes[combination] = future.result()
+                except KrigingServiceException as ex:
+                    LOGGER.warning(f"Error create sweep process {combination}: {ex}")
+                    processes[combination] = ex
+        for (_, kriging_type), process_id in processes.items():
+            if isinstance(process_id, UUID):
+                self._start_run(process_id, Backend.REMOTE, kriging_type, points, grid)
+        return processes
+
+    def _create_remote_process(
+        self,
+        points: GeoPointSet,
+        grid: GeoGrid,
+        vario_type: Variogram,
+        kriging_type: KrigingModel,
+    ) -> tuple[UUID, UUID]:
+        """
+        Отправить точки и создать процесс на сервере, возвращает идентификаторы точек и процесса.
+
+        Если точки из кэша не найдены на сервере, они отправляются заново
+        """
+        create = partial(self.create_tiled_process, points) if self.is_tiled(grid) else self.create_points_process
+        points_id, is_cached = self.upload_points(points)
+        try:
+            return points_id, create(points_id, grid, vario_type, kriging_type)
+        except KrigingServiceExceptions.NotFoundError:
+            if not is_cached:
+                raise
+            self.points_cache.discard(points.digest)
+
+        points_id, _ = self.upload_points(points)
+        return points_id, create(points_id, grid, vario_type, kriging_type)
+
+    def create_points_process(
+        self,
+        points_id: UUID,
+        grid: GeoGrid,
+        vario_type: Variogram,
+        kriging_type: KrigingModel,
+        store: bool = True,
+    ) -> UUID:
+        """
+        Создать процесс кригинга по сохраненным точкам.
+
+        Без `store` данные процесса не сохраняются в хранилище (процессы частей сетки)
+        """
+        with TRACER.span("create_points_process") as span:
+            kriging_data = GeoKrigingData(
+                points_id=points_id,
+                grid=grid,
+                vario=vario_type,
+                kriging=kriging_type,
+            )
+            response_data = self.__connect(
+                method=HTTPMethod.POST,
+                url=settings.kriging_api.CREATE_PROCESS,
+                data=kriging_data.model_dump(mode="json"),
+                timeout=self._timeout("CREATE_PROCESS"),
+            )
+            span.process_id = process_id = UUID(response_data["id"])
+        if store:
+            self.result_store.put_data(process_id, kriging_data)
+        return process_id
+
+    @staticmethod
+    def is_tiled(grid: GeoGrid) -> bool:
+        """
+        Считать ли сетку на сервере частями
+        """
+        rows, cols = grid.shape
+        return settings.kriging_api.TILING and rows * cols > settings.kriging_api.TILE_NODES
+
+    def create_tiled_process(
+        self,
+        points: GeoPointSet,
+        points_id: UUID,
+        grid: GeoGrid,
+        vario_type: Variogram,
+        kriging_type: KrigingModel,
+    ) -> UUID:
+        """
+        Создать процесс кригинга, который считается частями сетки.
+
+        Процессы частей создаются в `wait_result`, идентификатор процесса локальный.
+        Точки нужны, чтобы отправить их заново, если сервер их не найдет
         """
-        points_id = self.save_points(points=points)
         kriging_data = GeoKrigingData(
             points_id=points_id,
             grid=grid,
             vario=vario_type,
             kriging=kriging_type,
         )
-        response_data = self.__connect(
-            method=HTTPMethod.POST, url=settings.kriging_api.CREATE_PROCESS, data=kriging_data.model_dump(mode="json")
+        process_id = uuid4()
+        with self.local_lock:
+            self.tiled_processes[process_id] = (points, kriging_data)
+        self.result_store.put_data(process_id, kriging_data)
+        return process_id
+
+    def run_tiled_process(
+        self, process_id: UUID, cancel_event: Event | None = None, deadline: float | None = None
+    ) -> GeoGridValues:
+        """
+        Посчитать процесс частями сетки.
+
+        Одновременно на сервере не больше `TILE_CONCURRENCY` частей, их статусы
+        опрашиваются вместе, неуспешная часть пересоздается до `TILE_RETRIES` раз,
+        результаты собираются в одну сетку. Если сервер не нашел точки из кэша,
+        они отправляются заново один раз
+        """
+        try:
+            return self._run_tiled_process(process_id, cancel_event or Event(), deadline)
+        finally:
+            self._discard_process(process_id)
+
+    def _run_tiled_process(self, process_id: UUID, cancel_event: Event, deadline: float | None) -> GeoGridValues:
+        api = settings.kriging_api
+        with self.local_lock:
+            points, kriging_data = self.tiled_processes[process_id]
+        tiles = kriging_data.grid.tiles(api.TILE_NODES)
+        values = np.full(kriging_data.grid.shape, np.nan)
+        scheduler = PollingScheduler(
+            initial=api.POLL_INITIAL,
+            maximum=api.POLL_MAX,
+            factor=api.POLL_FACTOR,
+            deadline=deadline or api.POLL_DEADLINE,
         )
-        return response_data["id"]
 
-    def get_result_process(self, process_id: UUID) -> GeoPointFeatureCollection:
+        pending = deque(range(len(tiles)))
+        attempts = [0] * len(tiles)
+        active: dict[UUID, int] = {}
+        is_uploaded = False
+
+        def retry(index: int, error: KrigingServiceException) -> None:
+            attempts[index] += 1
+            if attempts[index] > api.TILE_RETRIES:
+                raise error
+            LOGGER.warning(f"Retry tile {index} of process {process_id}: {error}")
+            pending.append(index)
+
+        def reupload(index: int, points_id: UUID, error: KrigingServiceException) -> None:
+            nonlocal kriging_data, is_uploaded
+            if points_id != kriging_data.points_id:
+                pending.append(index)
+                return
+            if is_uploaded:
+                retry(index, error)
+                return
+            LOGGER.warning(f"Points {points_id} of process {process_id} are not found, upload them again")
+            self.points_cache.discard(points.digest)
+            new_points_id, _ = self.upload_points(points)
+            kriging_data = kriging_data.model_copy(update={"points_id": new_points_id})
+            with self.local_lock:
+                self.tiled_processes[process_id] = (points, kriging_data)
+            self.result_store.put_data(process_id, kriging_data)
+            is_uploaded = True
+            pending.append(index)
+
+        def create(index: int, points_id: UUID) -> UUID:
+            return self.create_points_process(
+                points_id, tiles[index][2], kriging_data.vario, kriging_data.kriging, store=False
+            )
+
+        def fetch(tile_id: UUID, index: int, state: GeoProcessState) -> GeoGridValues:
+            return state.result or self.get_result_grid(tile_id, tiles[index][2])
+
+        with ThreadPoolExecutor(max_workers=api.TILE_CONCURRENCY, thread_name_prefix="kriging-tile") as executor:
+            while pending or active:
+                if cancel_event.is_set():
+                    raise CancelledError
+
+                points_id = kriging_data.points_id
+                created: dict[int, Future[UUID]] = {}
+                while pending and len(active) + len(created) < api.TILE_CONCURRENCY:
+                    index = pending.popleft()
+                    created[index] = executor.submit(copy_context().run, create, index, points_id)
+                for index, future in created.items():
+                    try:
+                        active[future.result()] = index
+                    except KrigingServiceExceptions.NotFoundError as ex:
+                        reupload(index, points_id, ex)
+                    except (KrigingServiceExceptions.InternalError, KrigingServiceExceptions.ProcessFailedError) as ex:
+                        retry(index, ex)
+
+                states = {
+                    tile_id: executor.submit(copy_context().run, self.get_process_state, tile_id, tiles[index][2])
+                    for tile_id, index in active.items()
+                }
+                results: dict[UUID, Future[GeoGridValues]] = {}
+                for tile_id, future in states.items():
+                    try:
+                        state = future.result()
+                    except (KrigingServiceExceptions.InternalError, KrigingServiceExceptions.DeadlineError) as ex:
+                        retry(active.pop(tile_id), ex)
+                        continue
+                    if state.status == ProcessStatus.SUCCESS:
+                        results[tile_id] = executor.submit(copy_context().run, fetch, tile_id, active[tile_id], state)
+                    elif state.status in FAILED_PROCESS_STATUSES:
+                        retry(active.pop(tile_id), KrigingServiceExceptions.ProcessFailedError(status=state.status))
+
+                for tile_id, future in results.items():
+                    index = active.pop(tile_id)
+                    try:
+                        tile = future.result()
+                    except (
+                        KrigingServiceExceptions.InternalError,
+                        KrigingServiceExceptions.IncorrectResponseError,
+                    ) as ex:
+                        retry(index, ex)
+                        continue
+                    rows, cols, _ = tiles[index]
+                    values[rows, cols] = tile.values
+                if results or not active:
+                    continue
+
+                delay = scheduler.next_delay()
+                if delay is None:
+                    raise KrigingServiceExceptions.DeadlineError
+                with TRACER.span("poll_delay", "wait", delay=delay):
+                    if cancel_event.wait(delay):
+                        raise CancelledError
+
+        result = GeoGridValues(grid=kriging_data.grid, values=values)
+        self._finish_run(process_id)
+        self.result_store.put_result(process_id, result)
+        return result
+
+    @staticmethod
+    def select_backend(points: GeoPointSet, grid: GeoGrid, backend: Backend | None = None) -> Backend:
         """
-        Получение результатов кригинга
+        Выбрать, где считать процесс: на сервере или локально
+        """
+        config = settings.local_engine
+        backend = backend or config.BACKEND
+        if backend != Backend.AUTO:
+            return backend
+
+        rows, cols = grid.shape
+        if len(points) <= config.AUTO_MAX_POINTS and len(points) * rows * cols <= config.AUTO_MAX_WORK:
+            return Backend.LOCAL
+        return Backend.REMOTE
+
+    def estimate(
+        self,
+        points: GeoPointSet | None,
+        grid: GeoGrid,
+        kriging_type: KrigingModel | None,
+        backend: Backend | None = None,
+    ) -> CostEstimate:
+        """
+        Оценка процесса кригинга до запуска, без запросов к серверу
+        """
+        if points is None:
+            backend = Backend.LOCAL if backend == Backend.LOCAL else Backend.REMOTE
+            return self.estimator.estimate(None, grid, kriging_type, backend)
+        backend = self.select_backend(points, grid, backend)
+        is_uploaded = self.points_cache.get(points.digest) is not None
+        return self.estimator.estimate(points, grid, kriging_type, backend, is_uploaded=is_uploaded)
+
+    def _start_run(
+        self, process_id: UUID, backend: Backend, kriging_type: KrigingModel, points: GeoPointSet, grid: GeoGrid
+    ) -> None:
+        rows, cols = grid.shape
+        with self.local_lock:
+            self.runs[process_id] = (time.monotonic(), backend, kriging_type, len(points), rows * cols)
+
+    def _finish_run(self, process_id: UUID, seconds: float | None = None) -> None:
         """
-        response_data = self.__connect(
-            method=HTTPMethod.GET, url=settings.kriging_api.GET_PROCESS_RESULT.format(process_id=process_id)
+        Записать время завершенного процесса в историю запусков
+        """
+        with self.local_lock:
+            run = self.runs.pop(process_id, None)
+        if run is None:
+            return
+        start, backend, kriging_type, points, nodes = run
+        self.run_history.add(backend, kriging_type, points, nodes, seconds or time.monotonic() - start)
+
+    def _discard_process(self, process_id: UUID) -> None:
+        """
+        Забыть процесс, вычисляемый на клиенте, после завершения, ошибки или отмены
+        """
+        with self.local_lock:
+            self.tiled_processes.pop(process_id, None)
+            self.local_processes.pop(process_id, None)
+            self.runs.pop(process_id, None)
+
+    def create_local_process(
+        self,
+        points: GeoPointSet,
+        grid: GeoGrid,
+        vario_type: Variogram,
+        kriging_type: KrigingModel,
+    ) -> UUID:
+        """
+        Создать процесс локального кригинга.
+
+        Вычисление выполняется в `wait_result`, идентификатор точек берется
+        из кэша загруженных точек или из хэша набора
+        """
+        points_id = self.points_cache.get(points.digest) or UUID(hex=points.digest[:32])
+        kriging_data = GeoKrigingData(
+            points_id=points_id,
+            grid=grid,
+            vario=vario_type,
+            kriging=kriging_type,
         )
-        return GeoPointFeatureCollection(**response_data)
+        process_id = uuid4()
+        with self.local_lock:
+            self.local_processes[process_id] = (points, kriging_data)
+        self.result_store.put_points(points_id, points)
+        self.result_store.put_data(process_id, kriging_data)
+        return process_id
+
+    def run_local_process(self, process_id: UUID, cancel_event: Event | None = None) -> GeoGridValues:
+        """
+        Вычислить локальный процесс кригинга
+        """
+        with self.local_lock:
+            points, kriging_data = self.local_processes[process_id]
+        start = time.monotonic()
+        try:
+            with TRACER.process(process_id):
+                result = self.engine.run(
+                    points, kriging_data.grid, kriging_data.vario, kriging_data.kriging, cancel_event=cancel_event
+                )
+            self._finish_run(process_id, time.monotonic() - start)
+            self.result_store.put_result(process_id, result)
+        finally:
+            self._discard_process(process_id)
+        return result
+
+    def get_result_process(self, process_id: UUID) -> GeoPointSet:
+        """
+        Получение результатов кригинга
+        """
+        with TRACER.process(process_id):
+            response = self.__request(
+                method=HTTPMethod.GET,
+                url=settings.kriging_api.GET_PROCESS_RESULT.format(process_id=process_id),
+                timeout=self._timeout("GET_PROCESS_RESULT"),
+                stream=True,
+            )
+            return self._decode_points(response)
+
+    def get_result_grid(self, process_id: UUID, grid: GeoGrid) -> GeoGridValues:
+        """
+        Получение результатов кригинга в узлах сетки.
+
+        Если сервер поддерживает бинарный формат, результат приходит npy массивом
+        (при необходимости сжатым через Content-Encoding) с сеткой в заголовке,
+        иначе разбирается GeoJSON коллекция точек
+        """
+        api = settings.kriging_api
+        headers = {"Accept": f"{api.RESULT_MEDIA_TYPE}, application/json;q=0.5"} if api.RESULT_BINARY else None
+        with TRACER.process(process_id):
+            response = self.__request(
+                method=HTTPMethod.GET,
+                url=api.GET_PROCESS_RESULT.format(process_id=process_id),
+                headers=headers,
+                timeout=self._timeout("GET_PROCESS_RESULT"),
+                stream=True,
+            )
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+            if content_type != api.RESULT_MEDIA_TYPE:
+                rows, cols = grid.shape
+                points = self._decode_points(response, size=rows * cols)
+                with TRACER.span("assemble_grid", "parse", nodes=rows * cols):
+                    return GeoGridValues.from_points(points, grid)
+
+            grid_header = response.headers.get(api.RESULT_GRID_HEADER)
+            with TRACER.span("decode_npy", "parse") as span:
+                if grid_header:
+                    grid = GeoGrid.model_validate_json(grid_header)
+                content = response.content
+                span.args["bytes_received"] = len(content)
+                return GeoGridValues.from_npy(content, grid)
+
+    def load_process(self, process_id: UUID) -> tuple[GeoKrigingData, GeoGridValues] | None:
+        """
+        Получение данных и результата завершенного процесса, `None` если процесс не завершен
+        """
+        stored = self.result_store.get_process(process_id)
+        if stored is not None:
+            return stored
+
+        if self.get_process_status(process_id) != ProcessStatus.SUCCESS:
+            return None
+        process_data = self.get_process_data(process_id)
+        result = self.get_result_grid(process_id, process_data.grid)
+        self.result_store.put_data(process_id, process_data)
+        self.result_store.put_result(process_id, result)
+        return process_data, result
+
+    def export_result(
+        self,
+        process_id: UUID,
+        path: Path,
+        result: GeoGridValues | None = None,
+        progress: Callable[[int], None] | None = None,
+        cancel_event: Event | None = None,
+    ) -> Path:
+        """
+        Экспорт результата процесса в файл, формат определяется расширением.
+
+        Значения берутся из хранилища (читаются с диска блоками) или из `result`,
+        параметры процесса - из хранилища или с сервера
+        """
+        stored = self.result_store.get_process(process_id)
+        if stored is not None:
+            data, result = stored
+        else:
+            try:
+                data = self.get_process_data(process_id)
+            except KrigingServiceExceptions.NotFoundError:
+                data = None
+        if result is None:
+            raise KrigingServiceExceptions.NotFoundError
+        return self.exporter.export(path, result, data, process_id, progress=progress, cancel_event=cancel_event)
+
+    def cross_validate(
+        self,
+        points: GeoPointSet,
+        combinations: list[tuple[Variogram, KrigingModel]] | None = None,
+        cancel_event: Event | None = None,
+    ) -> CrossValidationReport:
+        """
+        Перекрестная проверка с исключением по одной точке для сочетаний вариограммы
+        и метода кригинга (по умолчанию - всех), считается локально
+        """
+        if combinations is None:
+            combinations = [(vario_type, kriging_type) for vario_type in Variogram for kriging_type in KrigingModel]
+        return self.validator.validate(points, combinations, cancel_event=cancel_event)
 
     def get_process_data(self, process_id: UUID) -> GeoKrigingData:
         """
         Получение данных о кригинге
         """
-        response_data = self.__connect(
-            method=HTTPMethod.GET, url=settings.kriging_api.GET_PROCESS_DATA.format(process_id=process_id)
-        )
-        return GeoKrigingData(**response_data)
+        stored = self.result_store.get_process(process_id)
+        if stored is not None:
+            return stored[0]
+
+        with TRACER.process(process_id):
+            response_data = self.__connect(
+                method=HTTPMethod.GET,
+                url=settings.kriging_api.GET_PROCESS_DATA.format(process_id=process_id),
+                timeout=self._timeout("GET_PROCESS_DATA"),
+            )
+            with TRACER.span("validate_process_data", "validate"):
+                return GeoKrigingData(**response_data)
+
+    def is_client_process(self, process_id: UUID) -> bool:
+        """
+        Вычисляется ли процесс на клиенте: локально или частями сетки
+        """
+        return process_id in self.local_processes or process_id in self.tiled_processes
+
+    def fetch_result(self, process_id: UUID, grid: GeoGrid) -> GeoGridValues:
+        """
+        Получение результата завершенного процесса с сохранением в хранилище
+        """
+        stored = self.result_store.get_process(process_id)
+        if stored is not None:
+            return stored[1]
+
+        result = self.get_result_grid(process_id, grid)
+        self.result_store.put_result(process_id, result)
+        return result
 
     def get_process_status(self, process_id: UUID) -> str:
         """
         Получение статуса процесса кригинга
         """
-        response_data = self.__connect(
-            method=HTTPMethod.GET, url=settings.kriging_api.GET_PROCESS_STATUS.format(process_id=process_id)
-        )
+        if self.is_client_process(process_id):
+            return ProcessStatus.PENDING
+
+        with TRACER.process(process_id):
+            response_data = self.__connect(
+                method=HTTPMethod.GET,
+                url=settings.kriging_api.GET_PROCESS_STATUS.format(process_id=process_id),
+                timeout=self._timeout("GET_PROCESS_STATUS"),
+            )
+        if response_data["status"] == ProcessStatus.SUCCESS:
+            self._finish_run(process_id)
         return response_data["status"]
 
-    def __connect(self, method: HTTPMethod, url: str, data: dict | None = None, headers: dict | None = None) -> dict:
+    def get_process_statuses(self, process_ids: list[UUID]) -> dict[UUID, str | KrigingServiceException]:
+        """
+        Получение статусов набора процессов кригинга.
+
+        Если сервер поддерживает запрос статусов набора (`KrigingAPI.BATCH_STATUS`),
+        статусы получаются одним запросом, иначе запрашиваются одновременно
+        по одному. Если ответ на запрос набора не разбирается, статусы далее
+        запрашиваются по одному. Ошибка запроса набора выбрасывается,
+        ошибка получения статуса одного процесса возвращается вместо статуса
+        """
+        api = settings.kriging_api
+        statuses: dict[UUID, str | KrigingServiceException] = {
+            process_id: ProcessStatus.PENDING for process_id in process_ids if self.is_client_process(process_id)
+        }
+        remote = [process_id for process_id in process_ids if process_id not in statuses]
+        if not remote:
+            return statuses
+
+        if self.batch_status:
+            unsupported = (HTTPStatus.NOT_FOUND, HTTPStatus.METHOD_NOT_ALLOWED)
+            response = self.__request(
+                method=HTTPMethod.POST,
+                url=api.GET_PROCESS_STATUSES,
+                data={"ids": [str(process_id) for process_id in remote]},
+                timeout=self._timeout("GET_PROCESS_STATUS"),
+                passthrough=unsupported,
+            )
+            received = None
+            if response.status_code in unsupported:
+                LOGGER.info("Batch status is not supported, statuses are requested one by one")
+            else:
+                with TRACER.span("decode_json", "parse", bytes_received=len(response.content)):
+                    try:
+                        received = response.json()["statuses"]
+                    except (ValueError, KeyError, TypeError) as ex:
+                        LOGGER.warning(f"Error decode batch status, statuses are requested one by one: {ex!r}")
+                if not isinstance(received, dict):
+                    received = None
+            if received is None:
+                self.batch_status = False
+            else:
+                for process_id in remote:
+                    statuses[process_id] = received.get(str(process_id)) or KrigingServiceExceptions.NotFoundError()
+                    if statuses[process_id] == ProcessStatus.SUCCESS:
+                        self._finish_run(process_id)
+                return statuses
+
+        futures = {
+            process_id: self.status_executor.submit(copy_context().run, self.get_process_status, process_id)
+            for process_id in remote
+        }
+        for process_id, future in futures.items():
+            try:
+                statuses[process_id] = future.result()
+            except KrigingServiceException as ex:
+                statuses[process_id] = ex
+        return statuses
+
+    def get_process_state(self, process_id: UUID, grid: GeoGrid, wait: float | None = None) -> GeoProcessState:
+        """
+        Получение состояния процесса кригинга.
+
+        При `wait` сервер может удерживать запрос до завершения процесса
+        и вернуть результат в том же ответе
+        """
+        params = None
+        timeout = self._timeout("GET_PROCESS_STATUS")
+        if wait:
+            params = {"wait": wait, "include_result": True}
+            timeout += wait
+
+        with TRACER.process(process_id):
+            response = self.__request(
+                method=HTTPMethod.GET,
+                url=settings.kriging_api.GET_PROCESS_STATUS.format(process_id=process_id),
+                data=params,
+                timeout=timeout,
+            )
+            with TRACER.span("decode_json", "parse", bytes_received=len(response.content)):
+                response_data = response.json()
+
+            result = None
+            if response_data.get("result") is not None:
+                with TRACER.span("decode_result", "parse"):
+                    result = GeoGridValues.from_points(GeoPointSet.from_geojson(response_data["result"]), grid)
+        return GeoProcessState(
+            status=response_data["status"],
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            result=result,
+        )
+
+    def wait_result(
+        self,
+        process_id: UUID,
+        grid: GeoGrid,
+        cancel_event: Event | None = None,
+        deadline: float | None = None,
+    ) -> GeoGridValues:
+        """
+        Дождаться завершения процесса кригинга и получить результат
+        """
+        with TRACER.process(process_id), TRACER.span("wait_result"):
+            if process_id in self.local_processes:
+                return self.run_local_process(process_id, cancel_event=cancel_event)
+            if process_id in self.tiled_processes:
+                return self.run_tiled_process(process_id, cancel_event=cancel_event, deadline=deadline)
+            return self._poll_result(process_id, grid, cancel_event, deadline)
+
+    def _poll_result(
+        self, process_id: UUID, grid: GeoGrid, cancel_event: Event | None, deadline: float | None
+    ) -> GeoGridValues:
+        api = settings.kriging_api
+        cancel_event = cancel_event or Event()
+        scheduler = PollingScheduler(
+            initial=api.POLL_INITIAL,
+            maximum=api.POLL_MAX,
+            factor=api.POLL_FACTOR,
+            deadline=deadline or api.POLL_DEADLINE,
+        )
+        wait = api.LONG_POLL_WAIT if api.LONG_POLL else None
+
+        while True:
+            state = self.get_process_state(process_id, grid, wait=min(wait, scheduler.remaining) if wait else None)
+            if state.status == ProcessStatus.SUCCESS:
+                self._finish_run(process_id)
+                result = state.result or self.get_result_grid(process_id, grid)
+                self.result_store.put_result(process_id, result)
+                return result
+            if state.status in FAILED_PROCESS_STATUSES:
+                raise KrigingServiceExceptions.ProcessFailedError(status=state.status)
+
+            delay = scheduler.next_delay(state.retry_after)
+            if delay is None:
+                raise KrigingServiceExceptions.DeadlineError
+            with TRACER.span("poll_delay", "wait", delay=delay):
+                if cancel_event.wait(delay):
+                    raise CancelledError
+
+    def wait_batch(
+        self,
+        process_ids: list[UUID],
+        grid: GeoGrid,
+        on_result: Callable[[UUID, GeoGridValues | Exception], None] | None = None,
+        cancel_event: Event | None = None,
+        deadline: float | None = None,
+    ) -> dict[UUID, GeoGridValues | Exception]:
+        """
+        Дождаться завершения набора процессов с одной сеткой.
+
+        Статусы процессов сервера опрашиваются вместе (`get_process_statuses`),
+        локальные процессы считаются в пуле потоков. Результат или ошибка каждого процесса передается в `on_result`
+        по мере завершения, ошибка одного процесса не прерывает остальные.
+        При ошибке запроса статуса процессы опрашиваются дальше до срока ожидания
+        """
+        api = settings.kriging_api
+        on_result = on_result or (lambda process_id, result: None)
+        cancel_event = cancel_event or Event()
+        scheduler = PollingScheduler(
+            initial=api.POLL_INITIAL,
+            maximum=api.POLL_MAX,
+            factor=api.POLL_FACTOR,
+            deadline=deadline or api.POLL_DEADLINE,
+        )
+        results: dict[UUID, GeoGridValues | Exception] = {}
+        lock = Lock()
+
+        def fail(process_id: UUID, error: Exception) -> None:
+            with lock:
+                results[process_id] = error
+            on_result(process_id, error)
+
+        def deliver(process_id: UUID, future: Future[GeoGridValues]) -> None:
+            if future.cancelled() or isinstance(future.exception(), CancelledError):
+                return
+            if future.exception() is not None:
+                fail(process_id, future.exception())
+                return
+            with lock:
+                results[process_id] = future.result()
+            on_result(process_id, future.result())
+
+        with ThreadPoolExecutor(max_workers=api.WORKERS, thread_name_prefix="kriging-batch") as executor:
+            futures = []
+            active = []
+            for process_id in process_ids:
+                if self.is_client_process(process_id):
+                    future = executor.submit(self.wait_result, process_id, grid, cancel_event, deadline)
+                    future.add_done_callback(lambda future, process_id=process_id: deliver(process_id, future))
+                    futures.append(future)
+                else:
+                    active.append(process_id)
+
+            while active:
+                try:
+                    statuses = self.get_process_statuses(active)
+                except KrigingServiceException as ex:
+                    LOGGER.warning(f"Error poll batch: {ex}")
+                    statuses = {}
+                for process_id, status in statuses.items():
+                    if isinstance(status, KrigingServiceExceptions.NotFoundError):
+                        active.remove(process_id)
+                        fail(process_id, status)
+                    elif isinstance(status, KrigingServiceException):
+                        LOGGER.warning(f"Error poll process {process_id}: {status}")
+                    elif status == ProcessStatus.SUCCESS:
+                        active.remove(process_id)
+                        future = executor.submit(self.fetch_result, process_id, grid)
+                        future.add_done_callback(lambda future, process_id=process_id: deliver(process_id, future))
+                        futures.append(future)
+                    elif status in FAILED_PROCESS_STATUSES:
+                        active.remove(process_id)
+                        fail(process_id, KrigingServiceExceptions.ProcessFailedError(status=status))
+                if not active:
+                    break
+
+                delay = scheduler.next_delay()
+                if delay is None:
+                    for process_id in active:
+                        fail(process_id, KrigingServiceExceptions.DeadlineError())
+                    break
+                if cancel_event.wait(delay):
+                    raise CancelledError
+
+            wait_futures(futures)
+        if cancel_event.is_set():
+            raise CancelledError
+        return results
+
+    @staticmethod
+    def _decode_points(response: requests.Response, size: int | None = None) -> GeoPointSet:
+        """
+        Потоковый разбор GeoJSON коллекции точек из ответа
+        """
+        received = 0
+
+        def count(chunks: Iterator[bytes]) -> Iterator[bytes]:
+            nonlocal received
+            for chunk in chunks:
+                received += len(chunk)
+                yield chunk
+
+        with response, TRACER.span("decode_geojson", "parse") as span:
+            chunks = response.iter_content(chunk_size=settings.kriging_api.STREAM_CHUNK_SIZE)
+            points = GeoJSONPointsDecoder.decode(count(chunks), size=size)
+            span.args.update(bytes_received=received, points=len(points))
+            return points
+
+    def __connect(
+        self,
+        method: HTTPMethod,
+        url: str,
+        data: dict | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        body: bytes | None = None,
+    ) -> dict:
         """
         Отправка запроса
         """
+        response = self.__request(method=method, url=url, data=data, headers=headers, timeout=timeout, body=body)
+        with TRACER.span("decode_json", "parse", bytes_received=len(response.content)):
+            return response.json()
+
+    def __request(
+        self,
+        method: HTTPMethod,
+        url: str,
+        data: dict | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+        body: bytes | None = None,
+        passthrough: tuple[HTTPStatus, ...] = (),
+    ) -> requests.Response:
+        """
+        Отправка запроса с проверкой статуса ответа.
+
+        POST запрос отправляет `body` как есть, если он задан, иначе `data` в json.
+        Ответы со статусами из `passthrough` возвращаются без ошибки.
+        Замер запроса содержит размер отправленного тела и полученного ответа,
+        для потоковых ответов - из Content-Length
+        """
         uri = f"{settings.kriging_api.HOST}{url}"
+        timeout = timeout or self.timeout
 
-        try:
-            match method:
-                case HTTPMethod.GET:
-                    response = requests.get(uri, params=data, headers=headers, timeout=self.timeout)
-                case HTTPMethod.POST:
-                    response = requests.post(uri, json=data, headers=headers, timeout=self.timeout)
-                case _:
-                    raise KrigingServiceExceptions.InternalError
-        except Exception as ex:
-            LOGGER.error(f"Error send request: {ex}")
-            raise KrigingServiceExceptions.InternalError
+        with TRACER.span(f"{method} {_UUID.sub('{id}', url)}", "http") as span:
+            try:
+                match method:
+                    case HTTPMethod.GET:
+                        response = self.session.get(uri, params=data, headers=headers, timeout=timeout, stream=stream)
+                    case HTTPMethod.POST if body is not None:
+                        response = self.session.post(uri, data=body, headers=headers, timeout=timeout)
+                    case HTTPMethod.POST:
+                        response = self.session.post(uri, json=data, headers=headers, timeout=timeout)
+                    case HTTPMethod.OPTIONS:
+                        response = self.session.options(uri, headers=headers, timeout=timeout)
+                    case _:
+                        raise KrigingServiceExceptions.InternalError
+            except Exception as ex:
+                LOGGER.error(f"Error send request: {ex}")
+                span.args["error"] = str(ex)
+                raise KrigingServiceExceptions.InternalError
+
+            received = response.headers.get("Content-Length") if stream else len(response.content)
+            span.args.update(
+                status=response.status_code,
+                bytes_sent=len(response.request.body or b""),
+                bytes_received=int(received) if received is not None else None,
+            )
 
         http_status = HTTPStatus(response.status_code)
-        response_data = response.json()
 
-        if http_status.is_success:
-            return response_data
+        if http_status.is_success or http_status in passthrough:
+            return response
 
         match http_status:
             case HTTPStatus.UNPROCESSABLE_ENTITY:
-                errors = "\n".join(f"{err['loc']} {err['msg']}" for err in response_data["detail"])
+                errors = "\n".join(f"{err['loc']} {err['msg']}" for err in response.json()["detail"])
                 raise KrigingServiceExceptions.IncorrectDataError(errors=errors)
             case HTTPStatus.NOT_FOUND:
                 raise KrigingServiceExceptions.NotFoundError
+            case HTTPStatus.UNSUPPORTED_MEDIA_TYPE:
+                raise KrigingServiceExceptions.UnsupportedMediaTypeError(
+                    accept_encoding=response.headers.get("Accept-Encoding")
+                )
             case _:
                 raise KrigingServiceExceptions.InternalError
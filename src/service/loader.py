@@ -0,0 +1,218 @@
+import re
+import warnings
+from collections.abc import Callable
+from concurrent.futures import CancelledError
+from pathlib import Path
+from threading import Event
+from typing import BinaryIO
+
+import numpy as np
+
+from config.points import PointsFile
+from entity.point import GeoPointSet
+
+from .trace import TRACER
+
+
+class PointsFileError(ValueError):
+    """Ошибка чтения файла с точками"""
+
+
+class PointsFileLoader:
+    """
+    Потоковая загрузка точек из текстовых и npy файлов.
+
+    Текст читается блоками и разбирается numpy, в памяти остаются
+    только нужные столбцы
+    """
+
+    _DELIMITERS = (b",", b";", b"\t", b"|")
+
+    def __init__(self, config: PointsFile) -> None:
+        self.config = config
+
+    def load(
+        self,
+        path: Path,
+        progress: Callable[[int], None] | None = None,
+        cancel_event: Event | None = None,
+    ) -> GeoPointSet:
+        """
+        Загрузить точки из файла, прогресс передается в процентах
+        """
+        progress = progress or (lambda percent: None)
+        cancel_event = cancel_event or Event()
+        with TRACER.span("parse_points_file", "parse", bytes=path.stat().st_size):
+            if path.suffix.lower() == ".npy":
+                lat, lon, value = self._load_npy(path)
+            else:
+                lat, lon, value = self._load_text(path, progress, cancel_event)
+        progress(100)
+        with TRACER.span("validate_points", "validate", points=len(value)):
+            return GeoPointSet(lon=lon, lat=lat, value=value)
+
+    def _load_npy(self, path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        try:
+            data = np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as ex:
+            raise PointsFileError(f"Не удалось прочитать файл: {ex}")
+        if data.ndim != 2:
+            raise PointsFileError("Массив с точками должен быть двумерным")
+        if data.dtype.names:
+            raise PointsFileError("Структурные массивы не поддерживаются")
+        columns = self._column_indexes(header=None, count=data.shape[1])
+        return tuple(data[:, column] for column in columns)
+
+    def _load_text(
+        self, path: Path, progress: Callable[[int], None], cancel_event: Event
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        size = path.stat().st_size
+        with open(path, "rb") as file:
+            header, delimiter, count, position, line_size = self._read_layout(file)
+            columns = self._column_indexes(header, count)
+            file.seek(position)
+
+            buffer = ColumnsBuffer(estimate=(size - position) // line_size + 1)
+            tail = b""
+            row = 0
+            while chunk := file.read(self.config.CHUNK_SIZE):
+                if cancel_event.is_set():
+                    raise CancelledError
+                chunk = tail + chunk
+                end = chunk.rfind(b"\n") + 1
+                if end == 0:
+                    tail = chunk
+                    continue
+                chunk, tail = chunk[:end], chunk[end:]
+                row += self._parse_chunk(chunk, delimiter, count, columns, buffer, row)
+                progress(int(file.tell() * 99 / max(size, 1)))
+            if tail.strip():
+                self._parse_chunk(tail, delimiter, count, columns, buffer, row)
+        return buffer.columns()
+
+    def _read_layout(self, file: BinaryIO) -> tuple[list[str] | None, bytes | None, int, int, int]:
+        """
+        Определить заголовок, разделитель, число столбцов, начало и длину первой строки данных
+        """
+        comments = self.config.COMMENTS.encode()
+        header = None
+        for _ in range(self.config.SKIP_ROWS):
+            file.readline()
+        while True:
+            position = file.tell()
+            line = file.readline()
+            if not line:
+                raise PointsFileError("Файл не содержит точек")
+            stripped = (line.split(comments, 1)[0] if comments else line).strip()
+            if not stripped:
+                continue
+
+            delimiter = self._detect_delimiter(stripped)
+            fields = [field.strip() for field in stripped.split(delimiter)]
+            try:
+                [float(field) for field in fields]
+            except ValueError:
+                if header is not None:
+                    raise PointsFileError(f"Некорректная строка: {line.decode(errors='replace').strip()}")
+                header = [field.decode(errors="replace") for field in fields]
+                continue
+            return header, delimiter, len(fields), position, len(line)
+
+    def _detect_delimiter(self, line: bytes) -> bytes | None:
+        if self.config.DELIMITER is not None:
+            return self.config.DELIMITER.encode() if self.config.DELIMITER.strip() else None
+        for delimiter in self._DELIMITERS:
+            if delimiter in line:
+                return delimiter
+        return None
+
+    def _column_indexes(self, header: list[str] | None, count: int) -> tuple[int, int, int]:
+        """
+        Номера столбцов широты, долготы и значения
+        """
+        indexes = []
+        for column in (self.config.LAT_COLUMN, self.config.LON_COLUMN, self.config.VALUE_COLUMN):
+            if isinstance(column, str):
+                if header is None or column not in header:
+                    raise PointsFileError(f"В заголовке файла нет столбца {column}")
+                column = header.index(column)
+            if not (0 <= column < count):
+                raise PointsFileError(f"Файл содержит {count} столбцов, столбца {column} нет")
+            indexes.append(column)
+        return tuple(indexes)
+
+    def _parse_chunk(
+        self,
+        chunk: bytes,
+        delimiter: bytes | None,
+        count: int,
+        columns: tuple[int, int, int],
+        buffer: "ColumnsBuffer",
+        row: int,
+    ) -> int:
+        """
+        Разобрать блок целых строк, возвращает число строк
+        """
+        comments = self.config.COMMENTS.encode()
+        if comments and comments in chunk:
+            chunk = re.sub(re.escape(comments) + rb".*", b"", chunk)
+        if delimiter is not None:
+            chunk = chunk.replace(delimiter, b" ")
+        fields = self._row_fields(chunk)
+        invalid = (fields != 0) & (fields != count)
+        if invalid.any():
+            index = int(invalid.argmax())
+            number = row + np.count_nonzero(fields[:index]) + 1
+            raise PointsFileError(f"Строка данных {number} содержит {fields[index]} столбцов вместо {count}")
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", DeprecationWarning)
+                values = np.fromstring(chunk, sep=" ")
+        except (ValueError, DeprecationWarning):
+            raise PointsFileError(f"Некорректные данные после строки {row}")
+        if values.size % count:
+            raise PointsFileError(f"Некорректные данные после строки {row}")
+
+        values = values.reshape(-1, count)
+        buffer.append(*(values[:, column] for column in columns))
+        return len(values)
+
+    @staticmethod
+    def _row_fields(chunk: bytes) -> np.ndarray:
+        """
+        Число полей в каждой строке блока, разделенных пробельными символами
+        """
+        data = np.frombuffer(chunk, dtype=np.uint8)
+        space = data <= ord(" ")
+        previous = np.empty_like(space)
+        previous[:1] = True
+        previous[1:] = space[:-1]
+        starts = np.flatnonzero(~space & previous)
+        newlines = np.flatnonzero(data == ord("\n"))
+        return np.bincount(np.searchsorted(newlines, starts), minlength=len(newlines) + 1)
+
+
+class ColumnsBuffer:
+    """
+    Расширяемые массивы столбцов точек
+    """
+
+    def __init__(self, estimate: int) -> None:
+        self.size = 0
+        self.data = np.empty((3, max(estimate, 1024)))
+
+    def append(self, *columns: np.ndarray) -> None:
+        end = self.size + len(columns[0])
+        if end > self.data.shape[1]:
+            data = np.empty((3, max(end, int(self.data.shape[1] * 1.5))))
+            data[:, : self.size] = self.data[:, : self.size]
+            self.data = data
+        for index, column in enumerate(columns):
+            self.data[index, self.size : end] = column
+        self.size = end
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.size < self.data.shape[1] // 2:
+            self.data = self.data[:, : self.size].copy()
+        return tuple(self.data[index, : self.size] for index in range(3))
@@ -0,0 +1,53 @@
+import time
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Разобрать заголовок Retry-After в секунды
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class PollingScheduler:
+    """
+    Расписание опроса с экспоненциальной задержкой и общим сроком ожидания
+    """
+
+    def __init__(self, initial: float, maximum: float, factor: float, deadline: float) -> None:
+        self.initial = initial
+        self.delay = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.deadline = time.monotonic() + deadline
+
+    @property
+    def remaining(self) -> float:
+        """
+        Оставшееся до срока время
+        """
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def next_delay(self, retry_after: float | None = None) -> float | None:
+        """
+        Задержка до следующего опроса, `None` если срок ожидания истек.
+
+        Задержка из Retry-After не меньше начальной, чтобы нулевое значение
+        не приводило к опросу без пауз
+        """
+        remaining = self.remaining
+        if remaining <= 0:
+            return None
+
+        delay = self.delay if retry_after is None else max(retry_after, self.initial)
+        self.delay = min(self.delay * self.factor, self.maximum)
+        return min(delay, remaining)
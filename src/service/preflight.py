@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+from pydantic import BaseModel
+
+from config import settings
+from config.preflight import PreflightSettings
+from entity.kriging import GeoGrid
+from entity.point import GeoPointSet
+from entity.states import Backend, Budget, KrigingModel, RenderMode
+
+from .upload import PointsEncoder
+
+LOGGER = logging.getLogger(__name__)
+
+
+def format_bytes(size: float) -> str:
+    """
+    Размер в байтах в читаемом виде
+    """
+    for unit in ("байт", "КБ", "МБ", "ГБ"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "байт" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ТБ"
+
+
+class RunHistory:
+    """
+    Время завершенных процессов кригинга с числом точек и узлов.
+
+    Хранится в памяти и сохраняется в json файл, старые записи вытесняются
+    """
+
+    def __init__(self, path: Path, size: int) -> None:
+        self.path = path
+        self.size = size
+        self.lock = Lock()
+        self.entries: list[dict] = self._load()
+
+    def add(self, backend: Backend, kriging: KrigingModel, points: int, nodes: int, seconds: float) -> None:
+        """
+        Запомнить время процесса
+        """
+        entry = {"backend": backend, "kriging": kriging, "points": points, "nodes": nodes, "seconds": seconds}
+        with self.lock:
+            self.entries.append(entry)
+            del self.entries[: -self.size]
+            self._save()
+
+    def select(self, backend: Backend, kriging: KrigingModel) -> np.ndarray:
+        """
+        Записи для места вычисления и метода кригинга: массив (точки, узлы, секунды)
+        """
+        with self.lock:
+            rows = [
+                (entry["points"], entry["nodes"], entry["seconds"])
+                for entry in self.entries
+                if entry["backend"] == backend and entry["kriging"] == kriging
+            ]
+        return np.array(rows, dtype=float).reshape(-1, 3)
+
+    def _load(self) -> list[dict]:
+        try:
+            return json.loads(self.path.read_text())[-self.size :]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as ex:
+            LOGGER.warning(f"Error read run history: {ex}")
+            return []
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self.entries))
+            os.replace(tmp_path, self.path)
+        except OSError as ex:
+            LOGGER.warning(f"Error write run history: {ex}")
+
+
+class CostEstimate(BaseModel):
+    """
+    Оценка стоимости процесса кригинга до запуска
+    """
+
+    backend: Backend
+    points: int
+    nodes: int
+    request_bytes: int
+    response_bytes: int
+    memory_bytes: int
+    seconds: float | None
+    runs: int
+    budget: Budget = Budget.OK
+    reasons: list[str] = []
+
+
+class PreflightEstimator:
+    """
+    Предварительная оценка процесса кригинга.
+
+    Размеры запроса и ответа считаются по формату обмена (запрос - кодированием
+    части точек тем же `PointsEncoder`, что и при отправке), память клиента -
+    по замерам разбора и рисования на узел сетки, время - по истории запусков:
+    степенная модель `seconds = c * points^a * nodes^b` для метода кригинга
+    (по множителю, который в истории не менялся, время считается пропорциональным),
+    при малом числе запусков - пропорционально `points * nodes`
+    """
+
+    SAMPLE_POINTS = 1000
+    JSON_BYTES_PER_NODE = 136
+    JSON_DECODE_BYTES_PER_NODE = 260
+    NPY_HEADER_BYTES = 128
+    CONTOUR_BYTES_PER_NODE = 1300
+    RASTER_BYTES = 32 * 1024**2
+
+    def __init__(self, config: PreflightSettings, history: RunHistory, encoder: PointsEncoder) -> None:
+        self.config = config
+        self.history = history
+        self.encoder = encoder
+        self._point_bytes: tuple[tuple, int, float] | None = None
+
+    def estimate(
+        self,
+        points: GeoPointSet | None,
+        grid: GeoGrid,
+        kriging: KrigingModel | None,
+        backend: Backend,
+        is_uploaded: bool = False,
+    ) -> CostEstimate:
+        """
+        Оценить процесс, `is_uploaded` - точки уже есть на сервере.
+
+        Время оценивается, если известны точки и метод кригинга
+        """
+        rows, cols = grid.shape
+        nodes = rows * cols
+        count = 0 if points is None else len(points)
+
+        if backend == Backend.LOCAL:
+            request_bytes = response_bytes = 0
+            decode_bytes = nodes * 8 + 2 * (count + 1) ** 2 * 8 + settings.local_engine.BLOCK_BYTES
+        else:
+            request_bytes = 0 if points is None or is_uploaded else self._request_bytes(points)
+            if settings.kriging_api.RESULT_BINARY:
+                response_bytes = nodes * 8 + self.NPY_HEADER_BYTES
+                decode_bytes = response_bytes + nodes * 8
+            else:
+                response_bytes = nodes * self.JSON_BYTES_PER_NODE
+                decode_bytes = nodes * self.JSON_DECODE_BYTES_PER_NODE
+
+        render_bytes = self._render_bytes(nodes)
+        seconds, runs = self._seconds(backend, kriging, count, nodes) if count and kriging else (None, 0)
+        estimate = CostEstimate(
+            backend=backend,
+            points=count,
+            nodes=nodes,
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+            memory_bytes=decode_bytes + render_bytes,
+            seconds=seconds,
+            runs=runs,
+        )
+        self._check_budget(estimate)
+        return estimate
+
+    def _request_bytes(self, points: GeoPointSet) -> int:
+        """
+        Размер тела запроса точек по кодированию первых `SAMPLE_POINTS` точек
+        """
+        key = (points.digest, self.encoder.binary, self.encoder.encoding)
+        if self._point_bytes is None or self._point_bytes[0] != key:
+            size = min(len(points), self.SAMPLE_POINTS)
+            sample, empty = (
+                GeoPointSet.model_construct(lat=points.lat[:count], lon=points.lon[:count], value=points.value[:count])
+                for count in (size, 0)
+            )
+            empty_bytes = len(self.encoder.encode(empty).body)
+            per_point = (len(self.encoder.encode(sample).body) - empty_bytes) / max(size, 1)
+            self._point_bytes = (key, empty_bytes, per_point)
+        return int(self._point_bytes[1] + self._point_bytes[2] * len(points))
+
+    def _render_bytes(self, nodes: int) -> int:
+        config = settings.render
+        mode = config.MODE
+        if mode == RenderMode.AUTO:
+            mode = RenderMode.RASTER if nodes > config.RASTER_MIN_NODES else RenderMode.CONTOUR
+        if mode == RenderMode.RASTER:
+            return self.RASTER_BYTES
+        return nodes * self.CONTOUR_BYTES_PER_NODE
+
+    def _seconds(self, backend: Backend, kriging: KrigingModel, points: int, nodes: int) -> tuple[float | None, int]:
+        """
+        Время процесса по истории запусков и число использованных запусков
+        """
+        runs = self.history.select(backend, kriging)
+        runs = runs[(runs > 0).all(axis=1)]
+        if not len(runs):
+            return None, 0
+
+        if len(runs) >= self.config.MIN_FIT_RUNS:
+            logs = np.log(runs)
+            query = np.log([points, nodes])
+            varying = [column for column in (0, 1) if np.ptp(logs[:, column]) > 0]
+            fixed = [column for column in (0, 1) if column not in varying]
+            features = np.column_stack([np.ones(len(runs)), logs[:, varying]])
+            target = logs[:, 2] - logs[:, fixed].sum(axis=1)
+            coefs = np.linalg.lstsq(features, target, rcond=None)[0]
+            return float(np.exp(coefs[0] + coefs[1:] @ query[varying] + query[fixed].sum())), len(runs)
+
+        rate = np.median(runs[:, 2] / (runs[:, 0] * runs[:, 1]))
+        return float(rate * points * nodes), len(runs)
+
+    def _check_budget(self, estimate: CostEstimate) -> None:
+        config = self.config
+        checks = (
+            ("Узлов", estimate.nodes, config.SOFT_NODES, config.HARD_NODES, str),
+            ("Памяти", estimate.memory_bytes, config.SOFT_MEMORY, config.HARD_MEMORY, format_bytes),
+            ("Времени", estimate.seconds, config.SOFT_SECONDS, config.HARD_SECONDS, lambda value: f"{value:.0f} с"),
+        )
+        for name, value, soft, hard, fmt in checks:
+            if value is None:
+                continue
+            if hard is not None and value > hard:
+                estimate.budget = Budget.HARD
+                estimate.reasons.append(f"{name} {fmt(value)} больше предела {fmt(hard)}")
+            elif soft is not None and value > soft:
+                if estimate.budget == Budget.OK:
+                    estimate.budget = Budget.SOFT
+                estimate.reasons.append(f"{name} {fmt(value)} больше рекомендуемых {fmt(soft)}")
@@ -0,0 +1,182 @@
+import logging
+import os
+import shutil
+import time
+from collections.abc import Callable
+from pathlib import Path
+from threading import RLock
+from typing import BinaryIO
+from uuid import UUID
+
+import numpy as np
+
+from entity.kriging import GeoGridValues, GeoKrigingData
+from entity.point import GeoPointSet
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """
+    Локальное хранилище завершенных процессов кригинга.
+
+    Сетки и точки хранятся в npy файлах и открываются через отображение в память,
+    при превышении размера удаляются давно не использованные записи.
+    Данные процесса без результата удаляются через `pending_age` секунд
+    """
+
+    DATA_FILE = "data.json"
+    VALUES_FILE = "values.npy"
+
+    def __init__(self, results_dir: Path, points_dir: Path, size: int, pending_age: float) -> None:
+        self.results_dir = results_dir
+        self.points_dir = points_dir
+        self.size = size
+        self.pending_age = pending_age
+        self.lock = RLock()
+
+    def get_process(self, process_id: UUID) -> tuple[GeoKrigingData, GeoGridValues] | None:
+        """
+        Получить данные и результат процесса
+        """
+        path = self.results_dir / str(process_id)
+        with self.lock:
+            try:
+                data = GeoKrigingData.model_validate_json((path / self.DATA_FILE).read_text())
+                values = np.load(path / self.VALUES_FILE, mmap_mode="r")
+                self._touch(path / self.DATA_FILE)
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as ex:
+                LOGGER.warning(f"Error read stored process {process_id}: {ex}")
+                return None
+        return data, GeoGridValues(grid=data.grid, values=values)
+
+    def put_data(self, process_id: UUID, data: GeoKrigingData) -> None:
+        """
+        Сохранить данные процесса
+        """
+        path = self.results_dir / str(process_id)
+        with self.lock:
+            try:
+                path.mkdir(parents=True, exist_ok=True)
+                self._write(path / self.DATA_FILE, lambda file: file.write(data.model_dump_json().encode()))
+            except OSError as ex:
+                LOGGER.warning(f"Error write stored process {process_id}: {ex}")
+
+    def put_result(self, process_id: UUID, result: GeoGridValues) -> None:
+        """
+        Сохранить результат процесса, данные которого уже сохранены
+        """
+        path = self.results_dir / str(process_id)
+        with self.lock:
+            if not (path / self.DATA_FILE).exists():
+                LOGGER.warning(f"Skip store result of process {process_id}: process data is not stored")
+                return
+            try:
+                self._write(path / self.VALUES_FILE, lambda file: np.save(file, result.values))
+            except OSError as ex:
+                LOGGER.warning(f"Error write stored process {process_id}: {ex}")
+                return
+            self._evict()
+
+    def get_points(self, points_id: UUID) -> GeoPointSet | None:
+        """
+        Получить точки координат
+        """
+        path = self.points_dir / f"{points_id}.npy"
+        with self.lock:
+            try:
+                columns = np.load(path, mmap_mode="r")
+                self._touch(path)
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as ex:
+                LOGGER.warning(f"Error read stored points {points_id}: {ex}")
+                return None
+        return GeoPointSet(lon=columns[0], lat=columns[1], value=columns[2])
+
+    def put_points(self, points_id: UUID, points: GeoPointSet) -> None:
+        """
+        Сохранить точки координат
+        """
+        path = self.points_dir / f"{points_id}.npy"
+        with self.lock:
+            if path.exists():
+                return
+            try:
+                self.points_dir.mkdir(parents=True, exist_ok=True)
+                columns = np.stack([points.lon, points.lat, points.value])
+                self._write(path, lambda file: np.save(file, columns))
+            except OSError as ex:
+                LOGGER.warning(f"Error write stored points {points_id}: {ex}")
+                return
+            self._evict()
+
+    @staticmethod
+    def _write(path: Path, write: Callable[[BinaryIO], object]) -> None:
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as file:
+            write(file)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """
+        Записи хранилища: время последнего обращения, размер, путь.
+
+        Процессы без сохраненного результата еще выполняются и не вытесняются,
+        пока не пройдет `pending_age` секунд - после этого они удаляются
+        """
+        entries = []
+        expired = time.time() - self.pending_age
+        if self.results_dir.exists():
+            for path in self.results_dir.iterdir():
+                if not path.is_dir():
+                    continue
+                try:
+                    files = [file.stat() for file in path.iterdir() if file.is_file()]
+                except FileNotFoundError:
+                    continue
+                if not files:
+                    continue
+                accessed = max(stat.st_mtime for stat in files)
+                if not (path / self.VALUES_FILE).exists():
+                    if accessed < expired:
+                        shutil.rmtree(path, ignore_errors=True)
+                    continue
+                entries.append((accessed, sum(stat.st_size for stat in files), path))
+        if self.points_dir.exists():
+            for path in self.points_dir.glob("*.npy"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Удалить давно не использованные записи сверх размера хранилища
+        """
+        try:
+            entries = sorted(self._entries(), key=lambda entry: entry[0])
+        except OSError as ex:
+            LOGGER.warning(f"Error scan result store: {ex}")
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.size:
+                break
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            total -= size
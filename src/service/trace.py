@@ -0,0 +1,228 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from uuid import UUID
+
+from config import settings
+
+_PROCESS_ID: ContextVar[UUID | None] = ContextVar("process_id", default=None)
+
+
+class Span:
+    """
+    Замер этапа: время начала и конца, поток, процесс кригинга и параметры
+    """
+
+    __slots__ = ("name", "category", "start", "end", "thread", "process_id", "args")
+
+    def __init__(self, name: str, category: str, process_id: UUID | None, args: dict) -> None:
+        self.name = name
+        self.category = category
+        self.start = time.perf_counter()
+        self.end = self.start
+        self.thread = threading.current_thread().name
+        self.process_id = process_id
+        self.args = args
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class SamplingProfiler:
+    """
+    Профилировщик, периодически снимающий стеки всех потоков.
+
+    Результат - число выборок на стек в формате collapsed stacks для flamegraph
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.thread.join()
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self.stop_event.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class Tracer:
+    """
+    Журнал замеров этапов работы клиента.
+
+    Замеры привязываются к процессу кригинга, заданному через `process`,
+    хранятся последние `max_spans` и выгружаются в формате Chrome trace
+    """
+
+    def __init__(self, enabled: bool, max_spans: int) -> None:
+        self.enabled = enabled
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self.profile_next = False
+        self.profiler: SamplingProfiler | None = None
+
+    @contextmanager
+    def process(self, process_id: UUID) -> Iterator[None]:
+        """
+        Привязать замеры внутри блока к процессу кригинга.
+
+        Если процесс уже задан (части сетки внутри процесса), замеры остаются за ним
+        """
+        if _PROCESS_ID.get() is not None:
+            yield
+            return
+        token = _PROCESS_ID.set(process_id)
+        try:
+            yield
+        finally:
+            _PROCESS_ID.reset(token)
+
+    @contextmanager
+    def span(self, name: str, category: str = "client", **args: object) -> Iterator[Span]:
+        """
+        Замерить блок, параметры замера можно дополнить через `span.args`.
+
+        Если процесс замера задан внутри блока (идентификатор стал известен
+        из ответа сервера), он присваивается и непривязанным замерам блока
+        """
+        span = Span(name, category, _PROCESS_ID.get(), args)
+        unbound = span.process_id is None
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            if self.enabled:
+                if unbound and span.process_id is not None:
+                    self._bind(span)
+                self.spans.append(span)
+
+    def _bind(self, parent: Span) -> None:
+        for span in reversed(list(self.spans)):
+            if span.end < parent.start:
+                break
+            if span.thread == parent.thread and span.process_id is None and span.start >= parent.start:
+                span.process_id = parent.process_id
+
+    def add(self, name: str, category: str, start: float, process_id: UUID | None = None, **args: object) -> None:
+        """
+        Добавить замер, начатый в `start` и закончившийся сейчас
+        """
+        if not self.enabled:
+            return
+        span = Span(name, category, process_id or _PROCESS_ID.get(), args)
+        span.start = start
+        self.spans.append(span)
+
+    def process_spans(self, process_id: UUID) -> list[Span]:
+        return [span for span in list(self.spans) if span.process_id == process_id]
+
+    def transferred(self, process_id: UUID) -> tuple[int, int]:
+        """
+        Отправлено и получено байт в запросах процесса
+        """
+        sent = received = 0
+        for span in self.process_spans(process_id):
+            if span.category == "http":
+                sent += span.args.get("bytes_sent") or 0
+                received += span.args.get("bytes_received") or 0
+        return sent, received
+
+    def summary(self, process_id: UUID) -> dict[str, float]:
+        """
+        Суммарное время замеров процесса по категориям
+        """
+        totals: dict[str, float] = {}
+        for span in self.process_spans(process_id):
+            totals[span.category] = totals.get(span.category, 0.0) + span.duration
+        return totals
+
+    def chrome_trace(self) -> dict:
+        """
+        Замеры в формате Chrome trace (chrome://tracing, Perfetto)
+        """
+        pid = os.getpid()
+        events = []
+        for span in list(self.spans):
+            args = {key: value for key, value in span.args.items() if value is not None}
+            if span.process_id is not None:
+                args["process_id"] = str(span.process_id)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.thread,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Path) -> None:
+        """
+        Сохранить замеры в json файл формата Chrome trace
+        """
+        path.write_text(json.dumps(self.chrome_trace()))
+
+    def start_profile(self) -> None:
+        """
+        Запустить профилировщик, если запрошено профилирование следующего запуска
+        """
+        if not self.profile_next or self.profiler is not None:
+            return
+        self.profile_next = False
+        self.profiler = SamplingProfiler(settings.trace.PROFILE_INTERVAL)
+        self.profiler.start()
+
+    def stop_profile(self, process_id: UUID | None) -> Path | None:
+        """
+        Остановить профилировщик и сохранить выборки, возвращает путь к файлу
+        """
+        if self.profiler is None:
+            return None
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        path = settings.cache.DIR / settings.trace.PROFILES_DIR / f"{process_id or int(time.time())}.txt"
+        try:
+            profiler.write(path)
+        except OSError:
+            return None
+        return path
+
+
+TRACER = Tracer(enabled=settings.trace.ENABLED, max_spans=settings.trace.MAX_SPANS)
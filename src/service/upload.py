@@ -0,0 +1,185 @@
+import gzip
+import io
+import json
+import logging
+from threading import Lock
+
+import numpy as np
+from pydantic import BaseModel
+
+from config.kriging import KrigingAPI
+from entity.point import GeoPointSet
+from entity.states import ContentEncoding
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+LOGGER = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def parse_header_list(header: str | None) -> set[str]:
+    """
+    Значения заголовка-списка без параметров
+    """
+    if not header:
+        return set()
+    return {item.split(";")[0].strip().lower() for item in header.split(",")} - {""}
+
+
+class EncodedPoints(BaseModel):
+    """
+    Тело запроса сохранения точек
+    """
+
+    body: bytes
+    media_type: str
+    encoding: ContentEncoding
+    raw_bytes: int
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"Content-Type": self.media_type}
+        if self.encoding != ContentEncoding.IDENTITY:
+            headers["Content-Encoding"] = self.encoding
+        return headers
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / max(len(self.body), 1)
+
+
+class PointsEncoder:
+    """
+    Кодирование точек для отправки на сервер.
+
+    Колоночный формат - npz с массивами `lon`, `lat` и `value`; при
+    `POINTS_PRECISION` координаты округляются до заданной точности в градусах
+    и передаются целыми числами вместе с массивом `precision`.
+
+    При `UPLOAD_NEGOTIATE` формат и сжатие из настроек используются, только если
+    сервер объявил их в ответе OPTIONS (`negotiate`): Accept-Post - принимаемые типы тела,
+    Accept-Encoding - принимаемое сжатие (RFC 7694). Без объявления точки
+    отправляются в GeoJSON без сжатия. Если сервер все же отвечает 415,
+    кодировщик переходит на сжатие из Accept-Encoding ответа, затем на GeoJSON,
+    затем на тело без сжатия.
+
+    Тело не сжимается, если оно меньше `UPLOAD_MIN_BYTES` или куски из разных
+    его частей сжимаются меньше, чем в `UPLOAD_MIN_RATIO` раз
+    """
+
+    SAMPLE_CHUNKS = 8
+    SAMPLE_CHUNK_BYTES = 16 * 1024
+
+    def __init__(self, config: KrigingAPI) -> None:
+        self.config = config
+        self.binary = config.POINTS_BINARY
+        self.encoding = config.UPLOAD_ENCODING
+        if not self.supports(self.encoding):
+            LOGGER.warning(f"Upload encoding {self.encoding} is unavailable, use {ContentEncoding.GZIP}")
+            self.encoding = ContentEncoding.GZIP
+        self.is_negotiated = not config.UPLOAD_NEGOTIATE
+        self.lock = Lock()
+
+    @staticmethod
+    def supports(encoding: ContentEncoding) -> bool:
+        return encoding != ContentEncoding.ZSTD or zstandard is not None
+
+    def encode(self, points: GeoPointSet, plain: bool = False) -> EncodedPoints:
+        """
+        Сериализовать и сжать точки в согласованных с сервером формате и сжатии,
+        при `plain` - в GeoJSON без сжатия
+        """
+        if self.binary and not plain:
+            media_type, body = self.config.POINTS_MEDIA_TYPE, self._columnar(points)
+        else:
+            media_type, body = JSON_MEDIA_TYPE, self._geojson(points)
+
+        encoding = ContentEncoding.IDENTITY if plain else self.encoding
+        if len(body) < self.config.UPLOAD_MIN_BYTES or not self._is_compressible(body, encoding):
+            encoding = ContentEncoding.IDENTITY
+        return EncodedPoints(
+            body=self._compress(body, encoding), media_type=media_type, encoding=encoding, raw_bytes=len(body)
+        )
+
+    def negotiate(self, accept_post: str | None, accept_encoding: str | None) -> None:
+        """
+        Выбрать формат и сжатие по заголовкам Accept-Post и Accept-Encoding ответа OPTIONS,
+        без заголовков - GeoJSON без сжатия
+        """
+        self.binary = self.binary and self.config.POINTS_MEDIA_TYPE in parse_header_list(accept_post)
+        self.encoding = self._accepted_encoding(parse_header_list(accept_encoding))
+        self.is_negotiated = True
+        media_type = self.config.POINTS_MEDIA_TYPE if self.binary else JSON_MEDIA_TYPE
+        LOGGER.info(f"Upload points as {media_type}, encoding {self.encoding}")
+
+    def downgrade(self, encoded: EncodedPoints, accept_encoding: str | None = None) -> bool:
+        """
+        Перейти на более простое кодирование после ответа 415 на `encoded`.
+
+        `accept_encoding` - заголовок Accept-Encoding ответа, возвращает
+        признак того, что кодирование изменилось и запрос стоит повторить
+        """
+        if encoded.encoding != ContentEncoding.IDENTITY and accept_encoding is not None:
+            accepted = parse_header_list(accept_encoding)
+            if encoded.encoding not in accepted:
+                self.encoding = self._accepted_encoding(accepted)
+                LOGGER.warning(f"Server does not accept {encoded.encoding} upload, use {self.encoding}")
+                return True
+
+        if encoded.media_type != JSON_MEDIA_TYPE:
+            self.binary = False
+            LOGGER.warning(f"Server does not accept {encoded.media_type} points, use GeoJSON")
+            return True
+        if encoded.encoding != ContentEncoding.IDENTITY:
+            self.encoding = ContentEncoding.IDENTITY
+            LOGGER.warning(f"Server does not accept {encoded.encoding} upload, send uncompressed")
+            return True
+        return False
+
+    def _accepted_encoding(self, accepted: set[str]) -> ContentEncoding:
+        """
+        Сжатие из настроек, если сервер его принимает, иначе другое доступное принимаемое или без сжатия
+        """
+        preferred = (self.encoding, ContentEncoding.ZSTD, ContentEncoding.GZIP)
+        return next(
+            (encoding for encoding in preferred if encoding in accepted and self.supports(encoding)),
+            ContentEncoding.IDENTITY,
+        )
+
+    def _columnar(self, points: GeoPointSet) -> bytes:
+        precision = self.config.POINTS_PRECISION
+        columns = {"lon": points.lon, "lat": points.lat, "value": points.value}
+        if precision:
+            dtype = np.int32 if 180 / precision < np.iinfo(np.int32).max else np.int64
+            columns["lon"] = np.round(points.lon / precision).astype(dtype)
+            columns["lat"] = np.round(points.lat / precision).astype(dtype)
+            columns["precision"] = np.float64(precision)
+        buffer = io.BytesIO()
+        np.savez(buffer, **columns)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _geojson(points: GeoPointSet) -> bytes:
+        return json.dumps(points.geojson(), separators=(",", ":"), allow_nan=False).encode()
+
+    def _is_compressible(self, body: bytes, encoding: ContentEncoding) -> bool:
+        chunk = self.SAMPLE_CHUNK_BYTES
+        if encoding == ContentEncoding.IDENTITY or len(body) <= self.SAMPLE_CHUNKS * chunk:
+            return True
+        offsets = np.linspace(0, len(body) - chunk, self.SAMPLE_CHUNKS).astype(int)
+        sample = b"".join(body[offset : offset + chunk] for offset in offsets.tolist())
+        return len(sample) / len(self._compress(sample, encoding)) >= self.config.UPLOAD_MIN_RATIO
+
+    def _compress(self, body: bytes, encoding: ContentEncoding) -> bytes:
+        match encoding:
+            case ContentEncoding.GZIP:
+                return gzip.compress(body, compresslevel=self.config.UPLOAD_LEVEL, mtime=0)
+            case ContentEncoding.ZSTD:
+                return zstandard.ZstdCompressor(level=self.config.UPLOAD_LEVEL).compress(body)
+            case _:
+                return body
+
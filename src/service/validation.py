@@ -0,0 +1,211 @@
+from concurrent.futures import CancelledError
+from threading import Event
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from entity.point import GeoPointSet
+from entity.states import KrigingModel, Variogram
+
+from .engine import KrigingEngine, distances, variogram
+from .trace import TRACER
+
+
+class ValidationResult(BaseModel):
+    """
+    Итог перекрестной проверки сочетания вариограммы и метода кригинга.
+
+    Остаток точки - значение минус прогноз по остальным точкам,
+    стандартизованный остаток - остаток, деленный на стандартное отклонение кригинга
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    variogram: Variogram
+    kriging: KrigingModel
+    nugget: float = 0.0
+    residuals: np.ndarray | None = None
+    standardized: np.ndarray | None = None
+    error: str | None = None
+
+    @property
+    def rmse(self) -> float:
+        return float(np.sqrt(np.mean(self.residuals**2))) if self.residuals is not None else np.nan
+
+    @property
+    def mean_error(self) -> float:
+        return float(np.mean(self.residuals)) if self.residuals is not None else np.nan
+
+    @property
+    def mean_standardized(self) -> float:
+        return float(np.mean(self.standardized)) if self.standardized is not None else np.nan
+
+    @property
+    def rmse_standardized(self) -> float:
+        """
+        Среднеквадратичный стандартизованный остаток, близок к 1 при верной дисперсии кригинга
+        """
+        return float(np.sqrt(np.mean(self.standardized**2))) if self.standardized is not None else np.nan
+
+
+class CrossValidationReport(BaseModel):
+    """
+    Итог перекрестной проверки всех сочетаний для набора точек
+    """
+
+    points: int
+    results: list[ValidationResult]
+
+    @property
+    def best(self) -> ValidationResult | None:
+        """
+        Сочетание с наименьшей среднеквадратичной ошибкой
+        """
+        results = [result for result in self.results if result.error is None and np.isfinite(result.rmse)]
+        return min(results, key=lambda result: result.rmse, default=None)
+
+
+class CrossValidator:
+    """
+    Перекрестная проверка кригинга с исключением по одной точке.
+
+    Остатки считаются в замкнутой форме (Dubrule, 1983) без решения системы
+    для каждой точки: для обратной матрицы системы Q остаток точки равен
+    `(Q z)_i / Q_ii`, дисперсия ошибки прогноза - `1 / Q_ii`. Ковариационная
+    матрица зависит только от вариограммы, поэтому для нее один раз вычисляется
+    разложение Холецкого и обратный множитель (блоками строк), а обычный
+    и универсальный кригинг получаются через дополнение Шура по функциям тренда.
+    Параметры вариограммы и самородок те же, что у `KrigingEngine`; если матрица
+    вырождена, самородок увеличивается множителями `NUGGET_FACTORS`
+    """
+
+    BLOCK = 512
+    NUGGET_FACTORS = (1.0, 1e3, 1e6)
+
+    def __init__(self, engine: KrigingEngine, max_points: int) -> None:
+        self.engine = engine
+        self.max_points = max_points
+
+    def validate(
+        self,
+        points: GeoPointSet,
+        combinations: list[tuple[Variogram, KrigingModel]],
+        cancel_event: Event | None = None,
+    ) -> CrossValidationReport:
+        """
+        Вычислить остатки для сочетаний вариограммы и метода кригинга
+        """
+        cancel_event = cancel_event or Event()
+        if len(points) < 3:
+            raise ValueError("Для перекрестной проверки нужно хотя бы 3 точки")
+        if len(points) > self.max_points:
+            raise ValueError(
+                f"Слишком много точек для перекрестной проверки: {len(points)} > {self.max_points}, проредите точки"
+            )
+
+        results = []
+        for kind in dict.fromkeys(vario for vario, _ in combinations):
+            models = [model for vario, model in combinations if vario == kind]
+            with TRACER.span("cross_validate", "compute", points=len(points), variogram=kind):
+                results.extend(self._validate_variogram(points, kind, models, cancel_event))
+        return CrossValidationReport(points=len(points), results=results)
+
+    def _validate_variogram(
+        self, points: GeoPointSet, kind: Variogram, models: list[KrigingModel], cancel_event: Event
+    ) -> list[ValidationResult]:
+        sill, range_ = self.engine.fit(points, kind)
+        try:
+            inverse, nugget = self._inverse_factor(points, kind, sill, range_, cancel_event)
+        except np.linalg.LinAlgError:
+            error = "Матрица ковариаций вырождена"
+            return [ValidationResult(variogram=kind, kriging=model, error=error) for model in models]
+
+        diagonal = np.zeros(len(points))
+        for start in range(0, len(points), self.BLOCK):
+            rows = inverse[start : start + self.BLOCK]
+            diagonal += np.einsum("ij,ij->j", rows, rows)
+
+        def solve(columns: np.ndarray) -> np.ndarray:
+            return inverse.T @ (inverse @ columns)
+
+        results = []
+        for model in models:
+            if cancel_event.is_set():
+                raise CancelledError
+            result = ValidationResult(variogram=kind, kriging=model, nugget=nugget)
+            drift = self.engine.drift(points.lon, points.lat, points, model)
+            try:
+                if drift is None:
+                    weights = solve(points.value - points.value.mean())
+                    precision = diagonal
+                else:
+                    weights = solve(points.value)
+                    drift_weights = solve(drift)
+                    schur = drift.T @ drift_weights
+                    weights = weights - drift_weights @ np.linalg.solve(schur, drift_weights.T @ points.value)
+                    projection = np.linalg.solve(schur, drift_weights.T).T
+                    precision = diagonal - np.einsum("ij,ij->i", drift_weights, projection)
+            except np.linalg.LinAlgError:
+                result.error = "Система тренда вырождена"
+            else:
+                if (precision > 0).all():
+                    result.residuals = weights / precision
+                    result.standardized = weights / np.sqrt(precision)
+                else:
+                    result.error = "Неположительная дисперсия прогноза"
+            results.append(result)
+        return results
+
+    def _inverse_factor(
+        self, points: GeoPointSet, kind: Variogram, sill: float, range_: float, cancel_event: Event
+    ) -> tuple[np.ndarray, float]:
+        """
+        Обратный множитель Холецкого `L^-1` матрицы ковариаций и использованный самородок.
+
+        Разложение читает только нижний треугольник, поэтому заполняется только он
+        """
+        count = len(points)
+        covariance = np.zeros((count, count))
+        block = max(self.engine.block_bytes // (8 * count), 1)
+        for start in range(0, count, block):
+            if cancel_event.is_set():
+                raise CancelledError
+            stop = min(start + block, count)
+            lon, lat = points.lon[start:stop], points.lat[start:stop]
+            covariance[start:stop, :stop] = sill - variogram(
+                kind, distances(lon, lat, points.lon[:stop], points.lat[:stop]), sill, range_
+            )
+
+        diagonal = np.diag_indices(count)
+        added = 0.0
+        for factor in self.NUGGET_FACTORS:
+            nugget = self.engine.nugget * factor
+            covariance[diagonal] += (nugget - added) * sill
+            added = nugget
+            try:
+                lower = np.linalg.cholesky(covariance)
+            except np.linalg.LinAlgError:
+                continue
+            del covariance
+            self._invert_lower(lower, cancel_event)
+            return lower, nugget
+        raise np.linalg.LinAlgError
+
+    def _invert_lower(self, lower: np.ndarray, cancel_event: Event) -> None:
+        """
+        Обратить нижнетреугольную матрицу на месте блоками строк:
+        `W_II = L_II^-1`, `W_IJ = -W_II (L_I,<I W_<I,J)`, нулевые блоки выше диагонали не умножаются
+        """
+        block = self.BLOCK
+        for start in range(0, len(lower), block):
+            if cancel_event.is_set():
+                raise CancelledError
+            stop = start + block
+            block_inverse = np.tril(np.linalg.inv(lower[start:stop, start:stop]))
+            if start:
+                row = lower[start:stop, :start]
+                product = np.empty_like(row)
+                for column in range(0, start, block):
+                    product[:, column : column + block] = row[:, column:] @ lower[column:start, column : column + block]
+                lower[start:stop, :start] = -block_inverse @ product
+            lower[start:stop, start:stop] = block_inverse